@@ -0,0 +1,11 @@
+import logging
+import os
+import tempfile
+
+# `src.get_scraping` registra o log em scraping.log no diretório atual. Nos
+# benchmarks, o log vai para a pasta temporária, antes desse módulo ser importado.
+logging.basicConfig(
+    filename=os.path.join(tempfile.gettempdir(), 'strava_benchmarks.log'),
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+)
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.get_records import ACTIVITY_DTYPES
+from src.get_utils import iso_week
+
+
+ACTIVITY_TYPES = ['Run', 'Walk', 'Ride', 'Hike', 'Weight Training', 'Yoga']
+
+
+def synthetic_activities(
+    athletes: int = 200,
+    seasons: int = 3,
+    per_week: float = 4,
+    end: datetime = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Gera um dataset de atividades com o mesmo esquema das partições semanais.
+
+    Cada atleta tem, por semana, uma quantidade de atividades sorteada em torno
+    de `per_week`, espalhadas pelas temporadas (anos) que terminam em `end`.
+
+    Args:
+        athletes (int, optional): Quantidade de atletas. Padrão é 200.
+        seasons (int, optional): Quantidade de temporadas. Padrão é 3.
+        per_week (float, optional): Média de atividades por atleta e semana. Padrão é 4.
+        end (datetime, optional): Data final do dataset. Padrão é agora.
+        seed (int, optional): Semente do gerador. Padrão é 0.
+
+    Returns:
+        pd.DataFrame: DataFrame tipado com `ACTIVITY_DTYPES`.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.now()).floor('s')
+    start = end - pd.DateOffset(years=seasons)
+    weeks = int((end - start).days // 7)
+
+    counts = rng.poisson(per_week * weeks, size=athletes)
+    total = int(counts.sum())
+    span = int((end - start).total_seconds())
+
+    date_time = start + pd.to_timedelta(rng.integers(0, span, total), unit='s')
+    moving = pd.to_timedelta(rng.integers(10 * 60, 180 * 60, total), unit='s')
+    types = rng.choice(ACTIVITY_TYPES, total)
+
+    df = pd.DataFrame(
+        {
+            'athlete_id': np.repeat(np.arange(1000, 1000 + athletes), counts),
+            'activity_id': 10_000_000 + np.arange(total),
+            'athlete_name': np.repeat(
+                [f'Atleta {i:03d}' for i in range(athletes)], counts
+            ),
+            'activity_type': types,
+            'date': date_time.normalize(),
+            'date_time': date_time,
+            'location': 'São Paulo, SP',
+            'activity_name': 'Treino',
+            'moving_time': moving,
+            'elapsed_time': moving + pd.to_timedelta(rng.integers(0, 900, total), 's'),
+            'duration': np.full(total, np.timedelta64('NaT'), 'timedelta64[ns]'),
+            'calories': rng.integers(80, 2500, total).astype('float'),
+            'distance': np.round(rng.uniform(2, 60, total), 2),
+            'pace': '5:30',
+            'elevation': rng.integers(0, 900, total).astype('float'),
+            'link': 'https://www.strava.com/activities/'
+            + pd.Series(10_000_000 + np.arange(total)).astype(str),
+            'updated_at': end,
+            'week': None,
+        }
+    ).astype(ACTIVITY_DTYPES)
+
+    df['date'] = df['date_time'].dt.date
+    df['week'] = iso_week(df['date_time'])
+    return df
@@ -0,0 +1,414 @@
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datasets import synthetic_activities
+from benchmarks.strava_stub import StravaStub, activity_page
+from src.get_http import HttpFetcher, parse_activity_html
+from src.get_records import build_activity_frame
+from src.get_score import IncrementalScorer, Scorer
+from src.get_utils import load_activity_data, save_activity_data
+
+
+SUITES = ['parse', 'http', 'browser', 'frame', 'io', 'score']
+COLUMNS = [
+    'benchmark',
+    'items',
+    'seconds',
+    'items_per_s',
+    'p50_ms',
+    'p95_ms',
+    'p99_ms',
+    'py_peak_mb',
+    'rss_peak_mb',
+]
+
+
+def _rss_peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(name: str, func, items: int = 1, memory: bool = False) -> dict:
+    """Executa um benchmark e mede vazão, latência e memória.
+
+    `func` recebe uma lista onde pode registrar a latência, em segundos, de cada
+    item; sem latências por item, os percentis ficam vazios. A memória Python é
+    medida com `tracemalloc` em uma segunda execução, para não distorcer os tempos.
+
+    Args:
+        name (str): Nome do benchmark.
+        func (callable): Função executada, que recebe a lista de latências.
+        items (int, optional): Quantidade de itens processados. Padrão é 1.
+        memory (bool, optional): Se True, mede o pico de memória Python. Padrão é False.
+
+    Returns:
+        dict: Resultado do benchmark.
+    """
+    gc.collect()
+    latencies = []
+    start = time.perf_counter()
+    func(latencies)
+    seconds = time.perf_counter() - start
+
+    result = {
+        'benchmark': name,
+        'items': items,
+        'seconds': seconds,
+        'items_per_s': items / seconds if seconds else None,
+        'rss_peak_mb': _rss_peak_mb(),
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        result.update({'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99})
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func([])
+        result['py_peak_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def _each(items: list, func, latencies: list):
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+
+
+def bench_parse(stub: StravaStub, memory: bool) -> list:
+    activities = list(stub.activities.values())
+    pages = [(activity, activity_page(activity)) for activity in activities]
+
+    def _run(latencies):
+        _each(
+            pages,
+            lambda page: parse_activity_html(
+                page[1], page[0]['athlete_id'], page[0]['activity_id'], stub.url
+            ),
+            latencies,
+        )
+
+    return [measure('parse.activity_html', _run, len(pages), memory)]
+
+
+def bench_http(stub: StravaStub, workers: int, memory: bool) -> list:
+    activities = list(stub.activities.values())
+    fetcher = HttpFetcher([], url=stub.url, max_connections=workers)
+
+    def _fetch(activity, latencies):
+        start = time.perf_counter()
+        fetcher.fetch_activity(activity['athlete_id'], activity['activity_id'])
+        latencies.append(time.perf_counter() - start)
+
+    def _run(latencies):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda a: _fetch(a, latencies), activities))
+
+    try:
+        return [
+            measure('http.members', lambda lat: fetcher.fetch_member_page(1)),
+            measure(f'http.activity x{workers}', _run, len(activities), memory),
+        ]
+    finally:
+        fetcher.close()
+
+
+def bench_browser(stub: StravaStub, workers: int, extraction: str) -> list:
+    from src.get_pool import ScraperPool
+    from src.get_scraping import StravaScraper
+
+    scraper = StravaScraper('', '', extraction=extraction, url=stub.url)
+    with tempfile.TemporaryDirectory() as session:
+        try:
+            scraper.start_browser(headless=True, session_file=session)
+        except Exception as e:
+            print(f'Benchmark do navegador ignorado: {e}')
+            return []
+
+        try:
+            results = []
+            members = []
+            results.append(
+                measure(
+                    'browser.members',
+                    lambda lat: members.extend(
+                        scraper.get_club_members(1)['athlete_id'].tolist()
+                    ),
+                )
+            )
+
+            jobs = []
+
+            # Todas as semanas com atividades do stub são percorridas, então a
+            # troca de semana pelo fragmento é exercitada a cada atleta.
+            def _discover(latencies):
+                jobs.clear()
+                for athlete_id in members:
+                    start = time.perf_counter()
+                    found = scraper.get_athlete_activities(athlete_id, stub.weeks + 1)
+                    latencies.append(time.perf_counter() - start)
+                    jobs.extend((athlete_id, i) for i in found['activities'])
+
+            results.append(
+                measure('browser.interval', _discover, len(members), memory=False)
+            )
+            expected = {
+                (str(activity['athlete_id']), str(activity['activity_id']))
+                for activity in stub.activities.values()
+            }
+            found = [(str(athlete_id), str(i)) for athlete_id, i in jobs]
+            if len(found) != len(set(found)) or set(found) != expected:
+                print(
+                    f'Aviso: a descoberta achou {len(set(found))} atividades '
+                    f'({len(found) - len(set(found))} repetidas), e o stub tem '
+                    f'{len(expected)}.'
+                )
+
+            if workers > 1:
+                pool = ScraperPool(scraper, size=workers, min_interval=0)
+                name = f'browser.activity {extraction} x{workers}'
+                results.append(
+                    measure(name, lambda lat: pool.run(jobs), len(jobs), memory=False)
+                )
+            else:
+                results.append(
+                    measure(
+                        f'browser.activity {extraction}',
+                        lambda lat: _each(
+                            jobs, lambda job: scraper.activity_record(*job), lat
+                        ),
+                        len(jobs),
+                        memory=False,
+                    )
+                )
+            return results
+        finally:
+            scraper.close_browser()
+
+
+def bench_frame(stub: StravaStub, memory: bool) -> list:
+    fetched = [
+        parse_activity_html(activity_page(activity), 0, 0, stub.url)
+        for activity in stub.activities.values()
+    ]
+    records = [record for record in fetched if record] * 50
+    return [
+        measure(
+            'frame.build',
+            lambda lat: build_activity_frame(records),
+            len(records),
+            memory,
+        )
+    ]
+
+
+def bench_io(df: pd.DataFrame, memory: bool) -> list:
+    weeks = sorted(df['week'].unique())[-4:]
+    with tempfile.TemporaryDirectory() as folder:
+        results = [
+            measure(
+                'parquet.save',
+                lambda lat: save_activity_data(df, folder),
+                len(df),
+                memory,
+            ),
+            measure(
+                'parquet.load all',
+                lambda lat: load_activity_data(folder),
+                len(df),
+                memory,
+            ),
+            measure(
+                'parquet.load 4 weeks',
+                lambda lat: load_activity_data(folder, weeks=weeks),
+                int(df['week'].isin(weeks).sum()),
+                memory,
+            ),
+        ]
+    return results
+
+
+def bench_score(df: pd.DataFrame, memory: bool) -> list:
+    latest = df[df['week'] == df['week'].max()]
+    with tempfile.TemporaryDirectory() as folder:
+        save_activity_data(df, folder)
+        scorer = IncrementalScorer(folder)
+        return [
+            measure('score.full', lambda lat: Scorer(df).score(), len(df), memory),
+            measure('score.rebuild', lambda lat: scorer.rebuild(), len(df), memory),
+            measure(
+                'score.update 1 week',
+                lambda lat: scorer.update(latest),
+                len(latest),
+                memory,
+            ),
+        ]
+
+
+def compare(results: pd.DataFrame, path: str) -> pd.DataFrame:
+    """Compara os resultados com os de uma execução anterior.
+
+    Args:
+        results (pd.DataFrame): Resultados desta execução.
+        path (str): Arquivo JSON de uma execução anterior.
+
+    Returns:
+        pd.DataFrame: Vazão e p95 de cada benchmark, antes e agora, com a variação.
+    """
+    with open(path) as file:
+        previous = pd.DataFrame(json.load(file)['results'])
+
+    df = results.merge(
+        previous, on='benchmark', how='left', suffixes=('', '_before')
+    ).reindex(
+        columns=[
+            'benchmark',
+            'items_per_s_before',
+            'items_per_s',
+            'p95_ms_before',
+            'p95_ms',
+        ]
+    )
+    df['speedup'] = df['items_per_s'] / df['items_per_s_before']
+    return df
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks da coleta e da pontuação, sem acessar o Strava.'
+    )
+    parser.add_argument(
+        '--suite',
+        nargs='+',
+        choices=SUITES,
+        default=SUITES,
+        help='Benchmarks executados. Padrão são todos.',
+    )
+    parser.add_argument(
+        '--athletes', type=int, default=20, help='Membros do clube simulado.'
+    )
+    parser.add_argument(
+        '--activities', type=int, default=8, help='Atividades por membro simulado.'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0,
+        help='Atraso, em segundos, de cada resposta do servidor simulado.',
+    )
+    parser.add_argument(
+        '--recorded', default=None, help='Pasta com páginas HTML gravadas.'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=4, help='Requisições ou páginas simultâneas.'
+    )
+    parser.add_argument(
+        '--extraction',
+        choices=['script', 'locator'],
+        default='script',
+        help='Modo de extração no benchmark do navegador.',
+    )
+    parser.add_argument(
+        '--dataset-athletes',
+        type=int,
+        default=200,
+        help='Atletas do dataset sintético da pontuação e do parquet.',
+    )
+    parser.add_argument(
+        '--seasons', type=int, default=3, help='Temporadas do dataset sintético.'
+    )
+    parser.add_argument(
+        '--memory',
+        action='store_true',
+        help='Mede também o pico de memória Python de cada benchmark.',
+    )
+    parser.add_argument(
+        '--output',
+        default='benchmarks/results/',
+        help='Pasta dos resultados em JSON. Padrão é benchmarks/results/.',
+    )
+    parser.add_argument(
+        '--compare', default=None, help='Resultado anterior, em JSON, para comparar.'
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    results = []
+
+    with StravaStub(
+        args.athletes, args.activities, latency=args.latency, recorded=args.recorded
+    ) as stub:
+        if 'parse' in args.suite:
+            results += bench_parse(stub, args.memory)
+        if 'http' in args.suite:
+            results += bench_http(stub, args.workers, args.memory)
+        if 'browser' in args.suite:
+            results += bench_browser(stub, args.workers, args.extraction)
+        if 'frame' in args.suite:
+            results += bench_frame(stub, args.memory)
+
+    if {'io', 'score'} & set(args.suite):
+        df = synthetic_activities(args.dataset_athletes, args.seasons)
+        if 'io' in args.suite:
+            results += bench_io(df, args.memory)
+        if 'score' in args.suite:
+            results += bench_score(df, args.memory)
+
+    table = pd.DataFrame(results).reindex(columns=COLUMNS)
+    print(table.to_string(index=False, float_format='{:.2f}'.format))
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(
+        args.output, f'bench_{datetime.now().strftime("%Y%m%d%H%M%S")}.json'
+    )
+    rows = table.astype(object).where(table.notna(), None).to_dict('records')
+    with open(path, 'w') as file:
+        json.dump(
+            {
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'commit': _git_commit(),
+                'params': vars(args),
+                'results': rows,
+            },
+            file,
+            indent=2,
+        )
+    print(f'Resultados salvos em {path}')
+
+    if args.compare:
+        print(
+            compare(table, args.compare).to_string(
+                index=False, float_format='{:.2f}'.format
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
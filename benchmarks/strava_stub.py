@@ -0,0 +1,374 @@
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Variantes de marcação da página de atividade, com as mesmas diferenças que
+# aparecem no Strava: página completa com "mostrar mais", layout antigo com
+# tabela, treino só com duração e página montada por JavaScript (sem #heading).
+VARIANTS = ['run', 'ride_legacy', 'workout', 'js_only']
+VARIANT_WEIGHTS = [0.55, 0.25, 0.15, 0.05]
+
+ACTIVITY_TYPES = {
+    'run': ['Run', 'Walk', 'Hike', 'Trail Run'],
+    'ride_legacy': ['Ride', 'Virtual Ride', 'Mountain Bike Ride'],
+    'workout': ['Weight Training', 'Yoga', 'Workout'],
+    'js_only': ['Run'],
+}
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f'<title>{escape(title)} | Strava</title></head><body>{body}</body></html>'
+    )
+
+
+def _clock(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{seconds:02d}'
+    return f'{minutes}:{seconds:02d}'
+
+
+def _when(date_time: datetime) -> str:
+    return date_time.strftime('%-I:%M %p on %A, %B %-d, %Y')
+
+
+def activity_page(activity: dict) -> str:
+    """Monta a página de visão geral de uma atividade na variante indicada.
+
+    Args:
+        activity (dict): Atividade gerada por `StravaStub`.
+
+    Returns:
+        str: HTML da página.
+    """
+    variant = activity['variant']
+    athlete = escape(activity['athlete_name'])
+    title = f'{athlete} – {activity["activity_type"]}'
+    details = (
+        '<div class="details">'
+        f'<time>{_when(activity["date_time"])}</time>'
+        '<h1 class="text-title1 marginless activity-name">'
+        f'{escape(activity["activity_name"])}</h1>'
+        + (
+            f'<span class="location">{escape(activity["location"])}</span>'
+            if activity['location']
+            else ''
+        )
+        + '</div>'
+    )
+    header = (
+        f'<span class="title"><a class="minimal" href="/athletes/'
+        f'{activity["athlete_id"]}">{athlete}</a></span>'
+    )
+
+    if variant == 'js_only':
+        return _page(
+            activity['activity_name'],
+            '<div id="app" data-react-class="ActivityOverview"></div>'
+            '<script src="/assets/overview.js"></script>',
+        )
+
+    moving = _clock(activity['moving_time'])
+    elapsed = _clock(activity['elapsed_time'])
+    if variant == 'workout':
+        stats = f'<ul><li><strong>{moving}</strong><div>Time</div></li></ul>'
+        more = ''
+    else:
+        pace = activity['moving_time'] / max(activity['distance'], 0.1)
+        stats = (
+            '<ul class="inline-stats section">'
+            f'<li><strong>{activity["distance"]:.2f} km</strong><div>Distance</div></li>'
+            f'<li><strong>{moving}</strong><div>Moving Time</div></li>'
+            f'<li><strong>{_clock(int(pace))} /km</strong><div>Pace</div></li>'
+        )
+        if variant == 'ride_legacy':
+            stats += (
+                f'<li><strong>{activity["elevation"]} m</strong>'
+                '<div>Elevation</div></li></ul>'
+            )
+            more = (
+                '<div class="section more-stats"><table class="unstyled">'
+                '<tr><th><span>Elapsed Time</span></th>'
+                f'<td>{elapsed}</td></tr>'
+                f'<tr><th>Calories</th><td>{activity["calories"]:,}</td></tr>'
+                '</table></div>'
+            )
+        else:
+            stats += '</ul>'
+            more = (
+                '<div class="section more-stats">'
+                '<div class="row"><div>Elevation</div><div><strong>'
+                f'{activity["elevation"]}<abbr class="unit" title="meters">m</abbr>'
+                '</strong></div></div>'
+                '<div class="row"><div><span data-glossary-term='
+                '"definition-elapsed-time">Elapsed Time</span></div>'
+                f'<div><strong>{elapsed}</strong></div></div>'
+                '<div class="row"><div>Calories</div>'
+                f'<div><strong>{activity["calories"]:,}</strong></div></div>'
+                '</div>'
+            )
+
+    heading = (
+        '<div id="heading">'
+        f'<header><h2><span>{title}</span></h2></header>'
+        '<div><div>'
+        f'<div class="media">{details}</div>'
+        '<div><div><div><button type="button">Show More</button></div></div>'
+        f'{stats}</div>'
+        '</div></div>'
+        '</div>'
+    )
+    return _page(activity['activity_name'], header + heading + more)
+
+
+def members_page(athletes: list, page: int = 1, per_page: int = 100) -> str:
+    """Monta uma página da lista de membros do clube, com a paginação."""
+    items = ''.join(
+        '<li><div class="text-headline">'
+        f'<a href="/athletes/{athlete["athlete_id"]}">'
+        f'{escape(athlete["athlete_name"])}</a></div></li>'
+        for athlete in athletes[(page - 1) * per_page : page * per_page]
+    )
+    pages = max(1, -(-len(athletes) // per_page))
+    links = ''.join(
+        f'<li><a href="?page={number}">{number}</a></li>'
+        for number in range(max(1, page - 2), min(pages, page + 2) + 1)
+        if number != page
+    )
+    return _page(
+        'Members',
+        f'<ul class="list-athletes">{items}</ul>'
+        f'<ul class="pagination">{links}</ul>',
+    )
+
+
+# Como no Strava, a página do atleta lê a semana do fragmento `#interval?...`
+# e busca os links dela em `/athletes/<id>/interval`, de novo a cada troca do
+# fragmento, substituindo os links da semana anterior.
+INTERVAL_SCRIPT = """
+<script>
+function loadInterval() {
+    const match = location.hash.match(/interval=(\\d+)/);
+    if (!match) {
+        return;
+    }
+    fetch(location.pathname + '/interval?interval=' + match[1] + '&interval_type=week')
+        .then((response) => response.text())
+        .then((html) => { document.querySelector('.feed').outerHTML = html; });
+}
+window.addEventListener('hashchange', loadInterval);
+loadInterval();
+</script>
+"""
+
+
+def week_of(date_time: datetime) -> int:
+    """Semana da data no formato 'YYYYWW' de `get_week`."""
+    year, week, _ = date_time.isocalendar()
+    return int(f'{year}{week:02d}')
+
+
+def athlete_page() -> str:
+    """Monta a página do atleta, cujos links são carregados por `interval_page`."""
+    return _page('Athlete', '<div class="feed"></div>' + INTERVAL_SCRIPT)
+
+
+def interval_page(activities: list, week: int) -> str:
+    """Monta o trecho com os links das atividades do atleta na semana."""
+    links = ''.join(
+        f'<div class="feed-entry"><a data-testid="activity_name" '
+        f'href="/activities/{activity["activity_id"]}">'
+        f'{escape(activity["activity_name"])}</a></div>'
+        for activity in activities
+        if week_of(activity['date_time']) == week
+    )
+    return f'<div class="feed">{links}</div>'
+
+
+def feed_page(activities: list) -> str:
+    """Monta o feed de atividades recentes do clube, da mais nova para a mais antiga."""
+    entries = ''.join(
+        '<div data-testid="web-feed-entry">'
+        f'<a href="/athletes/{activity["athlete_id"]}">'
+        f'{escape(activity["athlete_name"])}</a>'
+        f'<time datetime="{activity["date_time"]:%Y-%m-%d %H:%M:%S}">'
+        f'{activity["date_time"]:%B %-d, %Y at %-I:%M %p}</time>'
+        f'<a data-testid="activity_name" href="/activities/{activity["activity_id"]}">'
+        f'{escape(activity["activity_name"])}</a></div>'
+        for activity in activities
+    )
+    return _page('Recent Activity', f'<div class="feed">{entries}</div>')
+
+
+class StravaStub:
+    """Servidor HTTP local que imita as páginas do Strava usadas pela coleta.
+
+    Gera um clube sintético e determinístico (pela `seed`) e serve as páginas
+    de membros, do atleta, do feed do clube e de visão geral das atividades.
+    Se `recorded` for informado, arquivos HTML gravados têm prioridade: a rota
+    `/activities/123/overview` é servida de `<recorded>/activities/123/overview.html`.
+
+    Args:
+        athletes (int, optional): Quantidade de membros. Padrão é 20.
+        activities_per_athlete (int, optional): Atividades por membro. Padrão é 8.
+        weeks (int, optional): Semanas cobertas pelas atividades. Padrão é 4.
+        latency (float, optional): Atraso, em segundos, de cada resposta. Padrão é 0.
+        recorded (str, optional): Pasta com páginas gravadas.
+        seed (int, optional): Semente do gerador. Padrão é 0.
+        members_per_page (int, optional): Membros por página da lista. Padrão é 100.
+    """
+
+    def __init__(
+        self,
+        athletes: int = 20,
+        activities_per_athlete: int = 8,
+        weeks: int = 4,
+        latency: float = 0,
+        recorded: str = None,
+        seed: int = 0,
+        members_per_page: int = 100,
+    ):
+        self.latency = latency
+        self.weeks = weeks
+        self.members_per_page = members_per_page
+        self.recorded = recorded
+        self.requests = 0
+        self.server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._generate(athletes, activities_per_athlete, weeks, random.Random(seed))
+
+    def _generate(self, athletes: int, per_athlete: int, weeks: int, rng):
+        now = datetime.now().replace(microsecond=0)
+        self.athletes = []
+        self.activities = {}
+
+        for i in range(athletes):
+            athlete = {'athlete_id': 1000 + i, 'athlete_name': f'Atleta {i:03d}'}
+            athlete['activities'] = []
+            for _ in range(per_athlete):
+                variant = rng.choices(VARIANTS, VARIANT_WEIGHTS)[0]
+                moving_time = rng.randint(15 * 60, 150 * 60)
+                minutes_ago = rng.randint(0, weeks * 7 * 1440)
+                activity = {
+                    'activity_id': 10_000_000 + len(self.activities),
+                    'athlete_id': athlete['athlete_id'],
+                    'athlete_name': athlete['athlete_name'],
+                    'variant': variant,
+                    'activity_type': rng.choice(ACTIVITY_TYPES[variant]),
+                    'activity_name': f'Treino {len(self.activities)}',
+                    'location': rng.choice(['São Paulo, SP', 'Curitiba, PR', None]),
+                    'date_time': now - timedelta(minutes=minutes_ago),
+                    'moving_time': moving_time,
+                    'elapsed_time': moving_time + rng.randint(0, 900),
+                    'distance': rng.uniform(2, 60),
+                    'elevation': rng.randint(0, 900),
+                    'calories': rng.randint(80, 2500),
+                }
+                athlete['activities'].append(activity)
+                self.activities[activity['activity_id']] = activity
+            self.athletes.append(athlete)
+
+        self.feed = sorted(
+            self.activities.values(), key=lambda a: a['date_time'], reverse=True
+        )
+
+    def render(self, path: str) -> tuple:
+        """Retorna o status e o HTML de uma rota.
+
+        Args:
+            path (str): Caminho da URL, sem o host.
+
+        Returns:
+            tuple: Código HTTP e HTML da página.
+        """
+        page = re.search(r'[?&]page=(\d+)', path)
+        interval = re.search(r'[?&]interval=(\d+)', path)
+        path = path.split('?')[0].split('#')[0].rstrip('/')
+
+        if self.recorded:
+            file = os.path.join(self.recorded, path.lstrip('/') + '.html')
+            if os.path.isfile(file):
+                with open(file, encoding='utf-8') as page:
+                    return 200, page.read()
+
+        if match := re.fullmatch(r'/activities/(\d+)(/overview)?', path):
+            activity = self.activities.get(int(match.group(1)))
+            if activity:
+                return 200, activity_page(activity)
+        elif match := re.fullmatch(r'/athletes/(\d+)(/interval)?', path):
+            for athlete in self.athletes:
+                if athlete['athlete_id'] != int(match.group(1)):
+                    continue
+                if match.group(2) is None:
+                    return 200, athlete_page()
+                if interval:
+                    return 200, interval_page(
+                        athlete['activities'], int(interval.group(1))
+                    )
+        elif re.fullmatch(r'/clubs/\d+/members', path):
+            return 200, members_page(
+                self.athletes, int(page.group(1)) if page else 1, self.members_per_page
+            )
+        elif re.fullmatch(r'/clubs/\d+/recent_activity', path):
+            return 200, feed_page(self.feed)
+        elif path in ('', '/dashboard'):
+            return 200, _page('Dashboard', '<div id="dashboard"></div>')
+        return 404, _page('Not Found', '<h1>Not Found</h1>')
+
+    def start(self) -> str:
+        """Inicia o servidor em uma porta livre e retorna a URL base."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, body = stub.render(self.path)
+                content = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self) -> 'StravaStub':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
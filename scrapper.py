@@ -1,34 +1,12 @@
 import argparse
 import logging
-import os
 
 import pandas as pd
-from dotenv import load_dotenv
-from tqdm import tqdm
 
-from src.get_score import Scorer
-from src.get_scraping import StravaScraper
-from src.get_utils import import_all_data
-
-logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
-
-PATH_TO_DATA = "data/"
-
-
-def load_env_vars():
-    """Carrega variáveis de ambiente e valida presença de credenciais."""
-    load_dotenv()
-    email = os.getenv("EMAIL")
-    password = os.getenv("PASSWORD")
-
-    if not email or not password:
-        logging.error("As variáveis de ambiente EMAIL e PASSWORD são obrigatórias.")
-        logging.error(
-            "Certifique-se de que o arquivo .env está configurado corretamente."
-        )
-        exit(1)
-
-    return email, password
+from src.get_leaderboard import PERIODS, Leaderboard
+from src.get_metrics import METRICS
+from src.get_score import IncrementalScorer
+from src.get_utils import PATH_TO_DATA, load_activity_data
 
 
 def parse_arguments():
@@ -37,120 +15,364 @@ def parse_arguments():
         description="Script de scraping e pontuação do Strava Club."
     )
     parser.add_argument(
-        "--club-id", type=int, required=True, help="ID do clube Strava."
+        "--club-id",
+        type=int,
+        nargs="+",
+        required=False,
+        help="ID do clube Strava. Com --shards, aceita vários clubes.",
     )
     parser.add_argument(
         "--week",
         type=int,
-        required=False,
-        help="Número de semanas para coletar atividades.",
+        default=1,
+        help="Número de semanas para coletar atividades. Padrão é 1.",
     )
     parser.add_argument(
         "--score", action="store_true", help="Se passado, executa a pontuação."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de páginas simultâneas para coletar atividades. Cada uma segue "
+        "o ritmo de --min-interval. Padrão é 1.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Limite global de navegações simultâneas. Padrão é o número de workers.",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=1.0,
+        help="Intervalo mínimo, em segundos, entre requisições de cada worker ao "
+        "Strava; o limitador é compartilhado, então o intervalo entre requisições "
+        "é este dividido por --workers. Aumenta sozinho quando o Strava limita a "
+        "coleta. Padrão é 1.0.",
+    )
 
-    return parser.parse_args()
-
-
-def scrape_club_members(scraper: object, club_id: int) -> list:
-    """Coleta membros do clube e retorna uma lista de IDs.
+    parser.add_argument(
+        "--extraction",
+        choices=["script", "locator"],
+        default="script",
+        help="Modo de extração dos dados da atividade: 'script' lê todos os campos "
+        "em uma única chamada à página, 'locator' consulta campo a campo. Padrão é 'script'.",
+    )
 
-    Args:
-        scraper (object): Objeto StravaScraper instanciado.
-        club_id (int): Código do clube Strava.
+    parser.add_argument(
+        "--fetch",
+        choices=["browser", "http"],
+        default="browser",
+        help="Como buscar as páginas: 'browser' usa só o Chromium; 'http' usa um "
+        "cliente HTTP/2 com a sessão do navegador e só recorre ao Chromium quando a "
+        "página depende de JavaScript. Padrão é 'browser'.",
+    )
+    parser.add_argument(
+        "--http-connections",
+        type=int,
+        default=10,
+        help="Com --fetch http, máximo de conexões simultâneas do cliente HTTP, "
+        "usadas por exemplo para ler as páginas da lista de membros em paralelo. "
+        "Nunca é menor que --workers. Padrão é 10.",
+    )
+    parser.add_argument(
+        "--lean",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Perfil enxuto do navegador: bloqueia imagens, mídias, fontes, mapas "
+        "e scripts de terceiros que a coleta não lê. Padrão é ativado; use "
+        "--no-lean para carregar as páginas completas.",
+    )
+    parser.add_argument(
+        "--block-types",
+        nargs="+",
+        default=None,
+        help="Tipos de recurso bloqueados no perfil enxuto (por exemplo, image "
+        "media font). Padrão é image, media e font.",
+    )
+    parser.add_argument(
+        "--block-domains",
+        nargs="+",
+        default=None,
+        help="Domínios bloqueados no perfil enxuto, com subdomínios e curingas. "
+        "Padrão é a lista BLOCKED_DOMAINS de src/get_scraping.py.",
+    )
+    parser.add_argument(
+        "--discovery",
+        choices=["athlete", "feed"],
+        default="athlete",
+        help="Como descobrir as atividades: 'athlete' abre a página de cada atleta "
+        "em cada semana; 'feed' percorre uma vez o feed de atividades recentes do "
+        "clube até passar do início da janela. Padrão é 'athlete'.",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Executa as etapas da coleta em paralelo, ligadas por filas: os "
+        "detalhes de um atleta são coletados enquanto as atividades do próximo "
+        "são descobertas. Lista os membros no navegador principal e o fecha; "
+        "depois usa um navegador para a descoberta e um por worker.",
+    )
+    parser.add_argument(
+        "--backfill-weeks",
+        type=int,
+        default=4,
+        help="Número de semanas coletadas para os atletas que entraram no clube "
+        "desde a última execução. Os demais são coletados só com --week. Use 0 "
+        "para coletar os novos como os demais. Padrão é 4.",
+    )
+    parser.add_argument(
+        "--deep-recheck-days",
+        type=float,
+        default=30,
+        help="Dias após os quais as semanas já percorridas de cada atleta são "
+        "abertas de novo. Entre essas passagens, só as semanas abertas e as novas "
+        "na janela de --week são abertas; use 0 para sempre percorrer todas. "
+        "Padrão é 30.",
+    )
+    parser.add_argument(
+        "--refresh-hours",
+        type=float,
+        default=168,
+        help="Idade, em horas, a partir da qual uma atividade já coletada é "
+        "coletada novamente. Use 0 para recoletar tudo. Padrão é 168 (7 dias).",
+    )
 
-    Raises:
-        ValueError: No caso de não encontrar nenhum atleta no clube.
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retoma a última coleta interrompida a partir do staging em data/staging/.",
+    )
 
-    Returns:
-        list: Lista de IDs dos atletas.
-    """
-    logging.info(f"Coletando membros do clube {club_id}...")
+    parser.add_argument(
+        "--full-score",
+        action="store_true",
+        help="Com --score, recalcula a pontuação de todo o histórico em vez de só "
+        "das semanas com atividades novas.",
+    )
 
-    members_df = scraper.get_club_members(club_id)
-    members_df.to_parquet(PATH_TO_DATA + "members.parquet")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PATH_TO_DATA + "profile.json",
+        default=None,
+        help="Mede o tempo de cada etapa e campo, exibe um resumo ao final e grava "
+        "as métricas no arquivo informado. Padrão é data/profile.json.",
+    )
 
-    members_list = members_df["athlete_id"].tolist()
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Guarda o HTML de cada atividade coletada, comprimido, em data/cache/.",
+    )
 
-    if not members_list:
-        raise ValueError(f"Nenhum atleta encontrado no clube {club_id}")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=1024,
+        help="Tamanho máximo do cache de páginas, em MB; as coletas mais antigas "
+        "são descartadas ao passar do limite. Padrão é 1024.",
+    )
 
-    logging.info(f"Foram encontrados {len(members_list)} atletas no clube {club_id}.")
-    return members_list
+    parser.add_argument(
+        "--reparse",
+        action="store_true",
+        help="Refaz a extração a partir das páginas do cache, sem acessar o Strava, "
+        "e regrava os arquivos semanais.",
+    )
 
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Divide os membros dos clubes entre processos, cada um com seu "
+        "navegador e sua sessão em user_data/shard_NN/. Padrão é 1 (sem divisão).",
+    )
 
-def scrape_athlete_activities(
-    scraper: object, members_list: list, weeks: int = 1
-) -> pd.DataFrame:
-    """Coleta atividades dos atletas e retorna um DataFrame.
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Não usa o navegador do daemon, mesmo que haja um em execução.",
+    )
 
-    Args:
-        scraper (object): Objeto StravaScraper instanciado.
-        members_list (list): Lista de IDs dos atletas.
-        weeks (int): Número de semanas para coletar atividades. Padrão é 1.
+    subparsers = parser.add_subparsers(dest="command")
+    leaderboard = subparsers.add_parser(
+        "leaderboard", help="Consulta o ranking sem iniciar o navegador."
+    )
+    leaderboard.add_argument(
+        "--period",
+        choices=PERIODS,
+        default="season",
+        help="Período do ranking: week, month ou season. Padrão é season.",
+    )
+    leaderboard.add_argument(
+        "--key",
+        default=None,
+        help="Período consultado ('YYYYWW', 'YYYY-MM' ou 'YYYY'). Padrão é o mais recente.",
+    )
+    leaderboard.add_argument(
+        "--top", type=int, default=10, help="Quantidade de atletas exibidos."
+    )
+    leaderboard.add_argument(
+        "--athlete", type=int, default=None, help="Mostra a posição de um atleta."
+    )
 
-    Returns:
-        pd.DataFrame: DataFrame com os dados das atividades.
-    """
-    all_activity_dfs = []
+    score = subparsers.add_parser(
+        "score",
+        help="Recalcula a pontuação e o ranking a partir das partições salvas, "
+        "sem iniciar o navegador.",
+    )
+    score.add_argument(
+        "--weeks",
+        nargs="+",
+        default=None,
+        help="Recalcula só as semanas informadas ('YYYYWW'). Padrão é todo o histórico.",
+    )
 
-    for athlete_id in tqdm(
-        members_list, total=len(members_list), desc="Coletando atividades dos atletas"
-    ):
-        activities = scraper.get_athlete_activities(athlete_id, weeks=weeks)
+    daemon = subparsers.add_parser(
+        "daemon",
+        help="Mantém um navegador logado aberto para as próximas coletas se conectarem.",
+    )
+    daemon.add_argument(
+        "--port", type=int, default=9222, help="Porta CDP do navegador. Padrão é 9222."
+    )
+    daemon.add_argument(
+        "--refresh-minutes",
+        type=float,
+        default=30,
+        help="Intervalo, em minutos, da renovação da sessão. Padrão é 30.",
+    )
+    daemon.add_argument(
+        "--headed", action="store_true", help="Mostra a janela do navegador."
+    )
 
-        for activity_id in tqdm(
-            activities["activities"],
-            desc=f"Atividades do atleta {athlete_id}",
-            leave=False,
-        ):
-            activity_df = scraper.activity_data(athlete_id, activity_id)
-            all_activity_dfs.append(activity_df)
+    args = parser.parse_args()
+    if args.command is None and args.club_id is None and not args.reparse:
+        parser.error("o argumento --club-id é obrigatório")
 
-    if all_activity_dfs:
-        return pd.concat(all_activity_dfs, ignore_index=True)
-    return pd.DataFrame()
+    args.clubs = args.club_id or []
+    args.club_id = args.clubs[0] if args.clubs else None
+    if len(args.clubs) > 1 and args.shards <= 1:
+        parser.error("use --shards para coletar mais de um clube")
+    if args.shards > 1 and (args.pipeline or args.cache):
+        parser.error("--shards não pode ser usado com --pipeline ou --cache")
 
+    return args
 
-def save_weekly_activity_data(all_activity_df: pd.DataFrame):
-    """Salva os dados de atividades organizados por semana."""
-    weeks = all_activity_df["week"].unique()
 
-    for week in tqdm(weeks, desc="Salvando arquivos semanais"):
-        week_activity_df = all_activity_df[all_activity_df["week"] == week]
-        week_activity_df.to_parquet(PATH_TO_DATA + f"activity_week_{week}.parquet")
+def calculate_score(all_activity_df: pd.DataFrame = None, full: bool = False):
+    """Executa a pontuação dos atletas.
 
+    Se já houver uma pontuação salva e forem informadas as atividades coletadas
+    nesta execução, só as semanas dessas atividades são recalculadas.
 
-def calculate_score():
-    """Executa a pontuação dos atletas."""
+    Args:
+        all_activity_df (pd.DataFrame, optional): Atividades novas ou alteradas.
+        full (bool, optional): Se True, recalcula todo o histórico. Padrão é False.
+    """
     logging.info("Calculando pontuação...")
     try:
-        data = import_all_data()
-        score_df = Scorer(data).score()
-        score_df.to_parquet(PATH_TO_DATA + "score.parquet")
+        scorer = IncrementalScorer(PATH_TO_DATA)
+        leaderboard = Leaderboard(PATH_TO_DATA)
+
+        if full or all_activity_df is None or not scorer.has_state():
+            leaderboard.rebuild(scorer.rebuild())
+        elif not all_activity_df.empty:
+            touched = scorer.touched(all_activity_df)
+            leaderboard.load().replace(touched, scorer.update(all_activity_df, touched))
+        leaderboard.save()
         logging.info("Pontuação salva com sucesso.")
     except Exception as e:
         logging.error(f"Erro ao calcular a pontuação: {e}")
 
 
+def show_leaderboard(args: argparse.Namespace):
+    """Exibe o ranking salvo, ou a posição de um atleta."""
+    leaderboard = Leaderboard(PATH_TO_DATA).load()
+    key = args.key or leaderboard.latest(args.period)
+
+    if args.athlete is not None:
+        result = leaderboard.rank(args.athlete, args.period, key)
+        if result is None:
+            print(f"Atleta {args.athlete} sem pontos em {key}.")
+        else:
+            print(
+                f"Atleta {args.athlete} em {key}: {result['rank']}º lugar com "
+                f"{result['points']:.0f} pontos, {result['points_to_next']:.0f} "
+                "pontos atrás do próximo colocado."
+            )
+        return
+
+    print(f"Ranking {args.period} {key}")
+    print(leaderboard.top(args.top, args.period, key).to_string(index=False))
+
+
+def rescore(args: argparse.Namespace):
+    """Recalcula a pontuação a partir das partições já salvas, sem coletar."""
+    if args.weeks is None:
+        calculate_score(full=True)
+        return
+
+    touched = load_activity_data(
+        PATH_TO_DATA, columns=["athlete_id", "week"], weeks=args.weeks
+    )
+    logging.info(f"{len(touched)} atividades nas semanas {', '.join(args.weeks)}.")
+    calculate_score(touched)
+
+
+def write_profile(path: str):
+    """Exibe o resumo dos tempos por etapa e grava as métricas em JSON."""
+    summary = METRICS.summary()
+    if summary.empty:
+        return
+    print(summary.to_string(index=False, float_format="{:.1f}".format))
+    METRICS.save(path)
+    logging.info(f"Métricas de tempo salvas em {path}.")
+
+
 def main():
-    email, password = load_env_vars()
     args = parse_arguments()
+    if args.command == "leaderboard":
+        show_leaderboard(args)
+        return
+
+    # A coleta, o navegador e as credenciais só são carregados fora do
+    # subcomando `score`, que usa apenas o pandas e as partições salvas.
+    if args.command != "score":
+        from src.get_commands import (
+            reparse_cache,
+            run_daemon,
+            run_scraping,
+            run_sharded,
+        )
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 
-    scraper = StravaScraper(email, password)
-    scraper.start_browser()
+    if args.command == "daemon":
+        run_daemon(args)
+        return
 
+    METRICS.enabled = args.profile is not None
     try:
-        members_list = scrape_club_members(scraper, args.club_id)
-        all_activity_df = scrape_athlete_activities(scraper, members_list, args.week)
-
-        if not all_activity_df.empty:
-            save_weekly_activity_data(all_activity_df)
+        if args.command == "score":
+            with METRICS.span("stage.score"):
+                rescore(args)
+            return
+
+        if args.reparse:
+            all_activity_df = reparse_cache()
+        elif args.shards > 1:
+            all_activity_df = run_sharded(args)
+        else:
+            all_activity_df = run_scraping(args)
+
+        if args.score:
+            with METRICS.span("stage.score"):
+                calculate_score(all_activity_df, full=args.full_score)
     finally:
-        scraper.close_browser()
-
-    if args.score:
-        calculate_score()
+        if args.profile:
+            write_profile(args.profile)
 
 
 if __name__ == "__main__":
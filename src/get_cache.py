@@ -0,0 +1,187 @@
+import bisect
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+from lxml import etree, html
+
+
+logger = logging.getLogger(__name__)
+
+# Elementos que a extração nunca lê e que são removidos antes de guardar a página.
+STRIPPED_TAGS = ['script', 'style', 'noscript', 'svg', 'iframe', 'template', 'link']
+
+
+def relevant_html(content: str) -> str:
+    """Remove da página os elementos que a extração não usa.
+
+    Args:
+        content (str): HTML completo da página.
+
+    Returns:
+        str: HTML sem scripts, estilos, SVGs e afins.
+    """
+    tree = html.fromstring(content)
+    etree.strip_elements(tree, *STRIPPED_TAGS, with_tail=False)
+    for meta in tree.xpath('//head/meta'):
+        meta.getparent().remove(meta)
+    return html.tostring(tree, encoding='unicode')
+
+
+class PageCache:
+    """Cache endereçado por conteúdo das páginas de atividade já baixadas.
+
+    Cada página é reduzida ao HTML relevante, comprimida com gzip e gravada em
+    `objects/<hash[:2]>/<hash>.html.gz`, onde o hash é o SHA-256 do conteúdo;
+    páginas idênticas ocupam um único arquivo. O índice (`index.parquet`) liga
+    cada coleta, por `activity_id` e horário, ao hash da página. Quando o total
+    comprimido passa de `max_bytes`, as coletas mais antigas são descartadas, e
+    cada arquivo é apagado quando nenhuma coleta restante aponta para ele.
+
+    Args:
+        folder (str, optional): Pasta do cache. Padrão é 'data/cache/'.
+        max_bytes (int, optional): Tamanho máximo das páginas em disco. Padrão é 1 GiB.
+    """
+
+    COLUMNS = ['activity_id', 'athlete_id', 'fetched_at', 'sha256', 'size']
+
+    def __init__(self, folder: str = 'data/cache/', max_bytes: int = 2**30):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(folder, 'index.parquet')
+        self.entries = deque()
+        self.sizes = {}
+        self.refs = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.folder, 'objects', sha256[:2], sha256 + '.html.gz')
+
+    def load(self) -> 'PageCache':
+        """Carrega o índice do cache, se existir.
+
+        Coletas cujo arquivo não existe mais, por exemplo descartadas em uma
+        execução interrompida antes de gravar o índice, são ignoradas.
+
+        Returns:
+            PageCache: A própria instância, para encadear chamadas.
+        """
+        if os.path.exists(self.index_path):
+            df = pd.read_parquet(self.index_path)
+            exists = {
+                sha256: os.path.exists(self._blob_path(sha256))
+                for sha256 in df['sha256'].unique()
+            }
+            df = df[df['sha256'].map(exists)].sort_values('fetched_at', kind='stable')
+            self.entries = deque(df[self.COLUMNS].to_dict('records'))
+            self.sizes = dict(zip(df['sha256'], df['size']))
+            self.refs = df['sha256'].value_counts().to_dict()
+            self._bytes = sum(self.sizes.values())
+        logger.info(f'Cache de páginas carregado com {len(self.entries)} páginas.')
+        return self
+
+    def save(self):
+        """Grava o índice do cache em disco."""
+        with self._lock:
+            df = pd.DataFrame(self.entries, columns=self.COLUMNS)
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self.index_path + '.tmp'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def put(
+        self, athlete_id, activity_id, content: str, fetched_at: datetime = None
+    ) -> str:
+        """Guarda a página de uma atividade.
+
+        Args:
+            athlete_id (int | str): ID do atleta.
+            activity_id (int | str): ID da atividade.
+            content (str): HTML da página.
+            fetched_at (datetime, optional): Horário da coleta. Padrão é agora.
+
+        Returns:
+            str: Hash SHA-256 do conteúdo guardado.
+        """
+        data = relevant_html(content).encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256)
+
+        with self._lock:
+            if sha256 not in self.sizes:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + '.tmp', 'wb') as file:
+                    file.write(gzip.compress(data, compresslevel=6))
+                os.replace(path + '.tmp', path)
+                self.sizes[sha256] = os.path.getsize(path)
+                self._bytes += self.sizes[sha256]
+
+            entry = {
+                'activity_id': int(activity_id),
+                'athlete_id': int(athlete_id),
+                'fetched_at': fetched_at or datetime.now(),
+                'sha256': sha256,
+                'size': self.sizes[sha256],
+            }
+            # As coletas chegam quase sempre em ordem; só um horário anterior
+            # ao da última entrada precisa ser encaixado no meio da fila.
+            if self.entries and entry['fetched_at'] < self.entries[-1]['fetched_at']:
+                position = bisect.bisect_right(
+                    self.entries,
+                    entry['fetched_at'],
+                    key=lambda item: item['fetched_at'],
+                )
+                self.entries.insert(position, entry)
+            else:
+                self.entries.append(entry)
+            self.refs[sha256] = self.refs.get(sha256, 0) + 1
+            self._evict()
+        return sha256
+
+    def store(self, athlete_id, activity_id, content: str):
+        """Como `put`, mas só registra o erro, sem interromper a coleta."""
+        try:
+            self.put(athlete_id, activity_id, content)
+        except Exception as e:
+            logger.warning(f'{athlete_id}: {activity_id} - página não guardada: {e}')
+
+    def _evict(self):
+        while self.entries and self._bytes > self.max_bytes:
+            sha256 = self.entries.popleft()['sha256']
+            self.refs[sha256] -= 1
+            if self.refs[sha256] == 0:
+                del self.refs[sha256]
+                self._bytes -= self.sizes.pop(sha256)
+                path = self._blob_path(sha256)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def read(self, sha256: str) -> str:
+        """Lê uma página do cache pelo hash."""
+        with open(self._blob_path(sha256), 'rb') as file:
+            return gzip.decompress(file.read()).decode('utf-8')
+
+    def latest(self) -> list:
+        """Retorna a coleta mais recente de cada atividade.
+
+        Returns:
+            list: Entradas do índice, uma por atividade, com 'activity_id',
+            'athlete_id', 'fetched_at' e 'sha256'.
+        """
+        with self._lock:
+            latest = {}
+            for entry in self.entries:
+                current = latest.get(entry['activity_id'])
+                if current is None or entry['fetched_at'] >= current['fetched_at']:
+                    latest[entry['activity_id']] = entry
+        return list(latest.values())
@@ -0,0 +1,192 @@
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from src.get_metrics import METRICS
+from src.get_records import ActivityBuffer
+
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Área de staging e manifesto para retomar coletas interrompidas.
+
+    As atividades coletadas são gravadas em lotes, em arquivos `part_*.parquet`
+    que nunca são reescritos. O manifesto (`manifest.json`) guarda os parâmetros
+    da execução, e o progresso (`progress.jsonl`) recebe uma linha a cada lote
+    gravado e a cada atleta concluído, sem reescrever o que já foi registrado.
+    Cada linha é gravada depois dos dados, de modo que tudo o que o progresso
+    marca como feito já está em disco. Os atletas e atividades concluídos ficam
+    em conjuntos na memória.
+
+    Args:
+        folder (str, optional): Pasta de staging. Padrão é 'data/staging/'.
+        batch_size (int, optional): Quantidade de atividades por lote gravado. Padrão é 25.
+    """
+
+    def __init__(self, folder: str = 'data/staging/', batch_size: int = 25):
+        self.folder = folder
+        self.batch_size = batch_size
+        self.manifest_path = os.path.join(folder, 'manifest.json')
+        self.progress_path = os.path.join(folder, 'progress.jsonl')
+        self.manifest = {}
+        self.athletes = set()
+        self.activities = set()
+        self.parts = []
+        self._buffer = ActivityBuffer()
+        self._lock = threading.RLock()
+
+    def start(self, config: dict, resume: bool = False) -> 'Checkpoint':
+        """Inicia uma nova execução ou retoma a anterior.
+
+        Args:
+            config (dict): Parâmetros da execução (por exemplo, clube e semanas).
+            resume (bool, optional): Se True, retoma a execução registrada no
+                manifesto. Padrão é False.
+
+        Raises:
+            ValueError: Se os parâmetros da execução retomada forem diferentes.
+
+        Returns:
+            Checkpoint: A própria instância, para encadear chamadas.
+        """
+        if resume and os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as file:
+                self.manifest = json.load(file)
+
+            if self.manifest['config'] != config:
+                raise ValueError(
+                    f"A execução salva usa {self.manifest['config']}, mas foi pedido {config}."
+                )
+            self._read_progress()
+            logger.info(
+                f"Retomando a execução {self.manifest['run_id']}: "
+                f"{len(self.athletes)} atletas e "
+                f"{len(self.activities)} atividades já concluídos."
+            )
+            return self
+
+        if resume:
+            logger.info('Nenhuma execução anterior encontrada, iniciando do zero.')
+
+        self.clear()
+        os.makedirs(self.folder, exist_ok=True)
+        self.manifest = {
+            'run_id': datetime.now().strftime('%Y%m%d%H%M%S'),
+            'config': config,
+        }
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.manifest, file)
+        os.replace(tmp_path, self.manifest_path)
+        return self
+
+    def _read_progress(self):
+        """Carrega o progresso gravado.
+
+        Uma última linha incompleta, de uma execução interrompida no meio da
+        gravação, é descartada do arquivo para não se juntar à próxima linha.
+        """
+        if not os.path.exists(self.progress_path):
+            return
+        size = 0
+        with open(self.progress_path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                size += len(line)
+                if 'part' in entry:
+                    self.parts.append(entry['part'])
+                    self.activities.update(entry['activities'])
+                if 'athlete' in entry:
+                    self.athletes.add(entry['athlete'])
+        os.truncate(self.progress_path, size)
+
+    def _append_progress(self, entry: dict):
+        with open(self.progress_path, 'a') as file:
+            file.write(json.dumps(entry) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def is_athlete_done(self, athlete_id) -> bool:
+        return str(athlete_id) in self.athletes
+
+    def is_activity_done(self, activity_id) -> bool:
+        return str(activity_id) in self.activities
+
+    def add(self, record: dict):
+        """Adiciona uma atividade coletada ao lote atual, gravando-o se estiver cheio.
+
+        Args:
+            record (dict): Registro da atividade.
+        """
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def mark_athlete_done(self, athlete_id):
+        """Grava o lote pendente e marca o atleta como concluído.
+
+        Args:
+            athlete_id (int | str): ID do atleta.
+        """
+        with self._lock:
+            self.flush()
+            self.athletes.add(str(athlete_id))
+            self._append_progress({'athlete': str(athlete_id)})
+
+    def flush(self):
+        """Grava o lote pendente em um novo arquivo de staging."""
+        with self._lock:
+            if not len(self._buffer):
+                return
+
+            part = f"part_{len(self.parts):05d}.parquet"
+            path = os.path.join(self.folder, part)
+            batch = self._buffer.to_frame()
+            with METRICS.span('parquet.staging'):
+                batch.to_parquet(path + '.tmp')
+                os.replace(path + '.tmp', path)
+
+            activities = batch['activity_id'].astype(str).tolist()
+            self._append_progress({'part': part, 'activities': activities})
+            self.parts.append(part)
+            self.activities.update(activities)
+            self._buffer.clear()
+
+    def load(self) -> pd.DataFrame:
+        """Lê todas as atividades gravadas no staging, desta execução e das anteriores.
+
+        Returns:
+            pd.DataFrame: DataFrame com as atividades em staging.
+        """
+        self.flush()
+        frames = [
+            pd.read_parquet(os.path.join(self.folder, part)) for part in self.parts
+        ]
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        return pd.DataFrame()
+
+    def clear(self):
+        """Remove a área de staging, após os dados serem salvos nas partições."""
+        for path in glob.glob(os.path.join(self.folder, 'part_*.parquet*')):
+            os.remove(path)
+        for path in (self.manifest_path, self.progress_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.manifest = {}
+        self.athletes = set()
+        self.activities = set()
+        self.parts = []
@@ -0,0 +1,524 @@
+import argparse
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from functools import partial
+
+import pandas as pd
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+from src.get_cache import PageCache
+from src.get_checkpoint import Checkpoint
+from src.get_daemon import BrowserDaemon, daemon_endpoint
+from src.get_http import HttpFetcher, parse_activity_html
+from src.get_index import ActivityIndex
+from src.get_limiter import AdaptiveLimiter, new_limiter
+from src.get_metrics import METRICS
+from src.get_pipeline import ActivityPipeline
+from src.get_pool import ScraperPool
+from src.get_records import ActivityBuffer, build_activity_frame
+from src.get_roster import Roster
+from src.get_scraping import StravaScraper, feed_by_athlete
+from src.get_shards import ShardRunner, merge_feeds
+from src.get_watermarks import CrawlWatermarks
+from src.get_utils import PATH_TO_DATA, save_activity_data
+
+
+def load_env_vars():
+    """Carrega variáveis de ambiente e valida presença de credenciais."""
+    load_dotenv()
+    email = os.getenv("EMAIL")
+    password = os.getenv("PASSWORD")
+
+    if not email or not password:
+        logging.error("As variáveis de ambiente EMAIL e PASSWORD são obrigatórias.")
+        logging.error(
+            "Certifique-se de que o arquivo .env está configurado corretamente."
+        )
+        exit(1)
+
+    return email, password
+
+
+def scrape_club_members(scraper: object, club_id: int, roster: Roster = None) -> list:
+    """Coleta membros do clube e retorna uma lista de IDs.
+
+    Args:
+        scraper (object): Objeto StravaScraper instanciado.
+        club_id (int): Código do clube Strava.
+        roster (Roster, optional): Lista dos membros salvos, comparada com a
+            coletada para identificar os atletas que entraram no clube.
+
+    Raises:
+        ValueError: No caso de não encontrar nenhum atleta no clube.
+
+    Returns:
+        list: Lista de IDs dos atletas.
+    """
+    logging.info(f"Coletando membros do clube {club_id}...")
+
+    members_df = scraper.get_club_members(club_id)
+    if roster:
+        roster.diff(club_id, members_df)
+
+    members_list = members_df["athlete_id"].tolist()
+
+    if not members_list:
+        raise ValueError(f"Nenhum atleta encontrado no clube {club_id}")
+
+    logging.info(f"Foram encontrados {len(members_list)} atletas no clube {club_id}.")
+    return members_list
+
+
+def scrape_athlete_activities(
+    scraper: object,
+    members_list: list,
+    weeks: int = 1,
+    pool: ScraperPool = None,
+    index: ActivityIndex = None,
+    refresh_ttl: timedelta = None,
+    checkpoint: Checkpoint = None,
+    feed: dict = None,
+    roster: Roster = None,
+) -> pd.DataFrame:
+    """Coleta atividades dos atletas e retorna um DataFrame.
+
+    Args:
+        scraper (object): Objeto StravaScraper instanciado.
+        members_list (list): Lista de IDs dos atletas.
+        weeks (int): Número de semanas para coletar atividades. Padrão é 1.
+        pool (ScraperPool, optional): Pool de páginas para coletar os detalhes
+            das atividades em paralelo. Se não informado, coleta em sequência.
+        index (ActivityIndex, optional): Índice das atividades já coletadas. Se
+            informado, só são abertas as atividades novas ou desatualizadas.
+        refresh_ttl (timedelta, optional): Idade máxima de uma coleta antes de
+            ser refeita. Se None, atividades conhecidas não são recoletadas.
+        checkpoint (Checkpoint, optional): Staging onde as atividades são
+            gravadas em lotes durante a coleta. Atletas e atividades já
+            concluídos no checkpoint são pulados, e o DataFrame retornado
+            inclui também o que foi coletado em execuções anteriores.
+        feed (dict, optional): IDs das atividades por atleta, lidos do feed do
+            clube (ver `feed_by_athlete`). Se informado, as páginas dos atletas
+            não são abertas.
+        roster (Roster, optional): Lista dos membros. Os atletas que entraram no
+            clube são coletados com `roster.backfill_weeks` semanas, sempre
+            pelas páginas dos atletas.
+
+    Returns:
+        pd.DataFrame: DataFrame com os dados das atividades.
+    """
+    buffer = ActivityBuffer()
+    jobs = []
+    pending = {}
+    skipped = 0
+
+    for athlete_id in tqdm(
+        members_list, total=len(members_list), desc="Coletando atividades dos atletas"
+    ):
+        if checkpoint and checkpoint.is_athlete_done(athlete_id):
+            continue
+
+        athlete_weeks = roster.weeks_for(athlete_id, weeks) if roster else weeks
+        if feed is not None and athlete_weeks == weeks:
+            found = feed.get(str(athlete_id), [])
+        else:
+            found = scraper.get_athlete_activities(athlete_id, weeks=athlete_weeks)[
+                "activities"
+            ]
+
+        activity_ids = found
+        if index:
+            activity_ids = [
+                activity_id
+                for activity_id in activity_ids
+                if index.needs_scrape(activity_id, refresh_ttl)
+            ]
+            skipped += len(found) - len(activity_ids)
+        if checkpoint:
+            activity_ids = [
+                activity_id
+                for activity_id in activity_ids
+                if not checkpoint.is_activity_done(activity_id)
+            ]
+
+        if pool:
+            jobs.extend((athlete_id, activity_id) for activity_id in activity_ids)
+            pending[athlete_id] = len(activity_ids)
+            if checkpoint and not activity_ids:
+                checkpoint.mark_athlete_done(athlete_id)
+            continue
+
+        for activity_id in tqdm(
+            activity_ids,
+            desc=f"Atividades do atleta {athlete_id}",
+            leave=False,
+        ):
+            record = scraper.activity_record(athlete_id, activity_id)
+            if checkpoint:
+                checkpoint.add(record)
+            else:
+                buffer.append(record)
+
+        if checkpoint:
+            checkpoint.mark_athlete_done(athlete_id)
+
+    if pool:
+        lock = threading.Lock()
+
+        def _record(job: tuple, record: dict):
+            athlete_id, _ = job
+            checkpoint.add(record)
+            with lock:
+                pending[athlete_id] -= 1
+                done = pending[athlete_id] == 0
+            if done:
+                checkpoint.mark_athlete_done(athlete_id)
+
+        records = pool.run(jobs, on_result=_record if checkpoint else None)
+        if not checkpoint:
+            buffer.extend(records)
+
+    if index:
+        logging.info(f"{skipped} atividades já coletadas foram ignoradas.")
+
+    if checkpoint:
+        return checkpoint.load()
+    if len(buffer):
+        return buffer.to_frame()
+    return pd.DataFrame()
+
+
+def save_weekly_activity_data(all_activity_df: pd.DataFrame):
+    """Salva os dados de atividades organizados por semana.
+
+    As atividades já salvas na semana e que não foram coletadas nesta execução
+    são mantidas; as recoletadas são substituídas pela versão mais recente.
+    """
+    written = save_activity_data(all_activity_df, PATH_TO_DATA)
+    logging.info(f"{len(written)} arquivos semanais salvos.")
+
+
+def reparse_cache() -> pd.DataFrame:
+    """Refaz a extração das atividades a partir do cache de páginas, sem rede.
+
+    Para cada atividade, usa a coleta mais recente do cache. As linhas
+    reprocessadas recebem o horário do reprocessamento em `updated_at`, para
+    substituir nas partições as extraídas na coleta original.
+
+    Returns:
+        pd.DataFrame: Atividades reprocessadas.
+    """
+    cache = PageCache(PATH_TO_DATA + "cache/").load()
+    reparsed_at = datetime.now()
+    records = []
+    skipped = 0
+    for entry in tqdm(cache.latest(), desc="Reprocessando páginas"):
+        with METRICS.span("reparse.page"):
+            data = parse_activity_html(
+                cache.read(entry["sha256"]),
+                entry["athlete_id"],
+                entry["activity_id"],
+                StravaScraper.URL,
+            )
+        if data is None:
+            skipped += 1
+            continue
+        data["updated_at"] = reparsed_at
+        records.append(data)
+
+    logging.info(
+        f"{len(records)} atividades reprocessadas do cache; "
+        f"{skipped} páginas sem os dados no HTML."
+    )
+    all_activity_df = build_activity_frame(records)
+
+    with METRICS.span("stage.save"):
+        if not all_activity_df.empty:
+            save_weekly_activity_data(all_activity_df)
+            index = ActivityIndex(PATH_TO_DATA).load()
+            index.update(all_activity_df)
+            index.save()
+
+    return all_activity_df
+
+
+def start_scraper(
+    args: argparse.Namespace,
+    limiter: AdaptiveLimiter,
+    session_file: str = "user_data",
+    headless: bool = False,
+    cache: PageCache = None,
+    attach: bool = True,
+    watermarks: CrawlWatermarks = None,
+) -> StravaScraper:
+    """Cria e inicia o scraper com as opções da linha de comando.
+
+    Se `attach` for True e houver um daemon em execução (ver `BrowserDaemon`),
+    conecta ao navegador dele; senão, inicia um navegador local.
+    """
+    email, password = load_env_vars()
+
+    scraper = StravaScraper(
+        email,
+        password,
+        limiter=limiter,
+        extraction=args.extraction,
+        lean=args.lean,
+        blocked_types=args.block_types,
+        blocked_domains=args.block_domains,
+    )
+    scraper.cache = cache
+    scraper.watermarks = watermarks
+    endpoint = None
+    if attach and not args.no_daemon:
+        endpoint = daemon_endpoint(PATH_TO_DATA + "daemon.json")
+    if endpoint:
+        scraper.attach_browser(endpoint)
+    else:
+        scraper.start_browser(headless=headless, session_file=session_file)
+    if args.fetch == "http":
+        scraper.http = HttpFetcher.from_scraper(
+            scraper,
+            max_connections=max(args.workers, args.http_connections),
+            cache=scraper.cache,
+        )
+    return scraper
+
+
+def log_scraper_stats(scraper: StravaScraper):
+    """Registra no log as esperas, as requisições e os bloqueios da coleta."""
+    waits = scraper.wait_summary()
+    if not waits.empty:
+        logging.info(f"Tempos de espera por etapa:\n{waits.to_string(index=False)}")
+    routes = scraper.route_summary()
+    if not routes.empty:
+        logging.info(
+            f"Requisições do perfil enxuto por tipo:\n{routes.to_string(index=False)}"
+        )
+    throttled = scraper.limiter.summary()
+    if throttled:
+        logging.warning(f"Respostas limitadas pelo Strava: {throttled}")
+
+
+def close_scraper(scraper: StravaScraper):
+    scraper.close_browser()
+    if scraper.http:
+        scraper.http.close()
+    if scraper.cache:
+        scraper.cache.save()
+
+
+def scrape_shard(shard: dict) -> dict:
+    """Coleta as atividades de um grupo de atletas, em um processo separado.
+
+    O navegador usa a sessão própria do shard, completada com os cookies do
+    processo principal, e as atividades são gravadas no staging do shard. As
+    marcas de coleta e as métricas do `--profile` não são gravadas pelo shard,
+    e sim devolvidas ao processo principal, que as junta às dele.
+
+    Args:
+        shard (dict): Descrição do shard (ver `ShardRunner.plan`), com também
+            'args', 'cookies', 'feed' e 'roster'.
+
+    Returns:
+        dict: Marcas de coleta por atleta em 'watermarks' (ver
+        `CrawlWatermarks.entries`) e as métricas do shard em 'metrics' (ver
+        `Metrics.snapshot`).
+    """
+    args = shard["args"]
+    METRICS.enabled = args.profile is not None
+    limiter = new_limiter(args.min_interval, args.workers)
+    watermarks = CrawlWatermarks(PATH_TO_DATA, deep_days=args.deep_recheck_days).load()
+    scraper = start_scraper(
+        args,
+        limiter,
+        session_file=shard["user_data"],
+        headless=True,
+        attach=False,
+        watermarks=watermarks,
+    )
+    scraper.browser.add_cookies(shard["cookies"])
+
+    pool = None
+    if args.workers > 1:
+        pool = ScraperPool(
+            scraper,
+            size=args.workers,
+            max_concurrency=args.max_concurrency,
+            limiter=limiter,
+        )
+
+    checkpoint = Checkpoint(shard["folder"]).start(shard["config"], resume=args.resume)
+    try:
+        activity_df = scrape_athlete_activities(
+            scraper,
+            shard["members"],
+            args.week,
+            pool=pool,
+            index=ActivityIndex(PATH_TO_DATA).load(),
+            refresh_ttl=timedelta(hours=args.refresh_hours),
+            checkpoint=checkpoint,
+            feed=shard["feed"],
+            roster=shard["roster"],
+        )
+    finally:
+        log_scraper_stats(scraper)
+        close_scraper(scraper)
+    logging.info(f"Shard {shard['shard']}: {len(activity_df)} atividades no staging.")
+    return {"watermarks": watermarks.entries, "metrics": METRICS.snapshot()}
+
+
+def run_daemon(args: argparse.Namespace):
+    """Inicia o navegador do daemon e o mantém aberto até ser interrompido."""
+    email, password = load_env_vars()
+    # O perfil enxuto fica a cargo de cada coleta conectada, na página dela.
+    BrowserDaemon(
+        StravaScraper(email, password, lean=False),
+        port=args.port,
+        state_file=PATH_TO_DATA + "daemon.json",
+        refresh_minutes=args.refresh_minutes,
+    ).serve(headless=not args.headed)
+
+
+def run_sharded(args: argparse.Namespace) -> pd.DataFrame:
+    """Coleta as atividades de um ou mais clubes dividindo os membros entre processos.
+
+    O processo principal faz o login, lista os membros de cada clube (e o feed,
+    com `--discovery feed`) e reparte os atletas entre os shards. Ao final, o
+    staging de todos os shards é salvo nas partições semanais.
+
+    Returns:
+        pd.DataFrame: Atividades coletadas pelos shards.
+    """
+    limiter = new_limiter(args.min_interval, args.workers)
+    roster = Roster(PATH_TO_DATA, backfill_weeks=args.backfill_weeks).load()
+    watermarks = CrawlWatermarks(PATH_TO_DATA, deep_days=args.deep_recheck_days).load()
+    scraper = start_scraper(args, limiter)
+    try:
+        members_list = []
+        feeds = []
+        for club_id in args.clubs:
+            with METRICS.span("stage.members"):
+                members_list += scrape_club_members(scraper, club_id, roster)
+            if args.discovery == "feed":
+                with METRICS.span("stage.feed"):
+                    feeds.append(
+                        feed_by_athlete(scraper.get_club_feed(club_id, args.week))
+                    )
+        cookies = scraper.browser.cookies()
+    finally:
+        close_scraper(scraper)
+
+    runner = ShardRunner(args.shards, PATH_TO_DATA + "shards/")
+    shards = runner.plan(members_list, {"club_id": args.clubs, "week": args.week})
+    feed = merge_feeds(feeds) if args.discovery == "feed" else None
+    for shard in shards:
+        shard["args"] = args
+        shard["cookies"] = cookies
+        shard["feed"] = feed
+        shard["roster"] = roster
+    logging.info(
+        f"{len(shards)} shards com {sum(len(s['members']) for s in shards)} atletas."
+    )
+
+    with METRICS.span("stage.shards"):
+        results = runner.run(scrape_shard, shards)
+
+    with METRICS.span("stage.save"):
+        all_activity_df = runner.load(shards)
+        if not all_activity_df.empty:
+            save_weekly_activity_data(all_activity_df)
+            index = ActivityIndex(PATH_TO_DATA).load()
+            index.update(all_activity_df)
+            index.save()
+        roster.save()
+        for result in results:
+            watermarks.merge(result["watermarks"])
+            METRICS.merge(result["metrics"])
+        watermarks.save()
+        runner.clear(shards)
+
+    return all_activity_df
+
+
+def run_scraping(args: argparse.Namespace) -> pd.DataFrame:
+    """Coleta as atividades do clube.
+
+    Returns:
+        pd.DataFrame: Atividades coletadas nesta execução, já salvas nas partições.
+    """
+    limiter = new_limiter(args.min_interval, args.workers)
+    cache = None
+    if args.cache:
+        cache = PageCache(
+            PATH_TO_DATA + "cache/", max_bytes=args.cache_max_mb * 2**20
+        ).load()
+    watermarks = CrawlWatermarks(PATH_TO_DATA, deep_days=args.deep_recheck_days).load()
+    scraper = start_scraper(args, limiter, cache=cache, watermarks=watermarks)
+
+    pool = None
+    if args.workers > 1 or args.pipeline:
+        pool = ScraperPool(
+            scraper,
+            size=args.workers,
+            max_concurrency=args.max_concurrency,
+            limiter=limiter,
+        )
+
+    index = ActivityIndex(PATH_TO_DATA).load()
+    roster = Roster(PATH_TO_DATA, backfill_weeks=args.backfill_weeks).load()
+    refresh_ttl = timedelta(hours=args.refresh_hours)
+    checkpoint = Checkpoint(PATH_TO_DATA + "staging/").start(
+        {"club_id": args.club_id, "week": args.week}, resume=args.resume
+    )
+
+    try:
+        if args.pipeline:
+            with METRICS.span("stage.pipeline"):
+                all_activity_df = ActivityPipeline(
+                    pool,
+                    args.week,
+                    index=index,
+                    refresh_ttl=refresh_ttl,
+                    checkpoint=checkpoint,
+                    list_members=partial(scrape_club_members, roster=roster),
+                    discovery=args.discovery,
+                    roster=roster,
+                ).run(args.club_id)
+        else:
+            with METRICS.span("stage.members"):
+                members_list = scrape_club_members(scraper, args.club_id, roster)
+            feed = None
+            if args.discovery == "feed":
+                with METRICS.span("stage.feed"):
+                    feed = feed_by_athlete(
+                        scraper.get_club_feed(args.club_id, args.week)
+                    )
+            with METRICS.span("stage.activities"):
+                all_activity_df = scrape_athlete_activities(
+                    scraper,
+                    members_list,
+                    args.week,
+                    pool=pool,
+                    index=index,
+                    refresh_ttl=refresh_ttl,
+                    checkpoint=checkpoint,
+                    feed=feed,
+                    roster=roster,
+                )
+
+        with METRICS.span("stage.save"):
+            if not all_activity_df.empty:
+                save_weekly_activity_data(all_activity_df)
+                index.update(all_activity_df)
+                index.save()
+            roster.save()
+            watermarks.save()
+            checkpoint.clear()
+    finally:
+        log_scraper_stats(scraper)
+        close_scraper(scraper)
+
+    return all_activity_df
@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import signal
+import threading
+from datetime import datetime
+
+import httpx
+
+from src.get_scraping import StravaScraper
+
+
+logger = logging.getLogger(__name__)
+
+# Arquivo onde o daemon em execução registra o endereço CDP e o PID.
+DAEMON_FILE = 'data/daemon.json'
+
+
+def daemon_endpoint(state_file: str = DAEMON_FILE, timeout: float = 1.0) -> str:
+    """Retorna o endereço CDP do daemon, se houver um em execução e respondendo.
+
+    Args:
+        state_file (str, optional): Arquivo de estado do daemon. Padrão é `DAEMON_FILE`.
+        timeout (float, optional): Tempo máximo da verificação, em segundos. Padrão é 1.
+
+    Returns:
+        str: Endereço CDP, como 'http://127.0.0.1:9222', ou None.
+    """
+    if not os.path.exists(state_file):
+        return None
+    try:
+        with open(state_file) as file:
+            state = json.load(file)
+        os.kill(state['pid'], 0)
+        response = httpx.get(f"{state['endpoint']}/json/version", timeout=timeout)
+        response.raise_for_status()
+    except (OSError, ValueError, KeyError, httpx.HTTPError):
+        return None
+    return state['endpoint']
+
+
+class BrowserDaemon:
+    """Mantém um navegador logado no Strava aberto para as coletas se conectarem.
+
+    O Chromium é iniciado com a sessão persistente e a porta de depuração (CDP)
+    aberta, faz o login se preciso e registra o endereço em `state_file`. As
+    coletas conectam com `StravaScraper.attach_browser`, sem abrir outro
+    navegador nem passar pelo login. A cada `refresh_minutes` o painel é aberto
+    de novo para manter a sessão válida. SIGINT ou SIGTERM encerram o daemon.
+
+    Args:
+        scraper (StravaScraper): Scraper com as credenciais, ainda não iniciado.
+        port (int, optional): Porta CDP. Padrão é 9222.
+        state_file (str, optional): Arquivo de estado. Padrão é `DAEMON_FILE`.
+        refresh_minutes (float, optional): Intervalo da renovação da sessão. Padrão é 30.
+    """
+
+    def __init__(
+        self,
+        scraper: StravaScraper,
+        port: int = 9222,
+        state_file: str = DAEMON_FILE,
+        refresh_minutes: float = 30,
+    ):
+        self.scraper = scraper
+        self.port = port
+        self.state_file = state_file
+        self.refresh_minutes = refresh_minutes
+        self._stop = threading.Event()
+
+    @property
+    def endpoint(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def _write_state(self):
+        state = {
+            'endpoint': self.endpoint,
+            'pid': os.getpid(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.state_file)
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def serve(self, headless: bool = True, session_file: str = 'user_data'):
+        """Inicia o navegador e o mantém aberto até receber SIGINT ou SIGTERM.
+
+        Args:
+            headless (bool, optional): Executa sem interface gráfica. Padrão é True.
+            session_file (str, optional): Pasta da sessão persistente. Padrão é 'user_data'.
+        """
+        if daemon_endpoint(self.state_file):
+            raise RuntimeError(f'Já existe um daemon em execução ({self.state_file}).')
+
+        self.scraper.start_browser(
+            headless=headless, session_file=session_file, debug_port=self.port
+        )
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            self.scraper.ensure_session()
+            self._write_state()
+            logger.info(f'Navegador disponível em {self.endpoint}.')
+
+            while not self._stop.wait(self.refresh_minutes * 60):
+                try:
+                    self.scraper.ensure_session()
+                except Exception as e:
+                    logger.error(f'Erro ao renovar a sessão do daemon: {e}')
+        finally:
+            if os.path.exists(self.state_file):
+                os.remove(self.state_file)
+            self.scraper.close_browser()
+            logger.info('Daemon encerrado.')
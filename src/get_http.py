@@ -0,0 +1,276 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from lxml import html
+
+from src.get_limiter import throttle_reason
+from src.get_metrics import METRICS
+from src.get_scraping import (
+    ACTIVITY_FIELDS,
+    members_url,
+    new_activity_record,
+    new_member_record,
+    parse_activity_fields,
+)
+from src.get_utils import get_msg_log
+
+
+logger = logging.getLogger(__name__)
+
+
+def _has_class(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def extract_activity_fields(tree: html.HtmlElement) -> dict:
+    """Lê os campos da atividade de um HTML já carregado, sem navegador.
+
+    Segue as mesmas regras do script executado na página (`ACTIVITY_SCRIPT`):
+    XPaths alternativas em ordem, índice ou elemento único por campo. Como não há
+    renderização, todo elemento presente no HTML é tratado como visível.
+
+    Args:
+        tree (html.HtmlElement): Documento HTML da página da atividade.
+
+    Returns:
+        dict: Texto de cada campo, None quando o elemento não existe e campo
+        ausente quando a leitura é ambígua.
+    """
+    raw = {}
+    for name, spec in ACTIVITY_FIELDS.items():
+        raw[name] = None
+        for xpath in spec['xpaths']:
+            nodes = tree.xpath(xpath)
+            if not nodes:
+                continue
+
+            if spec['pick'] == 'only':
+                node = nodes[0] if len(nodes) == 1 else None
+            else:
+                node = nodes[spec['pick']] if len(nodes) > spec['pick'] else None
+            if node is None:
+                del raw[name]
+                break
+
+            raw[name] = node.text_content().strip()
+            if raw[name]:
+                break
+    return raw
+
+
+def parse_activity_html(
+    content: str, athlete_id: int, activity_id: int, url: str
+) -> dict:
+    """Monta o registro de uma atividade a partir do HTML da página de visão geral.
+
+    Args:
+        content (str): HTML da página.
+        athlete_id (int): ID do atleta.
+        activity_id (int): ID da atividade.
+        url (str): Endereço base do Strava.
+
+    Returns:
+        dict: Registro da atividade, ou None se a página não traz os dados no
+        HTML (por exemplo, quando depende de JavaScript para ser montada).
+    """
+    tree = html.fromstring(content)
+    if not tree.xpath('//*[@id="heading"]'):
+        return None
+
+    data = new_activity_record(athlete_id, activity_id, url)
+    return parse_activity_fields(data, extract_activity_fields(tree))
+
+
+class HttpFetcher:
+    """Busca páginas do Strava por HTTP/2, reaproveitando a sessão do navegador.
+
+    Os cookies do contexto do Playwright são copiados para um cliente `httpx`
+    com pool de conexões. O cliente é thread-safe e pode ser compartilhado entre
+    os workers do pool. Quando a página exige JavaScript ou a sessão expira, os
+    métodos retornam None para que o chamador use o navegador.
+
+    Args:
+        cookies (list): Cookies no formato de `BrowserContext.cookies()`.
+        url (str, optional): Endereço base do Strava. Padrão é 'https://www.strava.com'.
+        user_agent (str, optional): User-Agent enviado nas requisições.
+        limiter (HostLimiter, optional): Limitador de requisições, avisado das
+            respostas limitadas pelo Strava.
+        max_connections (int, optional): Máximo de conexões simultâneas. Padrão é 10.
+        timeout (float, optional): Tempo máximo de cada requisição, em segundos. Padrão é 20.
+        cache (PageCache, optional): Cache onde as páginas coletadas são guardadas.
+    """
+
+    def __init__(
+        self,
+        cookies: list,
+        url: str = 'https://www.strava.com',
+        user_agent: str = None,
+        limiter=None,
+        max_connections: int = 10,
+        timeout: float = 20,
+        cache=None,
+    ):
+        self.url = url
+        self.limiter = limiter
+        self.cache = cache
+        self.max_connections = max_connections
+        self.client = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            headers={
+                'User-Agent': user_agent or '',
+                'Accept-Language': 'en-US,en;q=0.9',
+            },
+        )
+        self.load_cookies(cookies)
+
+    @classmethod
+    def from_scraper(cls, scraper, **kwargs) -> 'HttpFetcher':
+        """Cria o cliente com os cookies do navegador de um `StravaScraper` iniciado."""
+        return cls(
+            scraper.browser.cookies(),
+            url=scraper.URL,
+            user_agent=scraper.USER_AGENT,
+            limiter=scraper.limiter,
+            **kwargs,
+        )
+
+    def load_cookies(self, cookies: list):
+        """Atualiza os cookies do cliente, por exemplo após um novo login no navegador."""
+        for cookie in cookies:
+            self.client.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'),
+            )
+
+    def close(self):
+        self.client.close()
+
+    def get(self, url: str, breaker_trips: int = 2) -> httpx.Response:
+        """Faz um GET respeitando o limitador. Retorna None se cair no login.
+
+        Respostas 429 e 503 e redirecionamentos para captcha avisam o limitador
+        para recuar e são repetidas, pelas pausas do disjuntor, até ele abrir
+        `breaker_trips` vezes; depois disso, ou sem limitador, o método retorna
+        None para que o chamador use o navegador.
+        """
+        trips = self.limiter.trips(url) if self.limiter else 0
+        while True:
+            if self.limiter:
+                self.limiter.wait(url)
+            with METRICS.span('http.get'):
+                response = self.client.get(url)
+
+            reason = throttle_reason(
+                response.status_code, str(response.url), allow_login=True
+            )
+            if reason is None or not self.limiter:
+                break
+            logger.warning(f'{url}: resposta limitada pelo Strava ({reason}).')
+            self.limiter.throttled(url, reason)
+            if self.limiter.trips(url) - trips >= breaker_trips:
+                break
+
+        if (
+            reason
+            or response.url.path.startswith('/login')
+            or response.status_code != 200
+        ):
+            logger.warning(f'{url}: resposta {response.status_code} em {response.url}')
+            return None
+        if self.limiter:
+            self.limiter.success(url)
+        return response
+
+    def fetch_activity(self, athlete_id: int, activity_id: int) -> dict:
+        """Coleta uma atividade por HTTP.
+
+        Args:
+            athlete_id (int): ID do atleta.
+            activity_id (int): ID da atividade.
+
+        Returns:
+            dict: Registro da atividade, ou None se for preciso usar o navegador.
+        """
+        try:
+            response = self.get(f'{self.url}/activities/{activity_id}/overview')
+            if response is None:
+                return None
+            with METRICS.span('http.parse'):
+                data = parse_activity_html(
+                    response.text, athlete_id, activity_id, self.url
+                )
+            if data is not None and self.cache:
+                with METRICS.span('cache.put'):
+                    self.cache.store(athlete_id, activity_id, response.text)
+            return data
+        except Exception as e:
+            logger.error(
+                get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
+            )
+            return None
+
+    def fetch_member_page(self, club_id: int, page: int = 1) -> tuple:
+        """Coleta os membros listados em uma página do clube por HTTP.
+
+        Args:
+            club_id (int): ID do clube.
+            page (int, optional): Número da página. Padrão é 1.
+
+        Returns:
+            tuple: Lista de dicionários dos membros e conjunto das páginas ligadas
+            na paginação, ou None se for preciso usar o navegador.
+        """
+        try:
+            response = self.get(members_url(self.url, club_id, page))
+            if response is None:
+                return None
+
+            tree = html.fromstring(response.text)
+            data = []
+            for athlete in tree.xpath(f'//ul[{_has_class("list-athletes")}]/li'):
+                links = athlete.xpath(f'.//*[{_has_class("text-headline")}]//a')
+                if links:
+                    data.append(
+                        new_member_record(
+                            links[0].get('href'),
+                            links[0].text_content().strip(),
+                            self.url,
+                        )
+                    )
+            if not data:
+                return None
+
+            pages = set()
+            for href in tree.xpath(f'//*[{_has_class("pagination")}]//a/@href'):
+                if match := re.search(r'[?&]page=(\d+)', href):
+                    pages.add(int(match.group(1)))
+            return data, pages
+        except Exception as e:
+            logger.error(get_msg_log('members', 'error', f'{club_id} - {page} - {e}'))
+            return None
+
+    def fetch_member_pages(self, club_id: int, pages: list) -> dict:
+        """Coleta várias páginas da lista de membros em paralelo.
+
+        Args:
+            club_id (int): ID do clube.
+            pages (list): Números das páginas.
+
+        Returns:
+            dict: Retorno de `fetch_member_page` por número da página.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            results = executor.map(
+                lambda page: self.fetch_member_page(club_id, page), pages
+            )
+            return dict(zip(pages, results))
@@ -0,0 +1,98 @@
+import glob
+import logging
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityIndex:
+    """Índice persistente das atividades já coletadas.
+
+    Guarda o `activity_id` e o `updated_at` da última coleta de cada atividade,
+    para que apenas atividades novas ou desatualizadas voltem a ser abertas no
+    navegador. Se o arquivo do índice ainda não existir, ele é montado a partir
+    dos arquivos `activity_week_*.parquet` já salvos.
+
+    Args:
+        folder (str, optional): Pasta dos dados. Padrão é 'data/'.
+        file_name (str, optional): Nome do arquivo do índice. Padrão é 'index_activities.parquet'.
+    """
+
+    def __init__(
+        self, folder: str = 'data/', file_name: str = 'index_activities.parquet'
+    ):
+        self.folder = folder
+        self.path = os.path.join(folder, file_name)
+        self.entries = {}
+
+    def load(self) -> 'ActivityIndex':
+        """Carrega o índice do disco, ou o reconstrói a partir das partições semanais.
+
+        Returns:
+            ActivityIndex: A própria instância, para encadear chamadas.
+        """
+        if os.path.exists(self.path):
+            frames = [pd.read_parquet(self.path)]
+        else:
+            frames = [
+                pd.read_parquet(file, columns=['activity_id', 'updated_at'])
+                for file in glob.glob(
+                    os.path.join(self.folder, 'activity_week_*.parquet')
+                )
+            ]
+
+        if frames:
+            self.update(pd.concat(frames, ignore_index=True))
+        logger.info(
+            f'Índice de atividades carregado com {len(self.entries)} atividades.'
+        )
+        return self
+
+    def update(self, df: pd.DataFrame):
+        """Registra atividades coletadas, mantendo o `updated_at` mais recente.
+
+        Args:
+            df (pd.DataFrame): DataFrame com as colunas 'activity_id' e 'updated_at'.
+        """
+        if df.empty:
+            return
+        latest = df.groupby(df['activity_id'].astype('int64'))['updated_at'].max()
+        for activity_id, updated_at in latest.items():
+            current = self.entries.get(activity_id)
+            if current is None or updated_at > current:
+                self.entries[activity_id] = updated_at
+
+    def needs_scrape(self, activity_id, ttl: timedelta = None) -> bool:
+        """Indica se a atividade precisa ser coletada.
+
+        Args:
+            activity_id (int | str): ID da atividade.
+            ttl (timedelta, optional): Idade máxima de uma coleta antes de ser
+                refeita. Se None, atividades conhecidas nunca são recoletadas.
+
+        Returns:
+            bool: True se a atividade é nova ou está desatualizada.
+        """
+        updated_at = self.entries.get(int(activity_id))
+        if updated_at is None:
+            return True
+        if ttl is None:
+            return False
+        return updated_at < datetime.now() - ttl
+
+    def save(self):
+        """Grava o índice em disco, substituindo o arquivo anterior de uma vez."""
+        tmp_path = self.path + '.tmp'
+        pd.DataFrame(
+            {
+                'activity_id': pd.Series(list(self.entries.keys()), dtype='int64'),
+                'updated_at': pd.Series(
+                    list(self.entries.values()), dtype='datetime64[ns]'
+                ),
+            }
+        ).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
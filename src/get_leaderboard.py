@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.get_utils import iso_week
+
+
+PERIODS = ["week", "month", "season"]
+COLUMNS = ["athlete_id", "week", "month", "season", "points"]
+
+
+class Leaderboard:
+    """Ranking pré-calculado dos atletas por semana, mês e temporada.
+
+    Mantém os pontos de cada atleta agregados por (atleta, semana, mês,
+    temporada) e, a partir deles, os totais de cada período. O ranking de cada
+    período é ordenado uma única vez e guardado em arrays; quando novas linhas
+    de pontuação chegam, só os totais e rankings dos períodos afetados são
+    refeitos. As consultas usam apenas os arrays e dicionários já prontos.
+
+    Args:
+        folder (str, optional): Pasta dos dados. Padrão é 'data/'.
+        file_name (str, optional): Arquivo do ranking. Padrão é 'leaderboard.parquet'.
+    """
+
+    def __init__(self, folder: str = "data/", file_name: str = "leaderboard.parquet"):
+        self.folder = folder
+        self.path = os.path.join(folder, file_name)
+        self.base = {}
+        self.totals = {period: {} for period in PERIODS}
+        self._boards = {}
+
+    @staticmethod
+    def _base_rows(score_df: pd.DataFrame) -> pd.DataFrame:
+        date_time = pd.to_datetime(score_df["date_time"])
+        rows = pd.DataFrame(
+            {
+                "athlete_id": score_df["athlete_id"].astype("int64"),
+                "week": iso_week(date_time),
+                "month": date_time.dt.strftime("%Y-%m"),
+                "season": date_time.dt.year.astype("Int64").astype(str),
+                "points": score_df["points"].fillna(0),
+            }
+        )
+        return rows.groupby(COLUMNS[:-1], as_index=False)["points"].sum()
+
+    def _apply(self, rows: list, sign: int = 1):
+        for athlete_id, week, month, season, points in rows:
+            for period, key in zip(PERIODS, (week, month, season)):
+                board = self.totals[period].setdefault(key, {})
+                board[athlete_id] = board.get(athlete_id, 0) + sign * points
+                self._boards.pop((period, key), None)
+
+    def load(self) -> "Leaderboard":
+        """Carrega o ranking salvo; se não existir, monta a partir de `score.parquet`.
+
+        Returns:
+            Leaderboard: A própria instância, para encadear chamadas.
+        """
+        if os.path.exists(self.path):
+            self._set_base(pd.read_parquet(self.path))
+        elif os.path.exists(os.path.join(self.folder, "score.parquet")):
+            self.rebuild(pd.read_parquet(os.path.join(self.folder, "score.parquet")))
+        return self
+
+    def _add_base(self, rows: pd.DataFrame):
+        rows = list(rows[COLUMNS].itertuples(index=False, name=None))
+        for row in rows:
+            self.base.setdefault((row[0], row[1]), []).append(row)
+        self._apply(rows)
+
+    def _set_base(self, rows: pd.DataFrame):
+        self.base = {}
+        self.totals = {period: {} for period in PERIODS}
+        self._boards = {}
+        self._add_base(rows)
+
+    def rebuild(self, score_df: pd.DataFrame) -> "Leaderboard":
+        """Recalcula o ranking a partir de toda a pontuação.
+
+        Args:
+            score_df (pd.DataFrame): Linhas de pontuação, como em `score.parquet`.
+
+        Returns:
+            Leaderboard: A própria instância, para encadear chamadas.
+        """
+        self._set_base(self._base_rows(score_df))
+        return self
+
+    def replace(self, touched: pd.DataFrame, score_df: pd.DataFrame) -> "Leaderboard":
+        """Substitui os pontos dos pares (atleta, semana) recalculados.
+
+        Args:
+            touched (pd.DataFrame): Pares 'athlete_id' e 'week' que foram recalculados.
+            score_df (pd.DataFrame): Nova pontuação desses pares.
+
+        Returns:
+            Leaderboard: A própria instância, para encadear chamadas.
+        """
+        for key in touched[["athlete_id", "week"]].itertuples(index=False):
+            old = self.base.pop((int(key.athlete_id), str(key.week)), None)
+            if old is not None:
+                self._apply(old, sign=-1)
+
+        self._add_base(self._base_rows(score_df))
+        return self
+
+    def save(self):
+        """Grava os pontos agregados do ranking em disco."""
+        rows = pd.DataFrame(
+            [row for rows in self.base.values() for row in rows], columns=COLUMNS
+        )
+        tmp_path = self.path + ".tmp"
+        rows.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def latest(self, period: str) -> str:
+        """Retorna a chave mais recente do período ('YYYYWW', 'YYYY-MM' ou 'YYYY')."""
+        keys = [key for key, board in self.totals[period].items() if board]
+        return max(keys) if keys else None
+
+    def _board(self, period: str, key: str) -> tuple:
+        key = key or self.latest(period)
+        board = self._boards.get((period, key))
+        if board is None:
+            totals = self.totals[period].get(key, {})
+            athletes = np.fromiter(totals.keys(), dtype="int64", count=len(totals))
+            points = np.fromiter(totals.values(), dtype="float64", count=len(totals))
+            order = np.lexsort((athletes, -points))
+            athletes, points = athletes[order], points[order]
+
+            # ranking de competição: empates dividem a posição (1, 2, 2, 4)
+            ranks = np.ones(len(points), dtype="int64")
+            if len(points):
+                ties = np.r_[False, points[1:] == points[:-1]]
+                ranks = np.where(ties, 0, np.arange(1, len(points) + 1))
+                ranks = np.maximum.accumulate(ranks)
+
+            positions = {athlete: i for i, athlete in enumerate(athletes.tolist())}
+            board = (athletes, points, ranks, positions)
+            self._boards[(period, key)] = board
+        return board
+
+    def top(self, n: int = 10, period: str = "season", key: str = None) -> pd.DataFrame:
+        """Retorna os N primeiros colocados do período.
+
+        Args:
+            n (int, optional): Quantidade de atletas. Padrão é 10.
+            period (str, optional): 'week', 'month' ou 'season'. Padrão é 'season'.
+            key (str, optional): Período consultado. Padrão é o mais recente.
+
+        Returns:
+            pd.DataFrame: DataFrame com 'rank', 'athlete_id' e 'points'.
+        """
+        athletes, points, ranks, _ = self._board(period, key)
+        return pd.DataFrame(
+            {"rank": ranks[:n], "athlete_id": athletes[:n], "points": points[:n]}
+        )
+
+    def rank(self, athlete_id: int, period: str = "season", key: str = None) -> dict:
+        """Retorna a posição de um atleta e quantos pontos faltam para subir.
+
+        Args:
+            athlete_id (int): ID do atleta.
+            period (str, optional): 'week', 'month' ou 'season'. Padrão é 'season'.
+            key (str, optional): Período consultado. Padrão é o mais recente.
+
+        Returns:
+            dict: 'rank', 'points' e 'points_to_next' (pontos para alcançar o atleta
+            logo à frente; 0 para o líder), ou None se o atleta não pontuou.
+        """
+        athletes, points, ranks, positions = self._board(period, key)
+        position = positions.get(int(athlete_id))
+        if position is None:
+            return None
+
+        rank = int(ranks[position])
+        # com o ranking de competição, quem está logo à frente ocupa o índice rank - 2
+        to_next = points[rank - 2] - points[position] if rank > 1 else 0.0
+        return {
+            "rank": rank,
+            "points": float(points[position]),
+            "points_to_next": float(to_next),
+        }
+
+    def points_to_next(
+        self, athlete_id: int, period: str = "season", key: str = None
+    ) -> float:
+        """Retorna quantos pontos faltam para o atleta alcançar o colocado logo à frente."""
+        result = self.rank(athlete_id, period, key)
+        return result["points_to_next"] if result else None
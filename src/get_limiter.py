@@ -0,0 +1,229 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from src.get_metrics import METRICS
+
+
+logger = logging.getLogger(__name__)
+
+# Códigos HTTP com que o Strava sinaliza excesso de requisições.
+THROTTLE_STATUS = {429: 'throttled', 503: 'unavailable'}
+
+
+class ThrottledError(RuntimeError):
+    """A página continuou bloqueada pelo Strava depois de todas as tentativas."""
+
+
+def throttle_reason(status: int, url: str, allow_login: bool = False) -> str:
+    """Identifica se uma resposta indica que o Strava está limitando a coleta.
+
+    Args:
+        status (int): Código HTTP da resposta, se houver.
+        url (str): URL final, após os redirecionamentos.
+        allow_login (bool, optional): Se True, cair no login não conta como
+            bloqueio, como no painel antes do login. Padrão é False.
+
+    Returns:
+        str: 'throttled', 'unavailable', 'captcha' ou 'login', ou None se a
+        resposta é normal.
+    """
+    if status in THROTTLE_STATUS:
+        return THROTTLE_STATUS[status]
+    path = urlparse(url).path
+    if 'captcha' in url.lower() or path.startswith('/challenge'):
+        return 'captcha'
+    if not allow_login and path.startswith(('/login', '/session')):
+        return 'login'
+    return None
+
+
+class HostLimiter:
+    """Garante um intervalo mínimo entre navegações para o mesmo host.
+
+    A instância é compartilhada entre todas as páginas do pool, de modo que o
+    limite vale para o conjunto e não para cada página isoladamente. Sem
+    disjuntor, cada resposta limitada conta como uma abertura em `trips`.
+    """
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+        self._trips = {}
+
+    def interval(self, host: str) -> float:
+        return self.min_interval
+
+    def wait(self, url: str):
+        """Bloqueia até que o host da URL possa receber uma nova requisição.
+
+        Args:
+            url (str): URL que será acessada.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval(host)
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def success(self, url: str):
+        """Informa que a requisição para a URL foi respondida normalmente."""
+
+    def throttled(self, url: str, reason: str):
+        """Informa que a requisição para a URL foi limitada pelo Strava."""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._trips[host] = self._trips.get(host, 0) + 1
+
+    def trips(self, url: str) -> int:
+        """Quantas vezes o disjuntor do host da URL já abriu."""
+        with self._lock:
+            return self._trips.get(urlparse(url).netloc, 0)
+
+
+class AdaptiveLimiter(HostLimiter):
+    """Limitador que recua quando o Strava limita a coleta e volta aos poucos.
+
+    Cada resposta limitada (429, captcha, redirecionamento para o login)
+    multiplica o intervalo do host por `factor`, com um jitter aleatório, até
+    `max_interval`. Após `threshold` respostas limitadas seguidas, o disjuntor
+    abre e todas as requisições ao host, de todos os workers, ficam pausadas por
+    `cooldown` segundos, tempo que dobra a cada nova abertura. Depois da pausa,
+    as requisições voltam no intervalo alto, que é dividido por `factor` a cada
+    `ramp_after` respostas normais até chegar de novo a `min_interval`. O recuo
+    parte de pelo menos `min_backoff`, para que um intervalo normal muito curto
+    não torne os primeiros recuos insignificantes.
+
+    Args:
+        min_interval (float, optional): Intervalo normal entre requisições. Padrão é 1.0.
+        max_interval (float, optional): Intervalo máximo após os recuos. Padrão é 60.
+        factor (float, optional): Fator de recuo e de retomada. Padrão é 2.
+        jitter (float, optional): Fração aleatória somada a cada recuo. Padrão é 0.3.
+        threshold (int, optional): Respostas limitadas seguidas que abrem o
+            disjuntor. Padrão é 5.
+        cooldown (float, optional): Pausa da primeira abertura, em segundos. Padrão é 60.
+        max_cooldown (float, optional): Pausa máxima, em segundos. Padrão é 900.
+        ramp_after (int, optional): Respostas normais a cada passo de retomada.
+            Padrão é 10.
+        min_backoff (float, optional): Intervalo a partir do qual o primeiro
+            recuo é calculado, em segundos. Padrão é 1.0.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 1.0,
+        max_interval: float = 60,
+        factor: float = 2,
+        jitter: float = 0.3,
+        threshold: int = 5,
+        cooldown: float = 60,
+        max_cooldown: float = 900,
+        ramp_after: int = 10,
+        min_backoff: float = 1.0,
+    ):
+        super().__init__(min_interval)
+        self.max_interval = max_interval
+        self.factor = factor
+        self.jitter = jitter
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.ramp_after = ramp_after
+        self.min_backoff = min_backoff
+        self.hosts = {}
+        self.counts = {}
+
+    def _state(self, host: str) -> dict:
+        return self.hosts.setdefault(
+            host,
+            {
+                'interval': self.min_interval,
+                'failures': 0,
+                'successes': 0,
+                'trips': 0,
+                'opened': 0,
+            },
+        )
+
+    def interval(self, host: str) -> float:
+        return self._state(host)['interval']
+
+    def trips(self, url: str) -> int:
+        with self._lock:
+            return self._state(urlparse(url).netloc)['opened']
+
+    def success(self, url: str):
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._state(host)
+            state['failures'] = 0
+            if state['interval'] <= self.min_interval:
+                state['trips'] = 0
+                return
+
+            state['successes'] += 1
+            if state['successes'] >= self.ramp_after:
+                state['successes'] = 0
+                state['interval'] = max(
+                    self.min_interval, state['interval'] / self.factor
+                )
+
+    def throttled(self, url: str, reason: str):
+        host = urlparse(url).netloc
+        METRICS.timeout(f'throttle.{reason}')
+        with self._lock:
+            self.counts[reason] = self.counts.get(reason, 0) + 1
+            state = self._state(host)
+            state['failures'] += 1
+            state['successes'] = 0
+            state['interval'] = min(
+                self.max_interval,
+                max(state['interval'], self.min_backoff)
+                * self.factor
+                * (1 + random.uniform(0, self.jitter)),
+            )
+
+            now = time.monotonic()
+            pause = state['interval']
+            if state['failures'] >= self.threshold:
+                pause = min(self.max_cooldown, self.cooldown * 2 ** state['trips'])
+                pause *= 1 + random.uniform(0, self.jitter)
+                state['trips'] += 1
+                state['opened'] += 1
+                self.counts['breaker'] = self.counts.get('breaker', 0) + 1
+                logger.warning(
+                    f'{host}: {state["failures"]} respostas limitadas seguidas '
+                    f'({reason}); pausando as requisições por {pause:.0f}s.'
+                )
+            self._next_slot[host] = max(self._next_slot.get(host, now), now + pause)
+
+    def summary(self) -> dict:
+        """Quantidade de respostas limitadas por motivo e de aberturas do disjuntor."""
+        with self._lock:
+            return dict(self.counts)
+
+
+def new_limiter(min_interval: float = 1.0, workers: int = 1) -> AdaptiveLimiter:
+    """Cria o limitador compartilhado pelos workers de uma coleta.
+
+    `min_interval` é o ritmo de cada worker: como o limitador é um só para
+    todos, o intervalo entre requisições ao host é dividido pelo número de
+    workers, e a vazão cresce com eles.
+
+    Args:
+        min_interval (float, optional): Intervalo entre requisições de cada
+            worker, em segundos. Padrão é 1.0.
+        workers (int, optional): Número de workers que compartilham o limitador.
+            Padrão é 1.
+
+    Returns:
+        AdaptiveLimiter: Limitador com o intervalo dividido entre os workers.
+    """
+    return AdaptiveLimiter(min_interval / max(1, workers))
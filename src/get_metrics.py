@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+# Limites superiores, em ms, das faixas do histograma de latência.
+BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000, 10000]
+
+
+class Lap:
+    """Cronômetro de voltas: cada `lap` registra o tempo desde a volta anterior.
+
+    Útil em trechos sequenciais longos, como a extração campo a campo, em que
+    envolver cada bloco em um `span` mudaria a indentação de todo o código.
+    """
+
+    def __init__(self, metrics: 'Metrics', prefix: str):
+        self.metrics = metrics
+        self.prefix = prefix
+        self._last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.metrics.record(f'{self.prefix}.{name}', now - self._last)
+        self._last = now
+
+
+class Metrics:
+    """Registro de latências e estouros de tempo por etapa.
+
+    Os tempos de cada etapa são guardados como amostras, das quais saem a
+    média, os percentis e o histograma no resumo. O registro é thread-safe e
+    compartilhado pelo scraper principal e pelos workers. Enquanto desativado,
+    `span` e `record` não fazem nada.
+
+    Args:
+        enabled (bool, optional): Se True, registra os tempos. Padrão é False.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.samples = {}
+        self.timeouts = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        """Mede o tempo do bloco `with` na etapa `name`."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Registra uma amostra de tempo, em segundos, na etapa `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def timeout(self, name: str):
+        """Conta um estouro de tempo na etapa `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def count(self, name: str, value: int = 1):
+        """Soma `value` ao contador `name`, como falhas de conversão de um campo."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def laps(self, prefix: str) -> Lap:
+        """Retorna um cronômetro de voltas cujas etapas são `prefix.<nome>`."""
+        return Lap(self, prefix)
+
+    def snapshot(self) -> dict:
+        """Copia as amostras, os estouros e os contadores, para enviar a outro processo."""
+        with self._lock:
+            return {
+                'samples': {
+                    name: list(values) for name, values in self.samples.items()
+                },
+                'timeouts': dict(self.timeouts),
+                'counts': dict(self.counts),
+            }
+
+    def merge(self, snapshot: dict):
+        """Soma ao registro um `snapshot` de outro processo, como o de um shard."""
+        with self._lock:
+            for name, values in snapshot['samples'].items():
+                self.samples.setdefault(name, []).extend(values)
+            for name, value in snapshot['timeouts'].items():
+                self.timeouts[name] = self.timeouts.get(name, 0) + value
+            for name, value in snapshot['counts'].items():
+                self.counts[name] = self.counts.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.samples = {}
+            self.timeouts = {}
+            self.counts = {}
+
+    @staticmethod
+    def histogram(samples: list) -> dict:
+        """Conta as amostras em cada faixa de `BUCKETS_MS`.
+
+        Args:
+            samples (list): Tempos, em segundos.
+
+        Returns:
+            dict: Quantidade de amostras por faixa, como '<=10ms' ou '>10000ms'.
+        """
+        edges = np.array(BUCKETS_MS, dtype='float64')
+        counts = np.bincount(
+            np.searchsorted(edges, np.asarray(samples) * 1000),
+            minlength=len(edges) + 1,
+        )
+        labels = [f'<={edge}ms' for edge in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}ms']
+        return dict(zip(labels, counts.tolist()))
+
+    def summary(self) -> pd.DataFrame:
+        """Resume as etapas registradas, da que mais consumiu tempo para a que menos.
+
+        Returns:
+            pd.DataFrame: Quantidade, tempo total, média, p50, p95, máximo e
+            estouros de tempo de cada etapa.
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+            timeouts = dict(self.timeouts)
+
+        rows = []
+        for name in sorted(set(samples) | set(timeouts)):
+            values = np.asarray(samples.get(name, []), dtype='float64') * 1000
+            row = {'stage': name, 'count': len(values), 'total_s': values.sum() / 1000}
+            if len(values):
+                row['mean_ms'] = values.mean()
+                row['p50_ms'], row['p95_ms'] = np.percentile(values, [50, 95])
+                row['max_ms'] = values.max()
+            row['timeouts'] = timeouts.get(name, 0)
+            rows.append(row)
+
+        columns = [
+            'stage',
+            'count',
+            'total_s',
+            'mean_ms',
+            'p50_ms',
+            'p95_ms',
+            'max_ms',
+            'timeouts',
+        ]
+        df = pd.DataFrame(rows, columns=columns)
+        return df.sort_values('total_s', ascending=False, ignore_index=True)
+
+    def save(self, path: str, extra: dict = None):
+        """Grava o resumo e o histograma de cada etapa em um arquivo JSON.
+
+        Args:
+            path (str): Caminho do arquivo.
+            extra (dict, optional): Seções adicionais incluídas no arquivo.
+        """
+        summary = self.summary()
+        stages = {}
+        for row in summary.to_dict('records'):
+            name = row.pop('stage')
+            row['histogram'] = self.histogram(self.samples.get(name, []))
+            stages[name] = {
+                key: None if pd.isna(value) else value for key, value in row.items()
+            }
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'buckets_ms': BUCKETS_MS,
+            'stages': stages,
+            'counts': dict(self.counts),
+            **(extra or {}),
+        }
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(report, file, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+
+# Registro usado por todo o projeto; ativado pelo `--profile` do scrapper.py.
+METRICS = Metrics()
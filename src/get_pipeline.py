@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+import pandas as pd
+from tqdm import tqdm
+
+from src.get_checkpoint import Checkpoint
+from src.get_index import ActivityIndex
+from src.get_pool import ScraperPool
+from src.get_records import ActivityBuffer
+from src.get_roster import Roster
+from src.get_scraping import feed_by_athlete
+
+
+logger = logging.getLogger(__name__)
+
+
+def _club_member_ids(scraper, club_id: int) -> list:
+    return scraper.get_club_members(club_id)['athlete_id'].tolist()
+
+
+class ActivityPipeline:
+    """Coleta em fluxo contínuo, com as etapas ligadas por filas limitadas.
+
+    As etapas rodam ao mesmo tempo: membros do clube, IDs das atividades de cada
+    atleta, detalhes das atividades e gravação em lotes. Assim os detalhes do
+    atleta 1 são coletados enquanto as atividades do atleta 2 são descobertas. As
+    filas têm tamanho máximo, então uma etapa mais rápida espera a seguinte em
+    vez de acumular trabalho em memória.
+
+    A lista de membros é lida antes, no navegador do scraper principal, que é
+    fechado em seguida em vez de ficar ocioso durante a coleta. As demais etapas
+    que usam o navegador têm sua própria `WorkerThread`, com a sessão exportada
+    do scraper principal: uma para a descoberta de atividades e uma por worker
+    de detalhes.
+
+    Args:
+        pool (ScraperPool): Pool com o scraper principal, já iniciado.
+        weeks (int, optional): Número de semanas para coletar atividades. Padrão é 1.
+        index (ActivityIndex, optional): Índice das atividades já coletadas.
+        refresh_ttl (timedelta, optional): Idade máxima de uma coleta antes de
+            ser refeita. Se None, atividades conhecidas não são recoletadas.
+        checkpoint (Checkpoint, optional): Staging onde as atividades são gravadas
+            em lotes. Se não informado, as atividades ficam em memória.
+        list_members (callable, optional): Função `(scraper, club_id) -> list` que
+            retorna os IDs dos membros. Padrão usa `get_club_members`.
+        queue_size (int, optional): Tamanho máximo de cada fila. Padrão é o dobro
+            do número de workers de detalhes.
+        discovery (str, optional): 'athlete' abre a página de cada atleta por
+            semana; 'feed' percorre uma vez o feed do clube. Padrão é 'athlete'.
+        roster (Roster, optional): Lista dos membros, preenchida por
+            `list_members`. Os atletas que entraram no clube são coletados com
+            `roster.backfill_weeks` semanas, sempre pelas páginas dos atletas.
+    """
+
+    def __init__(
+        self,
+        pool: ScraperPool,
+        weeks: int = 1,
+        index: ActivityIndex = None,
+        refresh_ttl: timedelta = None,
+        checkpoint: Checkpoint = None,
+        list_members=_club_member_ids,
+        queue_size: int = None,
+        discovery: str = 'athlete',
+        roster: Roster = None,
+    ):
+        self.pool = pool
+        self.weeks = weeks
+        self.index = index
+        self.refresh_ttl = refresh_ttl
+        self.checkpoint = checkpoint
+        self.list_members = list_members
+        self.queue_size = queue_size or 2 * pool.size
+        self.discovery = discovery
+        self.roster = roster
+        self.skipped = 0
+        self._buffer = ActivityBuffer()
+        self._pending = {}
+
+    def _pending_ids(self, activity_ids: list) -> list:
+        """Remove as atividades já coletadas no índice ou no checkpoint."""
+        total = len(activity_ids)
+        if self.index:
+            activity_ids = [
+                activity_id
+                for activity_id in activity_ids
+                if self.index.needs_scrape(activity_id, self.refresh_ttl)
+            ]
+            self.skipped += total - len(activity_ids)
+        if self.checkpoint:
+            activity_ids = [
+                activity_id
+                for activity_id in activity_ids
+                if not self.checkpoint.is_activity_done(activity_id)
+            ]
+        return activity_ids
+
+    async def _members(self, members: list, athletes: asyncio.Queue):
+        for athlete_id in members:
+            if self.checkpoint and self.checkpoint.is_athlete_done(athlete_id):
+                continue
+            await athletes.put(athlete_id)
+        await athletes.put(None)
+
+    async def _discover(
+        self,
+        thread,
+        club_id: int,
+        athletes: asyncio.Queue,
+        jobs: asyncio.Queue,
+        progress: tqdm,
+    ):
+        try:
+            feed = None
+            if self.discovery == 'feed':
+                feed = feed_by_athlete(
+                    await thread.call('get_club_feed', club_id, self.weeks)
+                )
+
+            while (athlete_id := await athletes.get()) is not None:
+                weeks = self.weeks
+                if self.roster:
+                    weeks = self.roster.weeks_for(athlete_id, self.weeks)
+                if feed is not None and weeks == self.weeks:
+                    activity_ids = feed.get(str(athlete_id), [])
+                else:
+                    activities = await thread.call(
+                        'get_athlete_activities', athlete_id, weeks
+                    )
+                    activity_ids = activities['activities']
+                activity_ids = self._pending_ids(activity_ids)
+
+                if not activity_ids:
+                    if self.checkpoint:
+                        await asyncio.to_thread(
+                            self.checkpoint.mark_athlete_done, athlete_id
+                        )
+                    continue
+
+                self._pending[athlete_id] = len(activity_ids)
+                progress.total += len(activity_ids)
+                progress.refresh()
+                for activity_id in activity_ids:
+                    await jobs.put((athlete_id, activity_id))
+        finally:
+            await thread.close()
+
+        for _ in range(self.pool.size):
+            await jobs.put(None)
+
+    async def _details(self, thread, jobs: asyncio.Queue, records: asyncio.Queue):
+        try:
+            while (job := await jobs.get()) is not None:
+                athlete_id, activity_id = job
+                record = await thread.call('activity_record', athlete_id, activity_id)
+                await records.put((athlete_id, record))
+        finally:
+            await thread.close()
+        await records.put(None)
+
+    def _write(self, athlete_id, record: dict):
+        if not self.checkpoint:
+            self._buffer.append(record)
+            return
+
+        self.checkpoint.add(record)
+        self._pending[athlete_id] -= 1
+        if self._pending[athlete_id] == 0:
+            self.checkpoint.mark_athlete_done(athlete_id)
+
+    async def _writer(self, records: asyncio.Queue, progress: tqdm):
+        running = self.pool.size
+        while running:
+            item = await records.get()
+            if item is None:
+                running -= 1
+                continue
+            await asyncio.to_thread(self._write, *item)
+            progress.update(1)
+
+    async def _run(self, club_id: int, members: list, storage_state: dict):
+        threads = [self.pool.thread(storage_state, 'pipeline-discovery')] + [
+            self.pool.thread(storage_state, f'pipeline-details-{i}')
+            for i in range(self.pool.size)
+        ]
+
+        athletes = asyncio.Queue(maxsize=self.queue_size)
+        jobs = asyncio.Queue(maxsize=self.queue_size)
+        records = asyncio.Queue(maxsize=self.queue_size)
+        progress = tqdm(total=0, desc='Coletando dados das atividades')
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._members(members, athletes))
+                group.create_task(
+                    self._discover(threads[0], club_id, athletes, jobs, progress)
+                )
+                for thread in threads[1:]:
+                    group.create_task(self._details(thread, jobs, records))
+                group.create_task(self._writer(records, progress))
+        except ExceptionGroup as e:
+            logger.error(f'Erro no pipeline de coleta: {e.exceptions[0]}')
+            raise e.exceptions[0]
+        finally:
+            progress.close()
+            for thread in threads:
+                await thread.close()
+
+    def run(self, club_id: int) -> pd.DataFrame:
+        """Executa a coleta completa de um clube.
+
+        Ao final, o navegador do scraper principal está fechado; os tempos de
+        espera e as requisições dos workers continuam somados nele.
+
+        Args:
+            club_id (int): ID do clube.
+
+        Raises:
+            Exception: Repassa o primeiro erro ocorrido em alguma etapa, após
+                encerrar as demais.
+
+        Returns:
+            pd.DataFrame: DataFrame com as atividades coletadas; com checkpoint,
+            inclui também o que foi coletado em execuções anteriores.
+        """
+        scraper = self.pool.scraper
+        scraper.ensure_session()
+        members = self.list_members(scraper, club_id)
+        storage_state = scraper.storage_state()
+        scraper.close_browser()
+        asyncio.run(self._run(club_id, members, storage_state))
+
+        if self.index:
+            logger.info(f'{self.skipped} atividades já coletadas foram ignoradas.')
+
+        if self.checkpoint:
+            return self.checkpoint.load()
+        if len(self._buffer):
+            return self._buffer.to_frame()
+        return pd.DataFrame()
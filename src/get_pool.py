@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+
+from src.get_limiter import HostLimiter, new_limiter
+from src.get_scraping import StravaScraper
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperPool:
+    """Pool de páginas que processa uma fila de atividades em paralelo.
+
+    Cada worker roda em sua própria thread com um navegador que reaproveita a
+    sessão logada do scraper principal (cookies e storage), então não há
+    novo login. Se o scraper principal estiver conectado a um `BrowserDaemon`,
+    os workers abrem páginas no mesmo navegador em vez de iniciar outro. O
+    resultado é devolvido na mesma ordem dos jobs recebidos.
+
+    Args:
+        scraper (StravaScraper): Scraper principal, já iniciado e logado.
+        size (int, optional): Número de páginas simultâneas. Padrão é 4.
+        max_concurrency (int, optional): Limite global de navegações em andamento.
+            Padrão é o próprio `size`.
+        min_interval (float, optional): Intervalo, em segundos, entre as
+            requisições de cada worker ao mesmo host. Padrão é 1.0.
+        headless (bool, optional): Executa os navegadores auxiliares sem interface.
+            Padrão é True.
+        limiter (HostLimiter, optional): Limitador compartilhado com o scraper
+            principal. Padrão é o de `new_limiter`, com `min_interval` dividido
+            entre as `size` páginas.
+    """
+
+    def __init__(
+        self,
+        scraper: StravaScraper,
+        size: int = 4,
+        max_concurrency: int = None,
+        min_interval: float = 1.0,
+        headless: bool = True,
+        limiter: HostLimiter = None,
+    ):
+        self.scraper = scraper
+        self.size = max(1, size)
+        self.max_concurrency = max_concurrency or self.size
+        self.limiter = limiter or new_limiter(min_interval, self.size)
+        self.headless = headless
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+    def _new_worker(self, storage_state: dict) -> StravaScraper:
+        worker = StravaScraper(
+            self.scraper.email,
+            self.scraper.password,
+            limiter=self.limiter,
+            extraction=self.scraper.extraction,
+            lean=self.scraper.lean,
+            blocked_types=self.scraper.blocked_types,
+            blocked_domains=self.scraper.blocked_domains,
+            url=self.scraper.URL,
+        )
+        worker.http = self.scraper.http
+        worker.cache = self.scraper.cache
+        worker.watermarks = self.scraper.watermarks
+        if self.scraper.endpoint:
+            worker.attach_browser(self.scraper.endpoint)
+        else:
+            worker.start_worker(storage_state, headless=self.headless)
+        return worker
+
+    def _merge_waits(self, worker: StravaScraper):
+        for step, times in worker.wait_times.items():
+            self.scraper.wait_times.setdefault(step, []).extend(times)
+        for step, count in worker.wait_timeouts.items():
+            self.scraper.wait_timeouts[step] = (
+                self.scraper.wait_timeouts.get(step, 0) + count
+            )
+        for resource_type, stats in worker.route_stats.items():
+            for key, value in stats.items():
+                self.scraper._count_request(resource_type, key, value)
+
+    def thread(self, storage_state: dict, name: str) -> 'WorkerThread':
+        """Cria uma thread dedicada a um worker, para uso a partir do asyncio.
+
+        Args:
+            storage_state (dict): Cookies e storage exportados do scraper principal.
+            name (str): Nome da thread, usado nos logs.
+
+        Returns:
+            WorkerThread: Thread com o worker, iniciado na primeira chamada.
+        """
+        return WorkerThread(self, storage_state, name)
+
+    def run(self, jobs: list, on_result=None) -> list:
+        """Executa `activity_record` para cada par (athlete_id, activity_id).
+
+        Args:
+            jobs (list): Lista de tuplas (athlete_id, activity_id).
+            on_result (callable, optional): Função chamada a cada atividade
+                concluída, com o job e o registro da atividade. É chamada a
+                partir das threads do pool, então deve ser thread-safe.
+
+        Raises:
+            Exception: Repassa o primeiro erro ocorrido em algum worker, após
+                encerrar os demais.
+
+        Returns:
+            list: Lista de registros das atividades, na mesma ordem de `jobs`.
+        """
+        if not jobs:
+            return []
+
+        storage_state = self.scraper.storage_state()
+        pending = queue.Queue()
+        for index, job in enumerate(jobs):
+            pending.put((index, job))
+
+        results = [None] * len(jobs)
+        errors = []
+        stop = threading.Event()
+        progress = tqdm(total=len(jobs), desc='Coletando dados das atividades')
+        progress_lock = threading.Lock()
+
+        def _work():
+            worker = None
+            try:
+                worker = self._new_worker(storage_state)
+                while not stop.is_set():
+                    try:
+                        index, (athlete_id, activity_id) = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    with self._semaphore:
+                        results[index] = worker.activity_record(athlete_id, activity_id)
+                    if on_result:
+                        on_result((athlete_id, activity_id), results[index])
+                    with progress_lock:
+                        progress.update(1)
+            except Exception as e:
+                logger.error(f'Erro no worker do pool: {e}')
+                errors.append(e)
+                stop.set()
+            finally:
+                if worker:
+                    with progress_lock:
+                        self._merge_waits(worker)
+                    worker.close_browser()
+
+        threads = [
+            threading.Thread(target=_work, name=f'scraper-pool-{i}')
+            for i in range(min(self.size, len(jobs)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        progress.close()
+
+        if errors:
+            raise errors[0]
+        return results
+
+
+class WorkerThread:
+    """Thread dedicada a um worker do pool, chamada a partir do asyncio.
+
+    Como a API síncrona do Playwright fica presa à thread que a iniciou, cada
+    worker vive em um executor de uma única thread: o navegador é aberto na
+    primeira chamada e todas as chamadas seguintes rodam na mesma thread, sem
+    bloquear o event loop.
+
+    Args:
+        pool (ScraperPool): Pool que fornece o limitador e o limite de concorrência.
+        storage_state (dict): Cookies e storage exportados do scraper principal.
+        name (str): Nome da thread, usado nos logs.
+    """
+
+    def __init__(self, pool: ScraperPool, storage_state: dict, name: str):
+        self.pool = pool
+        self.storage_state = storage_state
+        self.worker = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _call(self, func, args: tuple):
+        if self.worker is None:
+            self.worker = self.pool._new_worker(self.storage_state)
+        if isinstance(func, str):
+            func = getattr(self.worker, func)
+        else:
+            args = (self.worker,) + args
+        with self.pool._semaphore:
+            return func(*args)
+
+    async def call(self, func, *args):
+        """Executa um método do worker, ou uma função que o recebe, na thread dele.
+
+        Args:
+            func (str | callable): Nome do método do worker, por exemplo
+                'activity_record', ou função que recebe o worker como primeiro argumento.
+            *args: Demais argumentos.
+
+        Returns:
+            object: Retorno da função.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, func, args)
+
+    def _close(self):
+        if self.worker:
+            with self.pool._lock:
+                self.pool._merge_waits(self.worker)
+            self.worker.close_browser()
+            self.worker = None
+
+    async def close(self):
+        """Fecha o navegador do worker e encerra a thread. Pode ser chamado mais de uma vez."""
+        if self._closed:
+            return
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._close)
+        finally:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,193 @@
+import logging
+
+import pandas as pd
+
+from src.get_metrics import METRICS
+from src.get_utils import iso_week
+
+
+logger = logging.getLogger(__name__)
+
+# Tipos finais de cada coluna do dataset de atividades, na ordem das colunas.
+ACTIVITY_DTYPES = {
+    'athlete_id': 'int',
+    'activity_id': 'int',
+    'athlete_name': 'string',
+    'activity_type': 'category',
+    'date': 'datetime64[ns]',
+    'date_time': 'datetime64[ns]',
+    'location': 'string',
+    'activity_name': 'string',
+    'moving_time': 'timedelta64[ns]',
+    'elapsed_time': 'timedelta64[ns]',
+    'duration': 'timedelta64[ns]',
+    'calories': 'float',
+    'distance': 'float',
+    'pace': 'string',
+    'elevation': 'float',
+    'link': 'string',
+    'updated_at': 'datetime64[ns]',
+    'week': 'string',
+}
+
+
+# Formatos do horário da atividade, na ordem em que são tentados.
+# Ex: '7:18 PM on Tuesday, January 21, 2025' e 'Friday, January 10, 2025'.
+DATETIME_FORMATS = ['%I:%M %p on %A, %B %d, %Y', '%A, %B %d, %Y']
+
+
+def _parse_datetimes(values: pd.Series) -> pd.Series:
+    values = values.str.strip()
+    parsed = pd.to_datetime(values, format=DATETIME_FORMATS[0], errors='coerce')
+    for fmt in DATETIME_FORMATS[1:]:
+        parsed = parsed.fillna(pd.to_datetime(values, format=fmt, errors='coerce'))
+    return parsed
+
+
+def _parse_durations(values: pd.Series) -> pd.Series:
+    # 'MM:SS' vira '0:MM:SS'; 'HH:MM:SS' fica como está.
+    values = values.str.strip()
+    values = values.where(values.str.count(':') != 1, '0:' + values)
+    return pd.to_timedelta(values, errors='coerce')
+
+
+def _parse_numbers(pattern: str, replacement: str = ''):
+    def _parse(values: pd.Series) -> pd.Series:
+        values = values.str.replace(pattern, replacement, regex=True).replace('', None)
+        return pd.to_numeric(values, errors='coerce')
+
+    return _parse
+
+
+def _parse_pace(values: pd.Series) -> pd.Series:
+    return values.str.extract(r'^\s*(\d{1,2}:\d{2})', expand=False)
+
+
+# Conversão em lote dos campos que a coleta guarda como texto bruto. Textos
+# vazios contam como ausentes, como nas regras por atividade de antes.
+COLUMN_PARSERS = {
+    'date_time': _parse_datetimes,
+    'moving_time': _parse_durations,
+    'elapsed_time': _parse_durations,
+    'duration': _parse_durations,
+    'distance': _parse_numbers(r'\s*km'),
+    'elevation': _parse_numbers(r'[^\d]'),
+    'calories': _parse_numbers(',', '.'),
+    'pace': _parse_pace,
+}
+
+
+def _by_unique(values: pd.Series, parse) -> pd.Series:
+    """Aplica `parse` uma única vez a cada texto distinto da coluna."""
+    codes, uniques = pd.factorize(values)
+    # O valor extra no fim é o nulo, que o código -1 do factorize seleciona.
+    texts = pd.Series([*map(str, uniques), None], dtype='object')
+    parsed = parse(texts)
+    return pd.Series(parsed.to_numpy()[codes], index=values.index)
+
+
+def parse_activity_columns(df: pd.DataFrame) -> dict:
+    """Converte, coluna a coluna, os textos brutos das atividades nos tipos finais.
+
+    Horários e durações usam `pd.to_datetime`/`pd.to_timedelta` com formatos
+    explícitos; distância, elevação e calorias perdem as unidades por operações
+    de texto vetorizadas. Cada texto distinto é convertido uma única vez.
+
+    Args:
+        df (pd.DataFrame): Atividades com os campos em texto, alterado no lugar.
+
+    Returns:
+        dict: Quantidade de textos não reconhecidos por coluna.
+    """
+    failures = {}
+    for column, parse in COLUMN_PARSERS.items():
+        with METRICS.span(f'parse_bulk.{column}'):
+            raw = df[column].astype('object').where(df[column].notna(), None)
+            raw = raw.where(raw.astype('string').str.strip() != '', None)
+            parsed = _by_unique(raw, parse)
+
+        failed = int((raw.notna() & parsed.isna()).sum())
+        if column == 'elevation':
+            # Texto sem nenhum dígito é tratado como elevação ausente.
+            failed -= int((raw.notna() & ~raw.str.contains(r'\d', na=False)).sum())
+        if failed:
+            failures[column] = failed
+        df[column] = parsed
+    return failures
+
+
+class ActivityBuffer:
+    """Acumula atividades como registros simples, em listas por coluna.
+
+    A conversão dos textos brutos (`parse_activity_columns`), a tipagem e o
+    cálculo das colunas 'date' e 'week' são feitos uma única vez por lote, em
+    `to_frame`, em vez de campo a campo em cada atividade. Os textos não
+    reconhecidos são somados por coluna em `parse_failures`.
+    """
+
+    def __init__(self):
+        self.columns = {column: [] for column in ACTIVITY_DTYPES}
+        self.parse_failures = {}
+
+    def __len__(self) -> int:
+        return len(self.columns['activity_id'])
+
+    def append(self, record: dict):
+        """Adiciona uma atividade ao buffer.
+
+        Args:
+            record (dict): Dicionário da atividade, como retornado por
+                `StravaScraper.activity_record`.
+        """
+        for column, values in self.columns.items():
+            values.append(record.get(column))
+
+    def extend(self, records: list):
+        """Adiciona várias atividades ao buffer.
+
+        Args:
+            records (list): Lista de dicionários de atividades.
+        """
+        for record in records:
+            self.append(record)
+
+    def clear(self):
+        """Esvazia o buffer."""
+        for values in self.columns.values():
+            values.clear()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Converte o buffer em um DataFrame tipado.
+
+        Returns:
+            pd.DataFrame: DataFrame com as atividades do buffer.
+        """
+        dataset = pd.DataFrame(self.columns)
+        failures = parse_activity_columns(dataset)
+        if failures:
+            logger.warning(f'Campos não reconhecidos por coluna: {failures}')
+            for column, count in failures.items():
+                self.parse_failures[column] = self.parse_failures.get(column, 0) + count
+                METRICS.count(f'parse_bulk.{column}', count)
+
+        with METRICS.span('frame.build'):
+            dataset = dataset.astype(ACTIVITY_DTYPES)
+
+            dataset['date'] = dataset['date_time'].dt.date
+            dataset['week'] = iso_week(dataset['date_time'])
+
+        return dataset
+
+
+def build_activity_frame(records: list) -> pd.DataFrame:
+    """Monta o DataFrame tipado de uma lista de atividades.
+
+    Args:
+        records (list): Lista de dicionários de atividades.
+
+    Returns:
+        pd.DataFrame: DataFrame com as atividades.
+    """
+    buffer = ActivityBuffer()
+    buffer.extend(records)
+    return buffer.to_frame()
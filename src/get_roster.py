@@ -0,0 +1,128 @@
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+class Roster:
+    """Lista persistente dos membros de cada clube, com as mudanças entre coletas.
+
+    A cada coleta, os membros lidos de um clube são comparados com os salvos na
+    execução anterior, separando os atletas que entraram, os que saíram e os que
+    continuam no clube. Os que entraram, e que não eram conhecidos em nenhum
+    clube, são coletados com `backfill_weeks` semanas; os demais, só com as
+    semanas recentes pedidas na linha de comando. Na primeira coleta de um
+    clube, sem membros salvos, ninguém conta como novo.
+
+    Args:
+        folder (str, optional): Pasta dos dados. Padrão é 'data/'.
+        file_name (str, optional): Nome do arquivo dos membros. Padrão é 'members.parquet'.
+        backfill_weeks (int, optional): Semanas coletadas para os atletas novos;
+            com 0, eles são coletados como os demais. Padrão é 4.
+    """
+
+    COLUMNS = [
+        'club_id',
+        'athlete_id',
+        'athlete_name',
+        'link',
+        'joined_at',
+        'updated_at',
+    ]
+
+    def __init__(
+        self,
+        folder: str = 'data/',
+        file_name: str = 'members.parquet',
+        backfill_weeks: int = 4,
+    ):
+        self.path = os.path.join(folder, file_name)
+        self.backfill_weeks = backfill_weeks
+        self.members = pd.DataFrame(columns=self.COLUMNS)
+        self.joined = set()
+
+    def load(self) -> 'Roster':
+        """Carrega os membros salvos, se existirem.
+
+        Arquivos de versões anteriores, sem 'club_id', guardam os membros de um
+        único clube e são atribuídos ao primeiro clube comparado em `diff`.
+
+        Returns:
+            Roster: A própria instância, para encadear chamadas.
+        """
+        if os.path.exists(self.path):
+            df = pd.read_parquet(self.path)
+            if 'club_id' not in df.columns:
+                df['club_id'] = None
+            if 'joined_at' not in df.columns:
+                df['joined_at'] = df['updated_at']
+            df['athlete_id'] = df['athlete_id'].astype(str)
+            self.members = df[self.COLUMNS]
+        logger.info(f'Lista de membros carregada com {len(self.members)} membros.')
+        return self
+
+    def diff(self, club_id: int, members: pd.DataFrame) -> dict:
+        """Compara os membros coletados de um clube com os salvos e os substitui.
+
+        Args:
+            club_id (int): ID do clube.
+            members (pd.DataFrame): Membros retornados por `get_club_members`.
+
+        Returns:
+            dict: Listas de IDs em 'joined', 'left' e 'unchanged'.
+        """
+        members = members.assign(athlete_id=members['athlete_id'].astype(str))
+        stored = self.members['club_id'].isna() | (self.members['club_id'] == club_id)
+        previous = self.members[stored]
+        others = self.members[~stored]
+
+        current = set(members['athlete_id'])
+        before = set(previous['athlete_id'])
+        changes = {
+            'joined': sorted(current - before),
+            'left': sorted(before - current),
+            'unchanged': sorted(current & before),
+        }
+        if not previous.empty:
+            self.joined |= set(changes['joined']) - set(others['athlete_id'])
+
+        joined_at = dict(zip(previous['athlete_id'], previous['joined_at']))
+        now = datetime.now()
+        members = members.assign(
+            club_id=club_id,
+            joined_at=[joined_at.get(i, now) for i in members['athlete_id']],
+        )
+        self.members = pd.concat(
+            [frame for frame in (others, members[self.COLUMNS]) if not frame.empty],
+            ignore_index=True,
+        ).reindex(columns=self.COLUMNS)
+
+        logger.info(
+            f'Clube {club_id}: {len(changes["joined"])} membros entraram, '
+            f'{len(changes["left"])} saíram e {len(changes["unchanged"])} continuam.'
+        )
+        return changes
+
+    def weeks_for(self, athlete_id, weeks: int) -> int:
+        """Semanas a coletar para o atleta: `backfill_weeks` se ele for novo.
+
+        Args:
+            athlete_id (int | str): ID do atleta.
+            weeks (int): Semanas pedidas para os atletas já conhecidos.
+
+        Returns:
+            int: Número de semanas a coletar.
+        """
+        if self.backfill_weeks and str(athlete_id) in self.joined:
+            return max(weeks, self.backfill_weeks)
+        return weeks
+
+    def save(self):
+        """Grava os membros de todos os clubes em disco."""
+        tmp_path = self.path + '.tmp'
+        self.members.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
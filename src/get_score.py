@@ -1,102 +1,318 @@
+import os
+
 import pandas as pd
 
+from src.get_metrics import METRICS
+from src.get_utils import iso_week, load_activity_data
+
+
+# Regras da pontuação. "duration" dá pontos por minuto de atividade, "events"
+# um bônus por atividade nas datas de evento (por padrão, o último dia de cada
+# mês do ano) e "frequency" multiplica os pontos da semana conforme os dias ativos.
+SCORE_RULES = {
+    "duration": {"value_per_minute": 1},
+    "events": {"value_per_event": 100, "dates": None},
+    "frequency": {
+        "multipliers": {1: 1, 2: 1.2, 3: 1.3, 4: 1.4, 5: 1.5, 6: 1.5, 7: 1.5}
+    },
+}
+
 
 class Scorer:
+    """Calcula a pontuação das atividades pelas regras de `SCORE_RULES`.
+
+    As regras são avaliadas juntas: os minutos e os eventos de cada atividade
+    são calculados uma vez, e uma única agregação por atleta e semana fornece os
+    dias ativos, os pontos da semana e o estado usado em `aggregate`. Só as
+    colunas necessárias são lidas do DataFrame, que não é copiado.
+
+    Args:
+        df (pd.DataFrame): Atividades, com ao menos `INPUT_COLUMNS` e as colunas de tempo.
+        col_time (list, optional): Colunas de tempo, em ordem de preferência.
+        rules (dict, optional): Parâmetros que substituem os de `SCORE_RULES`, por
+            regra, como {"events": {"value_per_event": 50}}.
+    """
+
+    # Colunas das atividades usadas pelas regras, além das colunas de tempo.
+    INPUT_COLUMNS = ["athlete_id", "week", "date", "date_time", "link"]
+
     def __init__(
         self,
         df: pd.DataFrame,
         col_time: list = ["moving_time", "elapsed_time", "duration"],
+        rules: dict = None,
     ):
-        self.df = df.copy()
+        self.df = df
         self.col_time = col_time
-        self.columns = ["athlete_id", "date_time", "raised_points", "points"]
+        self.rules = {
+            name: {**config, **(rules or {}).get(name, {})}
+            for name, config in SCORE_RULES.items()
+        }
+        self._weeks = None
 
-    def _points_for_activity_duration(self, value_per_minute: int = 1) -> pd.DataFrame:
-        """Calcula os pontos baseado na duração da atividade em minutos.
+    def _activity_minutes(self) -> pd.Series:
+        """Retorna a duração de cada atividade, em minutos, pela primeira coluna de tempo preenchida."""
+        time = self.df[self.col_time[0]]
+        for column in self.col_time[1:]:
+            time = time.fillna(self.df[column])
+        return time.dt.total_seconds() // 60
 
-        Args:
-            value_per_minute (int, optional): Valor por minuto de atividade. Padrão é 1.
+    def _event_dates(self, dates: list = None) -> pd.DatetimeIndex:
+        """Retorna as datas dos eventos, por padrão o último dia de cada mês do ano."""
+        if dates is None:
+            return pd.date_range(
+                start=pd.Timestamp.today().replace(month=1, day=1),
+                periods=12,
+                freq="ME",
+            ).normalize()
+        return pd.to_datetime(pd.Index(dates))
 
-        Returns:
-            pd.DataFrame: DataFrame com os pontos calculados.
+    def _evaluate(self):
+        """Calcula os pontos por atividade e a agregação por atleta e semana, uma vez."""
+        if self._weeks is not None:
+            return
+
+        with METRICS.span("score.activities"):
+            day = pd.to_datetime(self.df["date"])
+            self._minutes = self._activity_minutes().to_numpy()
+            self._hits = day.isin(
+                self._event_dates(self.rules["events"]["dates"])
+            ).to_numpy()
+
+        with METRICS.span("score.weeks"):
+            self._weeks = (
+                pd.DataFrame(
+                    {
+                        "athlete_id": self.df["athlete_id"].array,
+                        "week": self.df["week"].array,
+                        "day": day.array,
+                        "date_time": self.df["date_time"].array,
+                        "minutes": self._minutes,
+                        "events": self._hits,
+                    }
+                )
+                .groupby(["athlete_id", "week"])
+                .agg(
+                    minutes=("minutes", "sum"),
+                    days=("day", "nunique"),
+                    events=("events", "sum"),
+                    date_time=("date_time", "max"),
+                )
+                .reset_index()
+            )
+
+    def _points_for_activity_duration(self) -> pd.DataFrame:
+        """Pontos de cada atividade pela duração em minutos."""
+        value_per_minute = self.rules["duration"]["value_per_minute"]
+        return pd.DataFrame(
+            {
+                "athlete_id": self.df["athlete_id"].array,
+                "date_time": self.df["date_time"].array,
+                "raised_points": ("Atividade " + self.df["link"].astype(str)).array,
+                "points": self._minutes * value_per_minute,
+            }
+        )
+
+    def _points_for_events(self) -> pd.DataFrame:
+        """Bônus de cada atividade feita em uma data de evento."""
+        hits = self._hits
+        return pd.DataFrame(
+            {
+                "athlete_id": self.df["athlete_id"].array[hits],
+                "date_time": self.df["date_time"][hits].dt.normalize().array,
+                "raised_points": (
+                    "Evento bônus no dia " + self.df["date"][hits].astype(str)
+                ).array,
+                "points": self.rules["events"]["value_per_event"],
+            }
+        )
+
+    def _points_for_activity_frequency(self) -> pd.DataFrame:
+        """Pontos extras da semana pelo multiplicador dos dias ativos.
+
+        O multiplicador é aplicado aos pontos da semana por duração somados aos
+        bônus de eventos.
         """
-        df = self.df.copy()
-        df["time"] = df[self.col_time].bfill(axis=1).iloc[:, 0]
-        df["activity_minutes"] = df["time"].dt.total_seconds() // 60
-        df["points"] = df["activity_minutes"] * value_per_minute
-        df["raised_points"] = "Atividade " + df["link"].astype(str)
+        weeks = self._weeks
+        base = (
+            weeks["minutes"] * self.rules["duration"]["value_per_minute"]
+            + weeks["events"] * self.rules["events"]["value_per_event"]
+        )
+        rule = weeks["days"].map(self.rules["frequency"]["multipliers"]).fillna(1)
 
-        return df[self.columns].dropna(how="all", axis=1)
+        return pd.DataFrame(
+            {
+                "athlete_id": weeks["athlete_id"],
+                "date_time": weeks["date_time"].dt.normalize(),
+                "raised_points": "Pontos multiplicados pela regra "
+                + rule.astype(str)
+                + " na semana "
+                + weeks["week"].astype(str)
+                + ", com "
+                + weeks["days"].astype(str)
+                + " dias ativos",
+                "points": base * (rule - 1),
+            }
+        )
 
-    def _points_for_activity_frequency(
-        self, rule: dict = {1: 1, 2: 1.2, 3: 1.3, 4: 1.4, 5: 1.5, 6: 1.5, 7: 1.5}
-    ) -> pd.DataFrame:
-        """Calcula os pontos baseado na frequência de atividades na semana.
+    def aggregate(self) -> pd.DataFrame:
+        """Resume as atividades por atleta e semana.
 
-        Args:
-            rule (dict, optional): Dicionário com a regra de multiplicação dos pontos.
-            Padrão é {1: 1, 2: 1.2, 3: 1.3, 4: 1.4, 5: 1.5, 6: 1.5, 7: 1.5}.
+        Returns:
+            pd.DataFrame: DataFrame com minutos, dias ativos e eventos de cada atleta na semana.
+        """
+        self._evaluate()
+        return self._weeks[["athlete_id", "week", "minutes", "days", "events"]]
+
+    def score(self) -> pd.DataFrame:
+        """Calcula a pontuação total dos atletas.
 
         Returns:
-            pd.DataFrame: DataFrame com os pontos calculados.
+            pd.DataFrame: DataFrame com a pontuação total dos atletas.
         """
-        df = (
-            self.df.groupby(["athlete_id", "week"])
-            .agg(
-                days=("date", "nunique"),
-                points_old=("points", "sum"),
-                date_time=("date_time", "max"),
+        self._evaluate()
+        with METRICS.span("score.rows"):
+            return pd.concat(
+                [
+                    self._points_for_activity_duration(),
+                    self._points_for_activity_frequency(),
+                    self._points_for_events(),
+                ],
+                ignore_index=True,
             )
-            .reset_index()
-        )
 
-        df["rule"] = (
-            df["days"].map(rule).fillna(1)
-        )
-        df["points"] = df["points_old"] * (df["rule"] - 1)
-        df["date_time"] = df["date_time"].dt.normalize()
-        df["raised_points"] = df.apply(
-            lambda x: f"Pontos multiplicados pela regra {x['rule']} na semana {x['week']}, com {x['days']} dias ativos",
-            axis=1,
-        )
 
-        return df[self.columns]
+class IncrementalScorer:
+    """Mantém `score.parquet` atualizado recalculando só as semanas afetadas.
 
-    def _points_for_events(self, value_per_event: int = 100, dates: list = None) -> pd.DataFrame:
-        """Calcula os pontos baseado em eventos específicos.
+    A cada lote de atividades novas ou alteradas, apenas os pares (atleta,
+    semana) tocados são relidos das partições e pontuados de novo; as linhas
+    desses pares são substituídas e o restante do histórico não é recalculado.
+    Uma atividade que mudou de semana também toca a semana onde era pontuada.
+
+    Args:
+        folder (str, optional): Pasta dos dados. Padrão é 'data/'.
+        score_file (str, optional): Arquivo da pontuação. Padrão é 'score.parquet'.
+    """
+
+    KEYS = ["athlete_id", "week"]
+
+    def __init__(
+        self,
+        folder: str = "data/",
+        score_file: str = "score.parquet",
+    ):
+        self.folder = folder
+        self.score_path = os.path.join(folder, score_file)
+        self.input_columns = Scorer.INPUT_COLUMNS + [
+            "moving_time",
+            "elapsed_time",
+            "duration",
+        ]
+
+    def has_state(self) -> bool:
+        """Indica se já existe uma pontuação salva para ser atualizada."""
+        return os.path.exists(self.score_path)
+
+    def rebuild(self) -> pd.DataFrame:
+        """Recalcula toda a pontuação a partir de todas as partições.
+
+        Returns:
+            pd.DataFrame: DataFrame com a pontuação completa.
+        """
+        score_df = Scorer(
+            load_activity_data(self.folder, columns=self.input_columns)
+        ).score()
+
+        self._write(self.score_path, score_df)
+        return score_df
+
+    def touched(self, activities: pd.DataFrame) -> pd.DataFrame:
+        """Retorna os pares (atleta, semana) afetados pelo lote.
+
+        Além das semanas do lote, inclui as semanas em que `score.parquet` ainda
+        pontua alguma dessas atividades, o que acontece quando a atividade mudou
+        de semana.
 
         Args:
-            value_per_event (int, optional): Valor por evento. Padrão é 100.
-            dates (list, optional): Lista com as datas dos eventos. Padrão são os últimos dias para cada mês.
+            activities (pd.DataFrame): Atividades novas ou alteradas.
 
         Returns:
-            pd.DataFrame: DataFrame com os pontos calculados.
+            pd.DataFrame: DataFrame com os pares 'athlete_id' e 'week'.
         """
-        df = self.df.copy()
-        if dates is None:
-            event_dates = pd.date_range(
-                start=pd.Timestamp.today().replace(month=1, day=1), periods=12, freq="ME"
-            ).strftime("%Y-%m-%d")
-        else:
-            event_dates = dates
+        touched = activities[self.KEYS].astype({"athlete_id": "int64", "week": "str"})
+
+        if os.path.exists(self.score_path):
+            current = pd.read_parquet(
+                self.score_path, columns=["athlete_id", "date_time", "raised_points"]
+            )
+            scored = current["raised_points"].isin(
+                "Atividade " + activities["link"].astype(str)
+            )
+            current = current[scored]
+            touched = pd.concat(
+                [
+                    touched,
+                    pd.DataFrame(
+                        {
+                            "athlete_id": current["athlete_id"].astype("int64"),
+                            "week": iso_week(current["date_time"]).astype(str),
+                        }
+                    ),
+                ],
+                ignore_index=True,
+            )
+
+        return touched.drop_duplicates(ignore_index=True)
 
-        df = df[df["date"].isin(event_dates)]
-        df["date_time"] = df["date_time"].dt.normalize()
-        df["points"] = value_per_event
-        df["raised_points"] = "Evento bônus no dia " + df["date"].astype(str)
+    def update(
+        self, activities: pd.DataFrame, touched: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        """Recalcula a pontuação dos pares (atleta, semana) afetados pelo lote.
 
-        return df[self.columns]
+        As partições já devem conter o lote (ver `save_activity_data`), pois todas
+        as atividades das semanas afetadas são relidas para calcular os dias ativos.
 
-    def score(self) -> pd.DataFrame:
-        """Calcula a pontuação total dos atletas.
+        Args:
+            activities (pd.DataFrame): Atividades novas ou alteradas.
+            touched (pd.DataFrame, optional): Pares já calculados por `touched`.
 
         Returns:
-            pd.DataFrame: DataFrame com a pontuação total dos atletas.
+            pd.DataFrame: DataFrame com a nova pontuação dos pares afetados.
         """
-        score_duration = self._points_for_activity_duration()
-        score_frequency = self._points_for_activity_frequency()
-        score_events = self._points_for_events()
+        if touched is None:
+            touched = self.touched(activities)
 
-        return pd.concat(
-            [score_duration, score_frequency, score_events], ignore_index=True
+        data = load_activity_data(
+            self.folder, columns=self.input_columns, weeks=touched["week"].unique()
+        )
+        data = data.astype({"athlete_id": "int64", "week": "str"}).merge(
+            touched, on=self.KEYS
         )
+
+        score_df = Scorer(data).score()
+
+        self._replace(self.score_path, score_df, touched)
+        return score_df
+
+    def _replace(self, path: str, rows: pd.DataFrame, touched: pd.DataFrame):
+        """Substitui no arquivo as linhas dos pares (atleta, semana) afetados."""
+        if os.path.exists(path):
+            current = pd.read_parquet(path)
+            keys = pd.MultiIndex.from_arrays(
+                [
+                    current["athlete_id"].astype("int64"),
+                    iso_week(current["date_time"]).astype(str),
+                ]
+            )
+            stale = keys.isin(pd.MultiIndex.from_frame(touched))
+            rows = pd.concat([current[~stale], rows], ignore_index=True)
+
+        self._write(path, rows)
+
+    @staticmethod
+    def _write(path: str, df: pd.DataFrame):
+        tmp_path = path + ".tmp"
+        with METRICS.span("parquet.score"):
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
@@ -1,13 +1,24 @@
 import logging
 import re
+import time
 from datetime import datetime
-from time import sleep
+from fnmatch import fnmatch
+from urllib.parse import urlparse
 
 import numpy as np
 import pandas as pd
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
-from src.get_utils import get_msg_log, get_week, parse_datetime, parse_time
+from src.get_limiter import ThrottledError, throttle_reason
+from src.get_metrics import METRICS
+from src.get_records import build_activity_frame
+from src.get_utils import (
+    get_msg_log,
+    get_week,
+    get_week_start,
+    parse_feed_datetime,
+)
 
 
 logging.basicConfig(
@@ -17,41 +28,735 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# https://support.strava.com/hc/en-us/articles/216919407-Supported-Sport-Types-on-Strava
+PACE_TYPES = [
+    'walk',
+    'run',
+    'long run',
+    'virtual run',
+    'treadmill workout',
+    'hike',
+    'workout',
+]
+DISTANCE_TYPES = PACE_TYPES + [
+    'ride',
+    'mountain bike ride',
+    'gravel ride',
+    'e-bike ride',
+    'e-mountain bike ride',
+    'velomobile',
+    'virtual ride',
+]
+
+# Perfil enxuto: tipos de recurso e domínios que a coleta nunca lê e que são
+# bloqueados antes de sair do navegador. Os domínios valem também para os
+# subdomínios e aceitam curingas (`fnmatch`).
+BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font']
+BLOCKED_DOMAINS = [
+    'mapbox.com',
+    'heatmap-external-*.strava.com',
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'facebook.com',
+    'branch.io',
+    'optimizely.com',
+    'segment.io',
+    'segment.com',
+    'cookielaw.org',
+]
+
+SHOW_MORE_BUTTON = '//*[@id="heading"]/div/div/div[2]/div[1]/div[1]/button'
+
+# Seletores de cada campo da página de atividade. `pick` indica qual elemento
+# usar: um índice (como `.nth()`) ou 'only', que exige um único elemento (como o
+# modo estrito do Playwright). As XPaths alternativas são testadas em ordem.
+ACTIVITY_FIELDS = {
+    'athlete_name': {
+        'xpaths': ['//span[@class="title"]/a[@class="minimal"]'],
+        'pick': 0,
+    },
+    'activity_type': {
+        'xpaths': ['//*[@id="heading"]/header/h2/span'],
+        'pick': 'only',
+    },
+    'date_time': {
+        'xpaths': ['//div[@class="details"]/time'],
+        'pick': 'only',
+    },
+    'activity_name': {
+        'xpaths': [
+            '//div[@class="details"]/h1[@class="text-title1 marginless activity-name"]'
+        ],
+        'pick': 'only',
+    },
+    'location': {
+        'xpaths': ['//div[@class="details"]/span[@class="location"]'],
+        'pick': 'only',
+    },
+    'moving_time': {
+        'xpaths': ['//ul[@class="inline-stats section"]//li//strong'],
+        'pick': 1,
+    },
+    'distance': {
+        'xpaths': [
+            '//*[@id="heading"]/div/div/div[2]/ul/li[div[text()="Distance"]]/strong'
+        ],
+        'pick': 0,
+    },
+    'pace': {
+        'xpaths': ['//ul[@class="inline-stats section"]//li//strong'],
+        'pick': 2,
+    },
+    'elevation': {
+        'xpaths': [
+            '//div[contains(@class, "section more-stats")]//div[contains(text(), "Elevation")]/following-sibling::div//strong[abbr[@class="unit" and @title="meters"]]',
+            '//*[@id="heading"]/div/div/div[2]/ul/li[div[text()="Elevation"]]/strong',
+        ],
+        'pick': 'only',
+    },
+    'elapsed_time': {
+        'xpaths': [
+            '//div[contains(@class, "section more-stats")]//span[@data-glossary-term="definition-elapsed-time"]/parent::div/following-sibling::div//strong',
+            '//table[@class="unstyled"]//tr[th/span[contains(text(), "Elapsed Time")]]/td',
+        ],
+        'pick': 'only',
+    },
+    'duration': {
+        'xpaths': ['//*[@id="heading"]/div/div/div[2]/ul/li/strong'],
+        'pick': 'only',
+    },
+    'calories': {
+        'xpaths': [
+            '//div[contains(@class, "section more-stats")]//div[contains(text(), "Calories")]/following-sibling::div//strong',
+            '//div[@class="section more-stats"]//table//tr[th[text()="Calories"]]/td[1]',
+        ],
+        'pick': 'only',
+    },
+}
+
+# Script executado dentro da página: abre o "mostrar mais" e lê todos os campos
+# de uma vez. Retorna o texto de cada campo, None quando o elemento não existe e
+# omite o campo quando a leitura é ambígua (o modo por locator também falharia).
+ACTIVITY_SCRIPT = """
+async ({show_more, fields}) => {
+    const find = (xpath) => {
+        const result = document.evaluate(
+            xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        const nodes = [];
+        for (let i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+        return nodes;
+    };
+    const visible = (el) => {
+        const box = el.getBoundingClientRect();
+        return box.width > 0 && box.height > 0
+            && getComputedStyle(el).visibility !== 'hidden';
+    };
+
+    const button = find(show_more)[0];
+    if (button && visible(button)) {
+        button.click();
+        await new Promise((resolve) => requestAnimationFrame(() => setTimeout(resolve, 50)));
+    }
+
+    const raw = {};
+    for (const [name, spec] of Object.entries(fields)) {
+        raw[name] = null;
+        for (const xpath of spec.xpaths) {
+            const nodes = find(xpath);
+            if (!nodes.length || !visible(nodes[0])) {
+                continue;
+            }
+            const node = spec.pick === 'only'
+                ? (nodes.length === 1 ? nodes[0] : undefined)
+                : nodes[spec.pick];
+            if (!node) {
+                delete raw[name];
+                break;
+            }
+            raw[name] = (node.textContent || '').trim();
+            if (raw[name]) {
+                break;
+            }
+        }
+    }
+    return raw;
+}
+"""
+
+# Script executado no feed do clube: para cada link de atividade, sobe até o
+# primeiro bloco que também tem o link do atleta e o horário da entrada. Em
+# atividades em grupo, cada participante tem o seu próprio bloco.
+FEED_SCRIPT = """
+() => {
+    const entries = [];
+    for (const link of document.querySelectorAll('a[data-testid="activity_name"]')) {
+        const activity = (link.getAttribute('href') || '').match(/\\/activities\\/(\\d+)/);
+        if (!activity) {
+            continue;
+        }
+        let node = link.parentElement;
+        while (node && !(node.querySelector('a[href*="/athletes/"]') && node.querySelector('time'))) {
+            node = node.parentElement;
+        }
+        if (!node) {
+            continue;
+        }
+        const athlete = node.querySelector('a[href*="/athletes/"]')
+            .getAttribute('href').match(/\\/athletes\\/(\\d+)/);
+        const time = node.querySelector('time');
+        entries.push({
+            activity_id: activity[1],
+            athlete_id: athlete ? athlete[1] : null,
+            date_time: time.getAttribute('datetime') || time.textContent.trim(),
+        });
+    }
+    return entries;
+}
+"""
+
+
+# Script executado na lista de membros do clube: lê o link e o nome de cada
+# atleta e os números das páginas ligadas na paginação.
+MEMBERS_SCRIPT = """
+() => ({
+    members: Array.from(document.querySelectorAll('ul.list-athletes li'))
+        .map((item) => item.querySelector('.text-headline a'))
+        .filter(Boolean)
+        .map((link) => ({href: link.getAttribute('href'), name: link.innerText.trim()})),
+    pages: Array.from(document.querySelectorAll('.pagination a'))
+        .map((link) => (link.getAttribute('href') || '').match(/[?&]page=(\\d+)/))
+        .filter(Boolean)
+        .map((match) => Number(match[1])),
+})
+"""
+
+
+# Links de atividade da página do atleta. Antes de abrir outra semana, os links
+# da semana anterior são marcados com `data-stale`, para que só os que chegarem
+# com o conteúdo novo sejam lidos.
+ACTIVITY_LINKS = '//a[@data-testid="activity_name"][not(@data-stale)]'
+MARK_STALE_SCRIPT = """
+() => document.querySelectorAll('a[data-testid="activity_name"]')
+    .forEach((link) => link.setAttribute('data-stale', ''))
+"""
+
+
+def is_interval_response(url: str, athlete_id, week: int) -> bool:
+    """Indica se a URL é a requisição que carrega uma semana na página do atleta.
+
+    Args:
+        url (str): URL da resposta.
+        athlete_id (int | str): ID do atleta.
+        week (int): Semana, no formato de `get_week`.
+
+    Returns:
+        bool: True se é a resposta de `/athletes/<id>/interval` para a semana.
+    """
+    parsed = urlparse(url)
+    return parsed.path == f'/athletes/{athlete_id}/interval' and (
+        f'interval={week}' in parsed.query.split('&')
+    )
+
+
+def members_url(url: str, club_id: int, page: int = 1) -> str:
+    """Retorna o endereço de uma página da lista de membros do clube."""
+    if page > 1:
+        return f'{url}/clubs/{club_id}/members?page={page}'
+    return f'{url}/clubs/{club_id}/members'
+
+
+def new_member_record(href: str, name: str, url: str) -> dict:
+    """Retorna o dicionário de um membro a partir do link do perfil do atleta.
+
+    Args:
+        href (str): Link do perfil, como '/athletes/123'.
+        name (str): Nome do atleta.
+        url (str): Endereço base do Strava.
+
+    Returns:
+        dict: Dicionário do membro.
+    """
+    return {
+        'athlete_id': href.split('/')[-1],
+        'athlete_name': name,
+        'link': url + href,
+        'updated_at': datetime.now(),
+    }
+
+
+def new_activity_record(athlete_id: int, activity_id: int, url: str) -> dict:
+    """Retorna o dicionário de uma atividade com os valores padrão de cada campo.
+
+    Args:
+        athlete_id (int): ID do atleta.
+        activity_id (int): ID da atividade.
+        url (str): Endereço base do Strava.
+
+    Returns:
+        dict: Dicionário da atividade.
+    """
+    return {
+        'athlete_id': athlete_id,
+        'activity_id': activity_id,
+        'athlete_name': 'Unnamed',
+        'activity_type': 'Unnamed',
+        'date': None,
+        'date_time': None,
+        'location': 'Unnamed',
+        'activity_name': 'Unnamed',
+        'moving_time': np.nan,
+        'elapsed_time': np.nan,
+        'duration': np.nan,
+        'calories': np.nan,
+        'distance': np.nan,
+        'pace': np.nan,
+        'elevation': np.nan,
+        'link': f'{url}/activities/{activity_id}',
+        'updated_at': datetime.now(),
+        'week': None,
+    }
+
+
+def feed_by_athlete(feed: pd.DataFrame) -> dict:
+    """Agrupa as atividades do feed por atleta, no formato de `get_athlete_activities`.
+
+    Args:
+        feed (pd.DataFrame): DataFrame retornado por `get_club_feed`.
+
+    Returns:
+        dict: Lista de IDs das atividades por ID do atleta (como string).
+    """
+    feed = feed.dropna(subset=['athlete_id'])
+    activities = feed.groupby(feed['athlete_id'].astype(str))['activity_id']
+    return activities.agg(list).to_dict()
+
+
+def _parse_activity_type(content: str) -> str:
+    if not content:
+        return 'Unnamed'
+    parts = content.replace('–', '-').replace('—', '-').split('-')
+    return parts[-1].strip() if len(parts) > 1 else 'Unnamed'
+
+
+def parse_activity_fields(data: dict, raw: dict) -> dict:
+    """Aplica aos textos brutos de uma atividade as mesmas regras do modo por locator.
+
+    Só os campos de texto são tratados aqui. Horários, durações e números ficam
+    como texto bruto e são convertidos em lote por `parse_activity_columns`,
+    quando as atividades viram DataFrame.
+
+    Args:
+        data (dict): Dicionário da atividade com os valores padrão, atualizado no lugar.
+        raw (dict): Texto de cada campo, None para elemento inexistente. Campos
+            ausentes mantêm o valor padrão.
+
+    Returns:
+        dict: O próprio `data`, já preenchido.
+    """
+    rules = {
+        'athlete_name': (lambda c: c or 'Unnamed', 'Not Found'),
+        'activity_type': (_parse_activity_type, 'Not Found'),
+        'date_time': (lambda c: c or np.nan, None),
+        'activity_name': (lambda c: c or 'Unnamed', 'Not Found'),
+        'location': (lambda c: c or 'Unnamed', 'Not Found'),
+        'moving_time': (lambda c: c or np.nan, np.nan),
+        'distance': (lambda c: c or np.nan, np.nan),
+        'elevation': (lambda c: c or np.nan, np.nan),
+        'pace': (lambda c: c or np.nan, np.nan),
+        'elapsed_time': (lambda c: c or np.nan, np.nan),
+        'duration': (lambda c: c or np.nan, np.nan),
+        'calories': (lambda c: c or np.nan, np.nan),
+    }
+
+    for name, (parse, not_found) in rules.items():
+        if name not in raw:
+            continue
+        if name == 'distance' and data['activity_type'].lower() not in DISTANCE_TYPES:
+            continue
+        if name == 'pace' and data['activity_type'].lower() not in PACE_TYPES:
+            continue
+
+        try:
+            with METRICS.span(f'parse.{name}'):
+                if raw[name] is None:
+                    if not_found is not None:
+                        data[name] = not_found
+                else:
+                    data[name] = parse(raw[name])
+        except Exception as e:
+            logger.error(
+                get_msg_log(
+                    'activity',
+                    'error',
+                    f"{data['athlete_id']}: {data['activity_id']} - {e}",
+                )
+            )
+    return data
+
 
 class StravaScraper:
     URL = 'https://www.strava.com'
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
-    def __init__(self, email, password):
+    def __init__(
+        self,
+        email,
+        password,
+        limiter=None,
+        extraction: str = 'script',
+        lean: bool = True,
+        blocked_types: list = None,
+        blocked_domains: list = None,
+        url: str = None,
+    ):
+        if url:
+            self.URL = url.rstrip('/')
         self.email = email
         self.password = password
+        self.limiter = limiter
+        self.extraction = extraction
+        self.lean = lean
+        self.blocked_types = (
+            BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types
+        )
+        self.blocked_domains = (
+            BLOCKED_DOMAINS if blocked_domains is None else blocked_domains
+        )
+        self.route_stats = {}
+        self.http = None
+        self.cache = None
+        self.watermarks = None
+        self.playwright = None
+        self.browser = None
+        self._remote = None
+        self.endpoint = None
+        self.page = None
+        self.wait_times = {}
+        self.wait_timeouts = {}
 
     def start_browser(
         self,
         headless=False,
         session_file: str = 'user_data',
         view_port: dict = {'width': 1920, 'height': 1080},
+        debug_port: int = None,
     ):
         self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch_persistent_context(
             user_data_dir=session_file,
             headless=headless,
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            user_agent=self.USER_AGENT,
+            args=[f'--remote-debugging-port={debug_port}'] if debug_port else None,
         )
+        self._apply_profile()
         self.page = self.browser.new_page()
         self.page.set_viewport_size(view_port)
         logger.info(get_msg_log('start', 'info', self.email))
 
+    def attach_browser(
+        self, endpoint: str, view_port: dict = {'width': 1920, 'height': 1080}
+    ):
+        """Conecta ao navegador já logado de um `BrowserDaemon`, via CDP.
+
+        Usa o contexto persistente do daemon, com a sessão dele, em uma página
+        nova. O perfil enxuto é aplicado só nessa página, e `close_browser`
+        fecha a página e desconecta sem encerrar o daemon.
+
+        Args:
+            endpoint (str): Endereço CDP do daemon, como 'http://127.0.0.1:9222'.
+            view_port (dict, optional): Tamanho da janela.
+        """
+        self.playwright = sync_playwright().start()
+        self._remote = self.playwright.chromium.connect_over_cdp(endpoint)
+        self.endpoint = endpoint
+        self.browser = self._remote.contexts[0]
+        self.page = self.browser.new_page()
+        self.page.set_viewport_size(view_port)
+        self._apply_profile(self.page)
+        logger.info(f'Conectado ao navegador em {endpoint}.')
+
+    def start_worker(
+        self,
+        storage_state: dict,
+        headless=True,
+        view_port: dict = {'width': 1920, 'height': 1080},
+    ):
+        """Inicia um navegador auxiliar reaproveitando a sessão já logada.
+
+        Deve ser chamado na mesma thread que vai usar a página, pois a API
+        síncrona do Playwright não pode ser compartilhada entre threads.
+
+        Args:
+            storage_state (dict): Cookies e storage exportados do contexto principal.
+            headless (bool, optional): Executa sem interface gráfica. Padrão é True.
+            view_port (dict, optional): Tamanho da janela.
+        """
+        self.playwright = sync_playwright().start()
+        browser = self.playwright.chromium.launch(headless=headless)
+        self.browser = browser.new_context(
+            storage_state=storage_state,
+            user_agent=self.USER_AGENT,
+            viewport=view_port,
+        )
+        self._apply_profile()
+        self.page = self.browser.new_page()
+
+    def _blocked(self, request) -> bool:
+        if request.resource_type in self.blocked_types:
+            return True
+        host = urlparse(request.url).hostname or ''
+        return any(
+            host == domain or host.endswith('.' + domain) or fnmatch(host, domain)
+            for domain in self.blocked_domains
+        )
+
+    def _count_request(self, resource_type: str, key: str, size: int = 1):
+        stats = self.route_stats.setdefault(
+            resource_type, {'allowed': 0, 'blocked': 0, 'allowed_bytes': 0}
+        )
+        stats[key] += size
+
+    def _route(self, route):
+        if self._blocked(route.request):
+            self._count_request(route.request.resource_type, 'blocked')
+            route.abort()
+        else:
+            self._count_request(route.request.resource_type, 'allowed')
+            route.continue_()
+
+    def _count_response(self, response):
+        size = response.headers.get('content-length')
+        if size and size.isdigit():
+            self._count_request(
+                response.request.resource_type, 'allowed_bytes', int(size)
+            )
+
+    def _apply_profile(self, target=None):
+        """Bloqueia os recursos do perfil enxuto e conta as requisições.
+
+        Args:
+            target (optional): Página ou contexto onde o perfil é aplicado.
+                Padrão é o contexto do navegador.
+        """
+        if not self.lean:
+            return
+        target = target or self.browser
+        target.route('**/*', self._route)
+        target.on('response', self._count_response)
+
+    def route_summary(self) -> pd.DataFrame:
+        """Resume as requisições bloqueadas e liberadas pelo perfil enxuto.
+
+        Os bytes são os declarados em `Content-Length` das respostas liberadas;
+        o tamanho das bloqueadas não é conhecido, pois nunca são baixadas.
+
+        Returns:
+            pd.DataFrame: Requisições liberadas, bloqueadas e bytes liberados por
+            tipo de recurso.
+        """
+        rows = [
+            {'resource_type': resource_type, **stats}
+            for resource_type, stats in sorted(self.route_stats.items())
+        ]
+        return pd.DataFrame(
+            rows, columns=['resource_type', 'allowed', 'blocked', 'allowed_bytes']
+        )
+
+    def storage_state(self) -> dict:
+        """Exporta cookies e storage da sessão atual para outros navegadores."""
+        return self.browser.storage_state()
+
     def close_browser(self):
-        if self.browser:
+        """Fecha o navegador, se estiver aberto; chamadas repetidas não fazem nada."""
+        if self._remote:
+            self.page.close()
+            self._remote.close()
+        elif self.browser:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
+        self.playwright = self.browser = self._remote = self.page = None
+
+    def goto(self, url: str, allow_login: bool = False, breaker_trips: int = 2):
+        """Navega para a URL respeitando o limitador de requisições, se houver.
+
+        Com um limitador, cada resposta é verificada: se o Strava limitou a
+        coleta (429, captcha ou redirecionamento para o login), o limitador é
+        avisado para recuar e a navegação é repetida. As tentativas seguem pelas
+        pausas do disjuntor e só param depois de ele abrir `breaker_trips` vezes
+        durante esta navegação.
+
+        Args:
+            url (str): URL de destino.
+            allow_login (bool, optional): Se True, cair no login não conta como
+                bloqueio, para páginas seguidas de `login_if_needed`. Padrão é False.
+            breaker_trips (int, optional): Aberturas do disjuntor antes de
+                desistir. Padrão é 2.
+
+        Raises:
+            ThrottledError: Se a página continuar bloqueada após as aberturas.
+        """
+        trips = self.limiter.trips(url) if self.limiter else 0
+        while True:
+            if self.limiter:
+                with METRICS.span('limiter'):
+                    self.limiter.wait(url)
+            with METRICS.span('navigation'):
+                response = self.page.goto(url)
+            if not self.limiter:
+                return response
+
+            reason = throttle_reason(
+                response.status if response else None, self.page.url, allow_login
+            )
+            if reason is None:
+                self.limiter.success(url)
+                return response
+            logger.warning(f'{url}: resposta limitada pelo Strava ({reason}).')
+            self.limiter.throttled(url, reason)
+            if self.limiter.trips(url) - trips >= breaker_trips:
+                raise ThrottledError(f'{url}: bloqueado pelo Strava ({reason}).')
 
     def element_exists(self, element: str, timeout: int = 3000) -> bool:
+        with METRICS.span('element_exists'):
+            try:
+                return self.page.locator(element).first.is_visible(timeout=timeout)
+            except Exception:
+                METRICS.timeout('element_exists')
+                return False
+
+    def wait_ready(
+        self,
+        step: str,
+        selectors: list = None,
+        network_idle: bool = False,
+        timeout: int = 10000,
+        selector_timeout: int = None,
+    ) -> bool:
+        """Aguarda a página ficar pronta em vez de dormir um tempo fixo.
+
+        Espera, nesta ordem, a rede ficar ociosa (se solicitado) e o primeiro
+        seletor visível entre os informados. O tempo efetivamente aguardado é
+        registrado em `wait_times[step]` e os estouros em `wait_timeouts[step]`.
+
+        Args:
+            step (str): Nome da etapa, usado no registro dos tempos.
+            selectors (list, optional): Seletores (XPath ou CSS) que indicam que
+                o conteúdo foi carregado. Basta um deles aparecer.
+            network_idle (bool, optional): Aguarda a rede ficar ociosa. Padrão é False.
+            timeout (int, optional): Tempo máximo de cada espera, em ms. Padrão é 10000.
+            selector_timeout (int, optional): Tempo máximo da espera pelos seletores,
+                em ms. Padrão é o mesmo de `timeout`.
+
+        Returns:
+            bool: True se a página ficou pronta antes do tempo máximo.
+        """
+        start = time.perf_counter()
+        ready = True
+
         try:
-            return self.page.locator(element).first.is_visible(timeout=timeout)
-        except Exception:
-            return False
+            if network_idle:
+                self.page.wait_for_load_state('networkidle', timeout=timeout)
+            if selectors:
+                locator = self.page.locator(selectors[0])
+                for selector in selectors[1:]:
+                    locator = locator.or_(self.page.locator(selector))
+                locator.first.wait_for(
+                    state='visible', timeout=selector_timeout or timeout
+                )
+        except PlaywrightTimeoutError:
+            ready = False
+
+        self._record_wait(step, time.perf_counter() - start, ready)
+        return ready
+
+    def goto_expecting(self, url: str, step: str, matches, timeout: int = 5000) -> bool:
+        """Navega para a URL e aguarda a resposta que traz o conteúdo da página.
+
+        Quando só o fragmento da URL (`#...`) muda, a navegação retorna na hora e
+        a rede pode já estar ociosa antes de a página pedir o conteúdo novo, então
+        `wait_ready` não serve. Aqui a espera é pela própria requisição da página.
+        O tempo é registrado como em `wait_ready`.
+
+        Args:
+            url (str): URL de destino.
+            step (str): Nome da etapa, usado no registro dos tempos.
+            matches (callable): Recebe a URL de cada resposta e indica se é a
+                que traz o conteúdo.
+            timeout (int, optional): Tempo máximo de espera, em ms. Padrão é 5000.
+
+        Returns:
+            bool: True se a resposta chegou, com sucesso, antes do tempo máximo.
+        """
+        start = time.perf_counter()
+        try:
+            with self.page.expect_response(
+                lambda response: matches(response.url), timeout=timeout
+            ) as info:
+                self.goto(url)
+            ready = info.value.ok
+        except PlaywrightTimeoutError:
+            ready = False
+
+        self._record_wait(step, time.perf_counter() - start, ready)
+        return ready
+
+    def wait_more(
+        self, step: str, selector: str, count: int, timeout: int = 5000
+    ) -> bool:
+        """Aguarda a página passar a ter mais de `count` elementos do seletor CSS.
+
+        Usado na rolagem infinita, em que a rede pode ficar ociosa antes de a
+        página pedir a próxima carga. O tempo é registrado como em `wait_ready`.
+
+        Returns:
+            bool: True se novos elementos apareceram antes do tempo máximo.
+        """
+        start = time.perf_counter()
+        try:
+            self.page.wait_for_function(
+                '([selector, count]) => document.querySelectorAll(selector).length > count',
+                arg=[selector, count],
+                timeout=timeout,
+            )
+            ready = True
+        except PlaywrightTimeoutError:
+            ready = False
+
+        self._record_wait(step, time.perf_counter() - start, ready)
+        return ready
+
+    def _record_wait(self, step: str, elapsed: float, ready: bool):
+        if not ready:
+            self.wait_timeouts[step] = self.wait_timeouts.get(step, 0) + 1
+            METRICS.timeout(f'wait.{step}')
+        self.wait_times.setdefault(step, []).append(elapsed)
+        METRICS.record(f'wait.{step}', elapsed)
+
+    def wait_summary(self) -> pd.DataFrame:
+        """Resume os tempos de espera registrados por etapa.
+
+        Returns:
+            pd.DataFrame: Quantidade, média, máximo e estouros de tempo por etapa.
+        """
+        rows = [
+            {
+                'step': step,
+                'count': len(times),
+                'mean_s': float(np.mean(times)),
+                'max_s': float(np.max(times)),
+                'timeouts': self.wait_timeouts.get(step, 0),
+            }
+            for step, times in self.wait_times.items()
+        ]
+        return pd.DataFrame(
+            rows, columns=['step', 'count', 'mean_s', 'max_s', 'timeouts']
+        )
 
     def login_if_needed(self):
         logger.info(get_msg_log('login', 'info', self.email))
@@ -59,45 +764,91 @@ class StravaScraper:
             self.page.locator('//*[@id="desktop-email"]').click()
             self.page.locator('//*[@id="desktop-email"]').fill(self.email)
             self.page.locator('//*[@id="desktop-login-button"]').click()
-            sleep(2)
 
-            self.page.locator(
-                '//*[@id="__next"]/div/div[2]/div[2]/div/div/form/div[1]/div[2]/div/input'
-            ).fill(self.password)
+            password = '//*[@id="__next"]/div/div[2]/div[2]/div/div/form/div[1]/div[2]/div/input'
+            self.wait_ready('login', [password])
+            self.page.locator(password).fill(self.password)
 
             self.page.locator(
                 '//*[@id="__next"]/div/div[2]/div[2]/div/div/form/div[2]/button'
             ).click()
 
-    def get_club_members(self, club_id: str):
-        self.page.goto(f'{self.URL}/clubs/{club_id}/members')
+    def ensure_session(self):
+        """Abre o painel e faz login se preciso, antes de exportar a sessão para workers."""
+        self.goto(f'{self.URL}/dashboard', allow_login=True)
         self.login_if_needed()
+        self.wait_ready('login', network_idle=True)
 
+    def _member_page(self, club_id: int, page: int) -> tuple:
+        """Lê uma página da lista de membros no navegador."""
         try:
-            atletas = self.page.query_selector_all('ul.list-athletes li')
-            data = []
-
-            for atleta in atletas:
-                nome = atleta.query_selector('.text-headline a').inner_text()
-                link = atleta.query_selector('.text-headline a').get_attribute('href')
-                athlete_id = link.split("/")[-1]
-                data.append(
-                    {
-                        'athlete_id': athlete_id,
-                        'athlete_name': nome,
-                        'link': self.URL + link,
-                        'updated_at': datetime.now(),
-                    }
-                )
-            logger.info(get_msg_log('members', 'info', club_id))
+            self.goto(members_url(self.URL, club_id, page), allow_login=True)
+            self.login_if_needed()
+            self.wait_ready('members', ['ul.list-athletes li'])
+            if self.http:
+                self.http.load_cookies(self.browser.cookies())
+
+            data = self.page.evaluate(MEMBERS_SCRIPT)
+            members = [
+                new_member_record(member['href'], member['name'], self.URL)
+                for member in data['members']
+            ]
+            return members, set(data['pages'])
+        except ThrottledError:
+            raise
         except Exception as e:
-            logger.error(get_msg_log('members', 'error', club_id))
-            return pd.DataFrame
-        return pd.DataFrame(data)
+            logger.error(get_msg_log('members', 'error', f'{club_id} - {page} - {e}'))
+            return [], set()
+
+    def get_club_members(self, club_id: int, max_pages: int = 200) -> pd.DataFrame:
+        """Coleta todos os membros do clube, percorrendo as páginas da lista.
+
+        A cada rodada são buscadas as páginas ligadas na paginação das páginas
+        já lidas, até não haver páginas novas. Com o cliente HTTP, as páginas de
+        uma rodada são buscadas em paralelo; as que ele não conseguir ler são
+        abertas no navegador, uma a uma.
+
+        Args:
+            club_id (int): ID do clube.
+            max_pages (int, optional): Máximo de páginas lidas. Padrão é 200.
+
+        Returns:
+            pd.DataFrame: DataFrame com 'athlete_id', 'athlete_name', 'link' e
+            'updated_at' de cada membro, sem repetição.
+        """
+        pages = {}
+        pending = {1}
+        while pending and len(pages) < max_pages:
+            pending = sorted(pending)[: max_pages - len(pages)]
+            found = {}
+            if self.http:
+                with METRICS.span('members.http'):
+                    found = self.http.fetch_member_pages(club_id, pending)
+
+            links = set()
+            for page in pending:
+                if found.get(page) is None:
+                    found[page] = self._member_page(club_id, page)
+                pages[page], page_links = found[page]
+                links |= page_links
+            pending = links - set(pages)
+
+        data = [member for page in sorted(pages) for member in pages[page]]
+        df = pd.DataFrame(
+            data, columns=['athlete_id', 'athlete_name', 'link', 'updated_at']
+        ).drop_duplicates('athlete_id')
+        logger.info(get_msg_log('members', 'info', club_id))
+        logger.info(f'{club_id}: {len(df)} membros em {len(pages)} páginas.')
+        return df.reset_index(drop=True)
 
     def get_athlete_activities(self, athlete_id: int, weeks: int = 1):
-        week_list = get_week(weeks)
+        window = get_week(weeks)
+        week_list = window
+        if self.watermarks:
+            week_list = self.watermarks.pending_weeks(athlete_id, window)
+            METRICS.count('discovery.weeks_skipped', len(window) - len(week_list))
         atividades = []
+        crawled = []
 
         try:
             for week in week_list:
@@ -106,12 +857,20 @@ class StravaScraper:
                     f'interval={week}&interval_type=week&chart_type=miles&year_offset=0'
                 )
 
-                self.page.goto(base_url + params)
-                sleep(3)
+                # A partir da segunda semana só o fragmento muda: a página pede
+                # a semana por `/athletes/<id>/interval` e troca os links. A
+                # semana conta como carregada quando essa resposta chega, pois
+                # semanas sem atividades não mostram nenhum link.
+                self.page.evaluate(MARK_STALE_SCRIPT)
+                if self.goto_expecting(
+                    base_url + params,
+                    'interval',
+                    lambda url: is_interval_response(url, athlete_id, week),
+                ):
+                    crawled.append(week)
+                self.wait_ready('interval_links', [ACTIVITY_LINKS], timeout=1000)
 
-                elementos = self.page.query_selector_all(
-                    '//a[@data-testid="activity_name"]'
-                )
+                elementos = self.page.query_selector_all(ACTIVITY_LINKS)
 
                 for el in elementos:
                     href = el.get_attribute('href')
@@ -119,38 +878,89 @@ class StravaScraper:
                     if match:
                         atividades.append(match.group(1))
 
+            if self.watermarks:
+                self.watermarks.record(athlete_id, window, crawled, atividades)
             logger.info(get_msg_log('activities', 'info', athlete_id))
             return dict({'athlete_id': athlete_id, 'activities': atividades})
+        except ThrottledError:
+            raise
         except Exception as e:
             logger.error(get_msg_log('activities', 'error', athlete_id))
             return dict({'athlete_id': athlete_id, 'activities': []})
 
-    def activity_data(self, athlete_id: int, activity_id: int):
-        self.page.goto(f'{self.URL}/activities/{activity_id}/overview')
-        sleep(3)
+    def get_club_feed(
+        self, club_id: int, weeks: int = 1, max_pages: int = 50
+    ) -> pd.DataFrame:
+        """Coleta os IDs das atividades recentes do clube percorrendo o feed uma vez.
 
-        logger.info(get_msg_log('activity', 'info', f'{athlete_id}: {activity_id}'))
+        O feed é carregado de novo rolando até o fim da página, e a coleta para
+        assim que a entrada mais antiga passa do início da semana mais antiga
+        pedida, quando a rolagem não traz mais entradas ou após `max_pages`
+        cargas. Nos dois últimos casos, um aviso indica que a janela pode ter
+        ficado incompleta.
 
-        data = {
-            'athlete_id': athlete_id,
-            'activity_id': activity_id,
-            'athlete_name': 'Unnamed',
-            'activity_type': 'Unnamed',
-            'date': None,
-            'date_time': None,
-            'location': 'Unnamed',
-            'activity_name': 'Unnamed',
-            'moving_time': np.nan,
-            'elapsed_time': np.nan,
-            'duration': np.nan,
-            'calories': np.nan,
-            'distance': np.nan,
-            'pace': np.nan,
-            'elevation': np.nan,
-            'link': f'{self.URL}/activities/{activity_id}',
-            'updated_at': datetime.now(),
-            'week': None,
-        }
+        Args:
+            club_id (int): ID do clube.
+            weeks (int, optional): Número de semanas, como em `get_athlete_activities`. Padrão é 1.
+            max_pages (int, optional): Máximo de cargas do feed. Padrão é 50.
+
+        Returns:
+            pd.DataFrame: DataFrame com 'athlete_id', 'activity_id' e 'date_time' de
+            cada atividade da janela; 'date_time' é nulo quando o horário não é reconhecido.
+        """
+        start = get_week_start(weeks)
+        entries = {}
+
+        try:
+            self.goto(f'{self.URL}/clubs/{club_id}/recent_activity', allow_login=True)
+            self.login_if_needed()
+            self.wait_ready(
+                'feed', ['//a[@data-testid="activity_name"]'], network_idle=True
+            )
+
+            links = 'a[data-testid="activity_name"]'
+            reached = False
+            dates = []
+            for _ in range(max_pages):
+                for entry in self.page.evaluate(FEED_SCRIPT):
+                    if entry['activity_id'] not in entries:
+                        entry['date_time'] = parse_feed_datetime(entry['date_time'])
+                        entries[entry['activity_id']] = entry
+
+                dates = [e['date_time'] for e in entries.values() if e['date_time']]
+                if dates and min(dates) < start:
+                    reached = True
+                    break
+
+                # Só avalia o feed de novo depois que a rolagem trouxer entradas.
+                loaded = self.page.locator(links).count()
+                self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                if not self.wait_more('feed_scroll', links, loaded):
+                    break
+
+            if not reached:
+                oldest = min(dates) if dates else None
+                logger.warning(
+                    f'{club_id}: o feed parou antes do início da janela ({start}); '
+                    f'entrada mais antiga em {oldest}. Atividades anteriores podem '
+                    'estar faltando.'
+                )
+            logger.info(get_msg_log('feed', 'info', club_id))
+        except ThrottledError:
+            raise
+        except Exception as e:
+            logger.error(get_msg_log('feed', 'error', f'{club_id} - {e}'))
+
+        feed = pd.DataFrame(
+            list(entries.values()), columns=['athlete_id', 'activity_id', 'date_time']
+        )
+        return feed[~(feed['date_time'] < start)].reset_index(drop=True)
+
+    def _locator_fields(self, data: dict):
+        """Extrai os campos da atividade com um locator do Playwright por campo."""
+        athlete_id = data['athlete_id']
+        activity_id = data['activity_id']
+        fields = METRICS.laps('field')
 
         # nome do atleta
         try:
@@ -165,6 +975,8 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('athlete_name')
+
         # tipo de atividade
         try:
             element = '//*[@id="heading"]/header/h2/span'
@@ -186,17 +998,21 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('activity_type')
+
         # data e hora da atividade
         try:
             element = '//div[@class="details"]/time'
             if self.element_exists(element):
                 content = self.page.locator(element).text_content()
-                data['date_time'] = parse_datetime(content) if content else np.nan
+                data['date_time'] = content if content else np.nan
         except Exception as e:
             logger.error(
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('date_time')
+
         # nome da atividade
         try:
             element = '//div[@class="details"]/h1[@class="text-title1 marginless activity-name"]'
@@ -210,6 +1026,8 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('activity_name')
+
         # localização da atividade
         try:
             element = '//div[@class="details"]/span[@class="location"]'
@@ -223,12 +1041,14 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('location')
+
         # tempo de movimento
         try:
             element = '//ul[@class="inline-stats section"]//li//strong'
             if self.element_exists(element):
                 content = self.page.locator(element).nth(1).text_content().strip()
-                data['moving_time'] = parse_time(content) if content else np.nan
+                data['moving_time'] = content if content else np.nan
             else:
                 data['moving_time'] = np.nan
         except Exception as e:
@@ -236,31 +1056,16 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('moving_time')
+
         # distância, pace e elevação (se for corrida ou caminhada)
         # https://support.strava.com/hc/en-us/articles/216919407-Supported-Sport-Types-on-Strava
-        if data['activity_type'].lower() in [
-            'walk',
-            'run',
-            'long run',
-            'virtual run',
-            'treadmill workout',
-            'hike',
-            'workout',
-            'ride',
-            'mountain bike ride',
-            'gravel ride',
-            'e-bike ride',
-            'e-mountain bike ride',
-            'velomobile',
-            'virtual ride',
-        ]:
+        if data['activity_type'].lower() in DISTANCE_TYPES:
             try:
                 element = '//*[@id="heading"]/div/div/div[2]/ul/li[div[text()="Distance"]]/strong'
                 if self.element_exists(element):
                     content = self.page.locator(element).nth(0).text_content().strip()
-                    data['distance'] = (
-                        re.sub(r' km', '', content) if content else np.nan
-                    )
+                    data['distance'] = content if content else np.nan
                 else:
                     data['distance'] = np.nan
             except Exception as e:
@@ -270,6 +1075,8 @@ class StravaScraper:
                     )
                 )
 
+        fields.lap('distance')
+
         try:
             possible_elements = [
                 '//div[contains(@class, "section more-stats")]//div[contains(text(), "Elevation")]/following-sibling::div//strong[abbr[@class="unit" and @title="meters"]]',
@@ -285,7 +1092,7 @@ class StravaScraper:
                 if self.element_exists(element):
                     content = self.page.locator(element).text_content().strip()
                     if content:
-                        elevation = re.sub(r'[^\d]', '', content)
+                        elevation = content
                         break
                 else:
                     elevation = np.nan
@@ -295,24 +1102,14 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
-        if data['activity_type'].lower() in [
-            'walk',
-            'run',
-            'long run',
-            'virtual run',
-            'treadmill workout',
-            'hike',
-            'workout',
-        ]:
+        fields.lap('elevation')
+
+        if data['activity_type'].lower() in PACE_TYPES:
             try:
                 element = '//ul[@class="inline-stats section"]//li//strong'
                 if self.element_exists(element):
                     content = self.page.locator(element).nth(2).text_content().strip()
-                    data['pace'] = (
-                        re.match(r'(\d{1,2}:\d{2})', content).group(1)
-                        if content
-                        else np.nan
-                    )
+                    data['pace'] = content if content else np.nan
                 else:
                     data['pace'] = np.nan
             except Exception as e:
@@ -322,6 +1119,8 @@ class StravaScraper:
                     )
                 )
 
+        fields.lap('pace')
+
         # tempo decorrido
         try:
             possible_elements = [
@@ -338,7 +1137,7 @@ class StravaScraper:
                 if self.element_exists(element):
                     content = self.page.locator(element).text_content().strip()
                     if content:
-                        elapsed_time = parse_time(content)
+                        elapsed_time = content
                         break
                 else:
                     elapsed_time = np.nan
@@ -348,12 +1147,14 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('elapsed_time')
+
         # duração da atividade (não está disponível para todas as atividades)
         try:
             element = '//*[@id="heading"]/div/div/div[2]/ul/li/strong'
             if self.element_exists(element):
                 content = self.page.locator(element).text_content().strip()
-                data['duration'] = parse_time(content) if content else np.nan
+                data['duration'] = content if content else np.nan
             else:
                 data['duration'] = np.nan
         except Exception as e:
@@ -361,6 +1162,8 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
+        fields.lap('duration')
+
         # calorias
         try:
             possible_elements = [
@@ -377,7 +1180,7 @@ class StravaScraper:
                 if self.element_exists(element):
                     content = self.page.locator(element).text_content().strip()
                     if content:
-                        calories = content.replace(',', '.')
+                        calories = content
                         break
             data['calories'] = calories if calories else np.nan
         except Exception as e:
@@ -385,32 +1188,63 @@ class StravaScraper:
                 get_msg_log('activity', 'error', f'{athlete_id}: {activity_id} - {e}')
             )
 
-        dataset = pd.DataFrame([data])        
-        dataset = dataset.astype(
-            {
-                'athlete_id': 'int',
-                'activity_id': 'int',
-                'athlete_name': 'string',
-                'activity_type': 'category',
-                'date_time': 'datetime64[ns]',
-                'date': 'datetime64[ns]',
-                'location': 'string',
-                'activity_name': 'string',
-                'moving_time': 'timedelta64[ns]',
-                'elapsed_time': 'timedelta64[ns]',
-                'duration': 'timedelta64[ns]',
-                'calories': 'float',
-                'distance': 'float',
-                'pace': 'string',
-                'elevation': 'float',
-                'link': 'string',
-                'updated_at': 'datetime64[ns]',
-                'week': 'string',
-            }
-        )
-        dataset['date'] = dataset['date_time'].dt.date
-        dataset['week'] = dataset['date_time'].dt.isocalendar().year.astype(
-            str
-        ) + dataset['date_time'].dt.isocalendar().week.astype(str).str.zfill(2)
+        fields.lap('calories')
+
+    def activity_record(self, athlete_id: int, activity_id: int) -> dict:
+        """Coleta os dados de uma atividade como um registro simples, sem tipagem.
+
+        A conversão de tipos é feita em lote por `ActivityBuffer`; use
+        `activity_data` para obter diretamente o DataFrame de uma atividade. Se
+        houver um `HttpFetcher` em `self.http`, a página é buscada por HTTP e o
+        navegador só é usado quando ela depende de JavaScript. Com um `PageCache`
+        em `self.cache`, o HTML de cada página coletada é guardado para `--reparse`.
+
+        Args:
+            athlete_id (int): ID do atleta.
+            activity_id (int): ID da atividade.
+
+        Returns:
+            dict: Dicionário com os campos da atividade.
+        """
+        if self.http:
+            data = self.http.fetch_activity(athlete_id, activity_id)
+            if data is not None:
+                logger.info(
+                    get_msg_log('activity', 'info', f'{athlete_id}: {activity_id}')
+                )
+                return data
+
+        self.goto(f'{self.URL}/activities/{activity_id}/overview')
+        self.wait_ready('activity', ['//*[@id="heading"]'])
+
+        logger.info(get_msg_log('activity', 'info', f'{athlete_id}: {activity_id}'))
+
+        # O registro é criado antes de a página ir para o cache, como no
+        # `HttpFetcher`, então a coleta no cache nunca é mais antiga que ele.
+        data = new_activity_record(athlete_id, activity_id, self.URL)
+        if self.cache:
+            with METRICS.span('cache.put'):
+                self.cache.store(athlete_id, activity_id, self.page.content())
+
+        if self.extraction == 'script':
+            try:
+                with METRICS.span('activity.script'):
+                    raw = self.page.evaluate(
+                        ACTIVITY_SCRIPT,
+                        {'show_more': SHOW_MORE_BUTTON, 'fields': ACTIVITY_FIELDS},
+                    )
+                parse_activity_fields(data, raw)
+            except Exception as e:
+                logger.error(
+                    get_msg_log(
+                        'activity', 'error', f'{athlete_id}: {activity_id} - {e}'
+                    )
+                )
+        else:
+            with METRICS.span('activity.locator'):
+                self._locator_fields(data)
+
+        return data
 
-        return dataset
+    def activity_data(self, athlete_id: int, activity_id: int) -> pd.DataFrame:
+        return build_activity_frame([self.activity_record(athlete_id, activity_id)])
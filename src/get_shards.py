@@ -0,0 +1,153 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.get_checkpoint import Checkpoint
+
+
+logger = logging.getLogger(__name__)
+
+
+def split_members(members: list, shards: int) -> list:
+    """Divide os atletas em grupos de tamanho equilibrado, um por shard.
+
+    Atletas repetidos, por exemplo membros de mais de um clube, ficam em um
+    único grupo. A divisão é alternada (round-robin), para que os grupos tenham
+    no máximo um atleta de diferença.
+
+    Args:
+        members (list): IDs dos atletas.
+        shards (int): Quantidade de grupos.
+
+    Returns:
+        list: Lista de listas de IDs, sem grupos vazios.
+    """
+    unique = list({str(athlete_id): athlete_id for athlete_id in members}.values())
+    groups = [unique[i :: max(1, shards)] for i in range(max(1, shards))]
+    return [group for group in groups if group]
+
+
+def merge_feeds(feeds: list) -> dict:
+    """Junta os IDs das atividades por atleta lidos do feed de vários clubes.
+
+    Args:
+        feeds (list): Dicionários retornados por `feed_by_athlete`.
+
+    Returns:
+        dict: Lista de IDs das atividades, sem repetição, por ID do atleta.
+    """
+    merged = {}
+    for feed in feeds:
+        for athlete_id, activity_ids in feed.items():
+            merged.setdefault(athlete_id, [])
+            merged[athlete_id] += [
+                i for i in activity_ids if i not in merged[athlete_id]
+            ]
+    return merged
+
+
+class ShardRunner:
+    """Executa a coleta dividida em shards, cada um em seu próprio processo.
+
+    Cada shard tem uma pasta de staging própria (`<folder>/shard_NN/`), onde a
+    coleta grava as atividades com um `Checkpoint`, e uma pasta de sessão do
+    navegador própria (`<user_data>/shard_NN/`). Ao final, `load` junta o
+    staging de todos os shards, para ser salvo nas partições semanais.
+
+    Args:
+        shards (int): Quantidade de processos.
+        folder (str, optional): Pasta do staging dos shards. Padrão é 'data/shards/'.
+        user_data (str, optional): Pasta das sessões dos navegadores. Padrão é 'user_data'.
+    """
+
+    def __init__(
+        self, shards: int, folder: str = 'data/shards/', user_data: str = 'user_data'
+    ):
+        self.shards = max(1, shards)
+        self.folder = folder
+        self.user_data = user_data
+
+    def plan(self, members: list, config: dict) -> list:
+        """Monta a descrição de cada shard.
+
+        Args:
+            members (list): IDs dos atletas de todos os clubes.
+            config (dict): Parâmetros da execução, usados pelo `Checkpoint` de cada
+                shard para validar o `--resume`.
+
+        Returns:
+            list: Um dicionário por shard com 'shard', 'members', 'folder',
+            'user_data' e 'config'.
+        """
+        return [
+            {
+                'shard': i,
+                'members': group,
+                'folder': os.path.join(self.folder, f'shard_{i:02d}'),
+                'user_data': os.path.join(self.user_data, f'shard_{i:02d}'),
+                'config': {**config, 'shard': i, 'shards': self.shards},
+            }
+            for i, group in enumerate(split_members(members, self.shards))
+        ]
+
+    def run(self, func, shards: list) -> list:
+        """Executa `func` para cada shard em um processo separado.
+
+        Os processos são iniciados com 'spawn', pois o Playwright não pode ser
+        herdado por `fork`. Um shard com erro não interrompe os demais, e o que
+        cada um já coletou fica no seu staging para o `--resume`.
+
+        Args:
+            func (callable): Função de nível de módulo que recebe a descrição do shard.
+            shards (list): Descrições retornadas por `plan`.
+
+        Raises:
+            Exception: Repassa o primeiro erro ocorrido, após todos os shards terminarem.
+
+        Returns:
+            list: Retorno de `func` para cada shard, na ordem de `shards`.
+        """
+        results = [None] * len(shards)
+        errors = []
+        context = multiprocessing.get_context('spawn')
+
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            futures = {pool.submit(func, shard): i for i, shard in enumerate(shards)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    logger.info(f'Shard {i} concluído.')
+                except Exception as e:
+                    logger.error(f'Erro no shard {i}: {e}')
+                    errors.append(e)
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def load(self, shards: list) -> pd.DataFrame:
+        """Junta as atividades gravadas no staging de todos os shards.
+
+        Args:
+            shards (list): Descrições retornadas por `plan`.
+
+        Returns:
+            pd.DataFrame: DataFrame com as atividades de todos os shards.
+        """
+        frames = [
+            Checkpoint(shard['folder']).start(shard['config'], resume=True).load()
+            for shard in shards
+        ]
+        frames = [frame for frame in frames if not frame.empty]
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        return pd.DataFrame()
+
+    def clear(self, shards: list):
+        """Remove o staging dos shards, após os dados serem salvos nas partições."""
+        for shard in shards:
+            Checkpoint(shard['folder']).clear()
@@ -1,7 +1,16 @@
 import glob
+import os
 from datetime import datetime, timedelta
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.get_metrics import METRICS
+
+# Pasta dos dados usada pela linha de comando.
+PATH_TO_DATA = 'data/'
 
 
 def get_msg_log(step: str, msg_type: str, athlete: int, activity: str = None) -> str:
@@ -38,6 +47,10 @@ def get_msg_log(step: str, msg_type: str, athlete: int, activity: str = None) ->
             'info': 'Coletando dados da atividade...',
             'error': 'Erro ao coletar dados da atividade.',
         },
+        'feed': {
+            'info': 'Coletando atividades do feed do clube...',
+            'error': 'Erro ao coletar o feed do clube.',
+        },
     }
     message = f'{athlete}: {activity} ' + messages[step][msg_type]
     return message
@@ -63,83 +76,234 @@ def get_week(num_weeks: int) -> list:
     return weeks
 
 
-def parse_time(time_str: str) -> str:
-    """Função para converter uma string de tempo para o formato correto
+def get_week_start(num_weeks: int) -> datetime:
+    """Função para retornar o início da semana mais antiga de `get_week`
 
     Args:
-        time_str (str): String de tempo no formato 'HH:MM:SS' ou 'MM:SS'
-
-    Raises:
-        ValueError: Se o formato da string de tempo for inválido
+        num_weeks (int): Número de semanas
 
     Returns:
-        str: String de tempo no formato 'HH:MM:SS'
+        datetime: Segunda-feira, à meia-noite, da semana mais antiga
     """
+    oldest = datetime.today() - timedelta(weeks=num_weeks - 1)
+    monday = oldest - timedelta(days=oldest.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    time_parts = time_str.split(':')
 
-    # 'MM:SS'
-    if len(time_parts) == 2:
-        hours = 0
-        minutes = int(time_parts[0])
-        seconds = int(time_parts[1])
-    # 'HH:MM:SS'
-    elif len(time_parts) == 3:
-        hours = int(time_parts[0])
-        minutes = int(time_parts[1])
-        seconds = int(time_parts[2])
-    else:
-        raise ValueError('Formato de tempo inválido')
-    return f'{hours:02}:{minutes:02}:{seconds:02}'
+def week_start(week: int) -> datetime:
+    """Função para retornar o início de uma semana ISO
 
+    Args:
+        week (int): Semana no formato 'YYYYWW'
 
-def parse_datetime(activity_time: str) -> datetime:
-    """Função para converter uma string de tempo para um objeto datetime
+    Returns:
+        datetime: Segunda-feira, à meia-noite, da semana
+    """
+    return datetime.strptime(f'{week}1', '%G%V%u')
+
+
+def iso_week(date_time: pd.Series) -> pd.Series:
+    """Função para calcular a semana ISO de uma série de datas
 
     Args:
-        activity_time (str): String de tempo no formato 'HH:MM AM/PM on Weekday, Month Day, Year' ou 'Weekday, Month Day, Year'
-        Exemplo: '7:18 PM on Tuesday, January 21, 2025' ou 'Friday, January 10, 2025'
+        date_time (pd.Series): Série de datas
+
+    Returns:
+        pd.Series: Série com as semanas no formato 'YYYYWW'
+    """
+    iso = date_time.dt.isocalendar()
+    return iso.year.astype(str) + iso.week.astype(str).str.zfill(2)
+
 
-    Raises:
-        ValueError: Se o formato da string de tempo for inválido
+def parse_feed_datetime(feed_time: str) -> datetime:
+    """Função para converter o horário de uma entrada do feed para datetime
+
+    Args:
+        feed_time (str): Atributo `datetime` ou texto do horário no feed
+        Exemplo: '2025-01-21 22:18:00 UTC', 'Today at 7:18 PM',
+        'Yesterday at 7:18 PM' ou 'January 21, 2025 at 7:18 PM'
 
     Returns:
-        datetime: Objeto datetime com a data e hora da atividade
+        datetime: Objeto datetime do horário, ou None se o formato for desconhecido
     """
+    feed_time = (feed_time or '').strip()
+    today = datetime.today()
 
-    formats = [
-        '%I:%M %p on %A, %B %d, %Y',  # Ex: '7:18 PM on Tuesday, January 21, 2025'
-        '%A, %B %d, %Y',  # Ex: 'Friday, January 10, 2025'
-    ]
+    for day, offset in (('Today at ', 0), ('Yesterday at ', 1)):
+        if feed_time.startswith(day):
+            try:
+                hour = datetime.strptime(feed_time[len(day) :], '%I:%M %p').time()
+            except ValueError:
+                return None
+            return datetime.combine(today.date() - timedelta(days=offset), hour)
 
-    for fmt in formats:
+    for fmt in ('%B %d, %Y at %I:%M %p', '%B %d, %Y'):
         try:
-            return datetime.strptime(activity_time.strip(), fmt)
+            return datetime.strptime(feed_time, fmt)
         except ValueError:
             pass
-    raise ValueError(f"Formato desconhecido: {activity_time}")
+
+    value = pd.to_datetime(feed_time, errors='coerce', utc=True)
+    if pd.isna(value):
+        return None
+    return value.tz_localize(None).to_pydatetime()
+
+
+def _week_of(value) -> str:
+    year, week, _ = pd.Timestamp(value).isocalendar()
+    return f'{year}{week:02d}'
+
+
+def load_activity_data(
+    folder: str = 'data/',
+    columns: list = None,
+    weeks: list = None,
+    start=None,
+    end=None,
+    name_files: str = 'activity_week_*.parquet',
+) -> pd.DataFrame:
+    """Função que carrega as partições semanais de atividades com pyarrow
+
+    Os arquivos são lidos em paralelo como um único dataset. Só as colunas
+    pedidas são lidas, e os filtros de semana e data descartam os arquivos de
+    semanas fora do intervalo antes mesmo da leitura.
+
+    Args:
+        folder (str, optional): Pasta onde estão os arquivos. Padrão é 'data/'.
+        columns (list, optional): Colunas a serem lidas. Padrão são todas.
+        weeks (list, optional): Semanas no formato 'YYYYWW' a serem lidas. Padrão são todas.
+        start (datetime | str, optional): Data/hora mínima da atividade (inclusiva).
+        end (datetime | str, optional): Data/hora máxima da atividade (exclusiva).
+        name_files (str, optional): Padrão dos arquivos. Padrão é 'activity_week_*.parquet'.
+
+    Returns:
+        pd.DataFrame: DataFrame com as atividades selecionadas
+    """
+    files = sorted(glob.glob(os.path.join(folder, name_files)))
+    prefix, _, suffix = name_files.partition('*')
+
+    def _file_week(file: str) -> str:
+        return os.path.basename(file)[len(prefix) : -len(suffix) or None]
+
+    if weeks is not None:
+        weeks = {str(week) for week in weeks}
+        files = [file for file in files if _file_week(file) in weeks]
+    if start is not None:
+        files = [file for file in files if _file_week(file) >= _week_of(start)]
+    if end is not None:
+        files = [file for file in files if _file_week(file) <= _week_of(end)]
+
+    if not files:
+        return pd.DataFrame(columns=columns)
+
+    schema = pa.unify_schemas(
+        [pq.read_schema(file) for file in files], promote_options='permissive'
+    )
+    dataset = ds.dataset(files, schema=schema, format='parquet')
+
+    condition = None
+    filters = []
+    if weeks is not None:
+        filters.append(ds.field('week').isin(list(weeks)))
+    if start is not None:
+        filters.append(ds.field('date_time') >= pa.scalar(pd.Timestamp(start)))
+    if end is not None:
+        filters.append(ds.field('date_time') < pa.scalar(pd.Timestamp(end)))
+    for expression in filters:
+        condition = expression if condition is None else condition & expression
+
+    with METRICS.span('parquet.read'):
+        table = dataset.to_table(columns=columns, filter=condition, use_threads=True)
+        return table.to_pandas()
+
+
+def save_activity_data(
+    dataset: pd.DataFrame,
+    folder: str = 'data/',
+    name_file: str = 'activity_week_{week}.parquet',
+) -> list:
+    """Função que grava as atividades nas partições semanais, mesclando com o que já existe
+
+    As linhas são agrupadas por semana uma única vez. Em cada partição, as novas
+    atividades são mescladas às já salvas pelo `activity_id`, prevalecendo a de
+    `updated_at` mais recente. Se a data de uma atividade mudou de semana, a
+    cópia mais antiga, em qualquer partição, é removida, para que ela não seja
+    contada duas vezes. Cada arquivo é gravado em um temporário e depois
+    renomeado, para que uma falha no meio da escrita não corrompa a partição.
+
+    Args:
+        dataset (pd.DataFrame): DataFrame com as atividades, incluindo a coluna 'week'.
+        folder (str, optional): Pasta onde estão os arquivos. Padrão é 'data/'.
+        name_file (str, optional): Modelo do nome das partições. Padrão é 'activity_week_{week}.parquet'.
+
+    Returns:
+        list: Lista com os caminhos das partições gravadas
+    """
+    written = []
+    dataset = dataset.sort_values('updated_at', kind='stable').drop_duplicates(
+        subset='activity_id', keep='last'
+    )
+
+    # Cópias das mesmas atividades em partições de outras semanas: fica a mais
+    # recente, e a outra é descartada do lote ou removida da partição antiga.
+    prefix, suffix = name_file.split('{week}')
+    incoming = dataset.set_index('activity_id')[['week', 'updated_at']]
+    incoming_weeks = incoming['week'].astype(str)
+    for path in glob.glob(os.path.join(folder, name_file.format(week='*'))):
+        week = os.path.basename(path)[len(prefix) : -len(suffix) or None]
+        saved = pd.read_parquet(path, columns=['activity_id', 'updated_at'])
+        saved = saved[saved['activity_id'].isin(incoming.index)]
+        saved = saved[incoming_weeks[saved['activity_id']].to_numpy() != week]
+        if saved.empty:
+            continue
+
+        newer = (
+            saved['updated_at'].to_numpy()
+            > incoming['updated_at'][saved['activity_id']].to_numpy()
+        )
+        dataset = dataset[~dataset['activity_id'].isin(saved['activity_id'][newer])]
+        moved = saved['activity_id'][~newer]
+        if moved.empty:
+            continue
+
+        week_df = pd.read_parquet(path)
+        week_df = week_df[~week_df['activity_id'].isin(moved)]
+        tmp_path = path + '.tmp'
+        with METRICS.span('parquet.write'):
+            week_df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        written.append(path)
+
+    for week, week_df in dataset.groupby('week', sort=False):
+        path = os.path.join(folder, name_file.format(week=week))
+
+        if os.path.exists(path):
+            week_df = pd.concat([pd.read_parquet(path), week_df], ignore_index=True)
+
+        week_df = week_df.sort_values('updated_at', kind='stable').drop_duplicates(
+            subset='activity_id', keep='last'
+        )
+
+        tmp_path = path + '.tmp'
+        with METRICS.span('parquet.write'):
+            week_df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        written.append(path)
+
+    return written
 
 
 def import_all_data(
-    folder: str = 'data/', name_files: str = 'activity_*.parquet'
+    folder: str = 'data/', name_files: str = 'activity_*.parquet', columns: list = None
 ) -> pd.DataFrame:
     """Função que faz a importação de todos os arquivos parquet de uma pasta
 
     Args:
         folder (str, optional): Nome da pasta onde estão os arquivos. Padrão é 'data/'.
         name_files (str, optional): Nome dos arquivos que serão importados. Padrão é 'activity_*.parquet'.
+        columns (list, optional): Colunas a serem lidas. Padrão são todas.
 
     Returns:
         pd.DataFrame: Retorna um DataFrame com todos os dados importados
     """
-    folder = folder
-    name_files = name_files
-    dataset = pd.DataFrame()
-
-    try:
-        for file in glob.glob(folder + name_files):
-            dataset = pd.concat([dataset, pd.read_parquet(file)], axis=0)
-    except Exception as e:
-        print(f'Error: {e}')
-    finally:
-        return dataset
+    return load_activity_data(folder, columns=columns, name_files=name_files)
@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.get_utils import week_start
+
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlWatermarks:
+    """Marcas, por atleta, das semanas já percorridas na página do atleta.
+
+    Para cada atleta é guardado o intervalo contínuo de semanas fechadas já
+    percorridas (`first_week` a `crawled_week`), a atividade mais recente vista
+    e o horário da última passagem completa. Uma semana continua aberta até
+    `open_days` dias depois do seu fim, pois atividades podem ser enviadas com
+    atraso. Nas próximas coletas, só as semanas abertas e as de fora do
+    intervalo são abertas de novo. A cada `deep_days`, todas as semanas da
+    janela são percorridas outra vez. Uma semana que não carregou fica fora do
+    intervalo e é aberta de novo na próxima coleta.
+
+    Args:
+        folder (str, optional): Pasta dos dados. Padrão é 'data/'.
+        file_name (str, optional): Nome do arquivo das marcas. Padrão é 'watermarks.parquet'.
+        open_days (float, optional): Dias, após o fim da semana, em que ela segue
+            aberta. Padrão é 2.
+        deep_days (float, optional): Dias entre as passagens completas; com 0,
+            as semanas fechadas são sempre percorridas. Padrão é 30.
+    """
+
+    COLUMNS = [
+        'athlete_id',
+        'first_week',
+        'crawled_week',
+        'newest_activity',
+        'crawled_at',
+        'deep_at',
+    ]
+
+    def __init__(
+        self,
+        folder: str = 'data/',
+        file_name: str = 'watermarks.parquet',
+        open_days: float = 2,
+        deep_days: float = 30,
+    ):
+        self.path = os.path.join(folder, file_name)
+        self.open_days = open_days
+        self.deep_days = deep_days
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> 'CrawlWatermarks':
+        """Carrega as marcas do disco, se existirem.
+
+        Returns:
+            CrawlWatermarks: A própria instância, para encadear chamadas.
+        """
+        if os.path.exists(self.path):
+            df = pd.read_parquet(self.path)
+            self.entries = {
+                str(entry['athlete_id']): entry
+                for entry in df[self.COLUMNS].to_dict('records')
+            }
+        logger.info(f'Marcas de coleta carregadas para {len(self.entries)} atletas.')
+        return self
+
+    def save(self):
+        """Grava as marcas em disco."""
+        with self._lock:
+            df = pd.DataFrame(list(self.entries.values()), columns=self.COLUMNS)
+        df = df.astype(
+            {
+                'athlete_id': 'str',
+                'first_week': 'int64',
+                'crawled_week': 'int64',
+                'newest_activity': 'Int64',
+                'crawled_at': 'datetime64[ns]',
+                'deep_at': 'datetime64[ns]',
+            }
+        )
+        tmp_path = self.path + '.tmp'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def is_open(self, week: int) -> bool:
+        """Indica se a semana ainda pode receber atividades novas."""
+        end = week_start(week) + timedelta(weeks=1, days=self.open_days)
+        return end > datetime.now()
+
+    def _deep_due(self, entry: dict) -> bool:
+        return entry['deep_at'] <= datetime.now() - timedelta(days=self.deep_days)
+
+    def pending_weeks(self, athlete_id, weeks: list) -> list:
+        """Filtra as semanas da janela que precisam ser abertas para o atleta.
+
+        Args:
+            athlete_id (int | str): ID do atleta.
+            weeks (list): Semanas da janela, no formato de `get_week`.
+
+        Returns:
+            list: Semanas abertas ou fora do intervalo já percorrido, na ordem de
+            `weeks`; todas, se o atleta não tem marca ou a passagem completa venceu.
+        """
+        with self._lock:
+            entry = self.entries.get(str(athlete_id))
+        if entry is None or self._deep_due(entry):
+            return list(weeks)
+        return [
+            week
+            for week in weeks
+            if self.is_open(week)
+            or week > entry['crawled_week']
+            or week < entry['first_week']
+        ]
+
+    def record(self, athlete_id, weeks: list, crawled: list, activity_ids: list):
+        """Avança a marca do atleta após percorrer as semanas pendentes.
+
+        O intervalo só avança se todas as semanas fechadas pendentes carregaram;
+        caso contrário, a marca anterior é mantida e elas são abertas de novo na
+        próxima coleta.
+
+        Args:
+            athlete_id (int | str): ID do atleta.
+            weeks (list): Semanas da janela pedida.
+            crawled (list): Semanas que carregaram nesta coleta, entre as de
+                `pending_weeks`.
+            activity_ids (list): IDs das atividades encontradas.
+        """
+        closed = [week for week in weeks if not self.is_open(week)]
+        now = datetime.now()
+
+        with self._lock:
+            entry = self.entries.get(str(athlete_id))
+            newest = max(map(int, activity_ids), default=None)
+            if entry is not None and pd.notna(entry['newest_activity']):
+                newest = max(newest or 0, int(entry['newest_activity']))
+
+            missing = [
+                week
+                for week in closed
+                if week not in crawled
+                and (
+                    entry is None
+                    or not entry['first_week'] <= week <= entry['crawled_week']
+                )
+            ]
+            if not closed or missing:
+                if entry is not None:
+                    entry.update(newest_activity=newest, crawled_at=now)
+                return
+
+            # A janela termina na semana atual; se ela começa depois do fim do
+            # intervalo salvo, as semanas entre os dois nunca foram percorridas.
+            connected = False
+            if entry is not None:
+                next_week = week_start(entry['crawled_week']) + timedelta(weeks=1)
+                connected = week_start(min(weeks)) <= next_week
+            self.entries[str(athlete_id)] = {
+                'athlete_id': str(athlete_id),
+                'first_week': (
+                    min(entry['first_week'], min(weeks)) if connected else min(weeks)
+                ),
+                'crawled_week': (
+                    max(entry['crawled_week'], max(closed))
+                    if connected
+                    else max(closed)
+                ),
+                'newest_activity': newest,
+                'crawled_at': now,
+                'deep_at': (
+                    now
+                    if entry is None or len(crawled) == len(weeks)
+                    else entry['deep_at']
+                ),
+            }
+
+    def merge(self, entries: dict):
+        """Junta as marcas de outro processo, mantendo a coleta mais recente de cada atleta."""
+        with self._lock:
+            for athlete_id, entry in entries.items():
+                current = self.entries.get(athlete_id)
+                if current is None or entry['crawled_at'] > current['crawled_at']:
+                    self.entries[athlete_id] = entry
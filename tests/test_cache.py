@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.get_cache import PageCache
+
+
+def page(text: str) -> str:
+    return f'<html><body><div class="activity">{text}</div></body></html>'
+
+
+class PageCacheEvictTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.start = datetime(2025, 1, 1)
+
+    def fill(self, cache: PageCache, texts: list):
+        for number, text in enumerate(texts):
+            cache.put(1, number, page(text), self.start + timedelta(minutes=number))
+
+    def test_evicts_oldest_and_keeps_shared_blobs(self):
+        cache = PageCache(self.folder, max_bytes=2**30)
+        self.fill(cache, ['a', 'b', 'a', 'c'])
+        shared, dropped = cache.entries[0]['sha256'], cache.entries[1]['sha256']
+        cache.max_bytes = cache.total_bytes - 1
+
+        cache.put(1, 9, page('c'), self.start + timedelta(minutes=9))
+
+        self.assertEqual([e['activity_id'] for e in cache.entries], [2, 3, 9])
+        self.assertEqual(cache.refs[shared], 1)
+        self.assertTrue(os.path.exists(cache._blob_path(shared)))
+        self.assertNotIn(dropped, cache.sizes)
+        self.assertFalse(os.path.exists(cache._blob_path(dropped)))
+        self.assertEqual(cache.total_bytes, sum(cache.sizes.values()))
+
+        cache.max_bytes = 0
+        cache.put(1, 10, page('d'))
+        self.assertEqual(len(cache.entries), 0)
+        self.assertEqual(cache.refs, {})
+        self.assertEqual(cache.total_bytes, 0)
+        self.assertFalse(os.path.exists(cache._blob_path(shared)))
+
+    def test_keeps_order_across_load(self):
+        cache = PageCache(self.folder)
+        self.fill(cache, ['a', 'b'])
+        cache.put(1, 5, page('c'), self.start - timedelta(days=1))
+        self.assertEqual([e['activity_id'] for e in cache.entries], [5, 0, 1])
+        cache.save()
+
+        loaded = PageCache(self.folder).load()
+        self.assertEqual([e['activity_id'] for e in loaded.entries], [5, 0, 1])
+        self.assertEqual(loaded.total_bytes, cache.total_bytes)
+        self.assertEqual(loaded.refs, cache.refs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import glob
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from src.get_checkpoint import Checkpoint
+from src.get_commands import scrape_athlete_activities
+
+
+class FakeScraper:
+    """Scraper falso que pode ser interrompido ao abrir uma atividade."""
+
+    def __init__(self, activities: dict, fail_on: int = None):
+        self.activities = activities
+        self.fail_on = fail_on
+        self.athletes_opened = []
+        self.activities_opened = []
+
+    def get_athlete_activities(self, athlete_id, weeks: int = 1) -> dict:
+        self.athletes_opened.append(athlete_id)
+        return {'activities': self.activities[athlete_id]}
+
+    def activity_record(self, athlete_id, activity_id) -> dict:
+        if activity_id == self.fail_on:
+            raise KeyboardInterrupt
+        self.activities_opened.append(activity_id)
+        return {
+            'athlete_id': athlete_id,
+            'activity_id': activity_id,
+            'activity_name': f'Atividade {activity_id}',
+            'date_time': '7:18 PM on Tuesday, January 21, 2025',
+            'updated_at': datetime.now(),
+        }
+
+
+class CheckpointResumeTest(unittest.TestCase):
+    ACTIVITIES = {1: [10, 11], 2: [20, 21, 22], 3: [30]}
+    CONFIG = {'club_id': 7, 'week': 2}
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def interrupted_run(self):
+        checkpoint = Checkpoint(self.folder, batch_size=1).start(self.CONFIG)
+        scraper = FakeScraper(self.ACTIVITIES, fail_on=21)
+        with self.assertRaises(KeyboardInterrupt):
+            scrape_athlete_activities(
+                scraper, list(self.ACTIVITIES), checkpoint=checkpoint
+            )
+        self.assertEqual(scraper.activities_opened, [10, 11, 20])
+
+    def test_resume_skips_finished_athletes_and_activities(self):
+        self.interrupted_run()
+
+        checkpoint = Checkpoint(self.folder, batch_size=1).start(
+            self.CONFIG, resume=True
+        )
+        self.assertTrue(checkpoint.is_athlete_done(1))
+        self.assertFalse(checkpoint.is_athlete_done(2))
+
+        scraper = FakeScraper(self.ACTIVITIES)
+        df = scrape_athlete_activities(
+            scraper, list(self.ACTIVITIES), checkpoint=checkpoint
+        )
+        self.assertEqual(scraper.athletes_opened, [2, 3])
+        self.assertEqual(scraper.activities_opened, [21, 22, 30])
+
+        # As partes da execução interrompida entram uma única vez no resultado.
+        self.assertEqual(sorted(df['activity_id']), [10, 11, 20, 21, 22, 30])
+        self.assertEqual(len(glob.glob(os.path.join(self.folder, 'part_*.parquet'))), 6)
+        self.assertEqual(len(checkpoint.load()), 6)
+
+    def test_resume_merges_the_staged_parts_once(self):
+        self.interrupted_run()
+
+        # Uma segunda interrupção antes de qualquer atividade nova não duplica
+        # as partes já registradas no progresso.
+        Checkpoint(self.folder).start(self.CONFIG, resume=True)
+        checkpoint = Checkpoint(self.folder).start(self.CONFIG, resume=True)
+        self.assertEqual(
+            checkpoint.parts,
+            ['part_00000.parquet', 'part_00001.parquet', 'part_00002.parquet'],
+        )
+        self.assertEqual(sorted(checkpoint.load()['activity_id']), [10, 11, 20])
+
+    def test_resume_with_other_club_or_week_is_rejected(self):
+        self.interrupted_run()
+
+        for config in ({'club_id': 8, 'week': 2}, {'club_id': 7, 'week': 3}):
+            with self.assertRaises(ValueError):
+                Checkpoint(self.folder).start(config, resume=True)
+
+        # A execução salva continua intacta para ser retomada.
+        checkpoint = Checkpoint(self.folder).start(self.CONFIG, resume=True)
+        self.assertEqual(checkpoint.athletes, {'1'})
+
+    def test_start_without_resume_discards_the_staging(self):
+        self.interrupted_run()
+
+        checkpoint = Checkpoint(self.folder).start(self.CONFIG)
+        self.assertEqual(checkpoint.athletes, set())
+        self.assertEqual(glob.glob(os.path.join(self.folder, 'part_*.parquet')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.get_scraping import FEED_SCRIPT, StravaScraper
+
+
+class FakeFeedPage:
+    """Feed falso com rolagem infinita: cada rolagem carrega a próxima página.
+
+    Como no Strava, a página nova só chega depois da rolagem, então avaliar o
+    feed logo após rolar não traz nada de novo.
+    """
+
+    def __init__(self, pages: list):
+        self.pages = pages
+        self.loaded = 1
+        self.scrolls = 0
+        self.url = 'https://www.strava.com/clubs/1/recent_activity'
+
+    def _entries(self) -> list:
+        return [entry for page in self.pages[: self.loaded] for entry in page]
+
+    def goto(self, url: str):
+        return SimpleNamespace(status=200)
+
+    def wait_for_load_state(self, state: str, timeout: int = None):
+        pass
+
+    def locator(self, selector: str):
+        page = self
+        return SimpleNamespace(
+            count=lambda: len(page._entries()),
+            or_=lambda other: page.locator(selector),
+            first=SimpleNamespace(wait_for=lambda **kwargs: None),
+        )
+
+    def evaluate(self, script: str):
+        if script == FEED_SCRIPT:
+            return [dict(entry) for entry in self._entries()]
+        self.scrolls += 1
+
+    def wait_for_function(self, expression: str, arg=None, timeout: int = None):
+        if self.loaded >= len(self.pages):
+            raise PlaywrightTimeoutError('sem mais entradas')
+        self.loaded += 1
+
+
+def feed_pages(days: list, per_page: int = 3) -> list:
+    now = datetime.now()
+    entries = [
+        {
+            'activity_id': str(100 + i),
+            'athlete_id': str(i % 4),
+            'date_time': (now - timedelta(days=day)).isoformat(),
+        }
+        for i, day in enumerate(days)
+    ]
+    return [entries[i : i + per_page] for i in range(0, len(entries), per_page)]
+
+
+class ClubFeedTest(unittest.TestCase):
+    def make_scraper(self, page: FakeFeedPage) -> StravaScraper:
+        scraper = StravaScraper(None, None)
+        scraper.page = page
+        scraper.login_if_needed = lambda: None
+        return scraper
+
+    def test_scrolls_until_the_window_start(self):
+        # O início da janela de 2 semanas fica entre 7 e 13 dias atrás.
+        days = [0, 1, 2, 3, 4, 5, 6, 6, 6, 20, 21, 22, 40, 41, 42]
+        page = FakeFeedPage(feed_pages(days))
+        feed = self.make_scraper(page).get_club_feed(1, weeks=2)
+
+        self.assertEqual(page.loaded, 4)
+        self.assertEqual(len(feed), 9)
+        self.assertTrue(feed['activity_id'].is_unique)
+
+    def test_warns_when_the_feed_ends_before_the_window(self):
+        page = FakeFeedPage(feed_pages([0, 1, 2, 3]))
+        with self.assertLogs('src.get_scraping', level='WARNING') as logs:
+            feed = self.make_scraper(page).get_club_feed(1, weeks=4)
+
+        self.assertEqual(len(feed), 4)
+        self.assertIn('o feed parou antes do início da janela', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.get_index import ActivityIndex
+
+
+class ActivityIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        now = datetime.now()
+        self.index = ActivityIndex(self.folder)
+        self.index.update(
+            pd.DataFrame(
+                {
+                    'activity_id': [1, 2, 2],
+                    'updated_at': [
+                        now - timedelta(hours=1),
+                        now - timedelta(hours=30),
+                        now - timedelta(hours=50),
+                    ],
+                }
+            )
+        )
+
+    def test_needs_scrape_by_ttl(self):
+        self.assertTrue(self.index.needs_scrape(3))
+        self.assertFalse(self.index.needs_scrape(1))
+        self.assertFalse(self.index.needs_scrape('2'))
+
+        ttl = timedelta(hours=24)
+        self.assertFalse(self.index.needs_scrape(1, ttl))
+        self.assertTrue(self.index.needs_scrape('2', ttl))
+        self.assertFalse(self.index.needs_scrape(2, timedelta(hours=48)))
+
+    def test_save_and_load_keep_the_newest_update(self):
+        self.index.save()
+        self.assertEqual(os.listdir(self.folder), ['index_activities.parquet'])
+
+        index = ActivityIndex(self.folder).load()
+        self.assertEqual(index.entries, self.index.entries)
+        self.assertFalse(index.needs_scrape(2, timedelta(hours=48)))
+
+    def test_load_rebuilds_from_the_partitions(self):
+        updated_at = datetime(2025, 3, 1)
+        pd.DataFrame({'activity_id': [7], 'updated_at': [updated_at]}).to_parquet(
+            os.path.join(self.folder, 'activity_week_202509.parquet')
+        )
+
+        index = ActivityIndex(self.folder).load()
+        self.assertEqual(index.entries, {7: updated_at})
+        self.assertTrue(index.needs_scrape(7, timedelta(days=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import re
+import unittest
+
+from benchmarks.strava_stub import StravaStub, week_of
+from src.get_scraping import is_interval_response
+
+
+class IntervalResponseTest(unittest.TestCase):
+    def test_matches_only_the_requested_week(self):
+        url = 'https://www.strava.com/athletes/7/interval?interval=202541&interval_type=week'
+        self.assertTrue(is_interval_response(url, 7, 202541))
+        self.assertTrue(is_interval_response(url, '7', 202541))
+        self.assertFalse(is_interval_response(url, 7, 202540))
+        self.assertFalse(is_interval_response(url, 8, 202541))
+        self.assertFalse(
+            is_interval_response(
+                'https://www.strava.com/athletes/7#interval=202541', 7, 202541
+            )
+        )
+
+    def test_stub_serves_each_week_separately(self):
+        stub = StravaStub(athletes=1, activities_per_athlete=12)
+        athlete = stub.athletes[0]
+        weeks = {week_of(activity['date_time']) for activity in athlete['activities']}
+        self.assertGreater(len(weeks), 1)
+
+        seen = []
+        for week in weeks:
+            status, html = stub.render(
+                f'/athletes/{athlete["athlete_id"]}/interval?interval={week}'
+            )
+            self.assertEqual(status, 200)
+            seen += re.findall(r'/activities/(\d+)', html)
+
+        expected = [str(activity['activity_id']) for activity in athlete['activities']]
+        self.assertEqual(sorted(seen), sorted(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
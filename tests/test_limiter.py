@@ -0,0 +1,86 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from src.get_limiter import AdaptiveLimiter, ThrottledError, new_limiter
+from src.get_pool import ScraperPool
+from src.get_scraping import StravaScraper
+
+
+class StubPage:
+    """Página falsa que responde 429 nas primeiras navegações e 200 depois."""
+
+    def __init__(self, throttled: int):
+        self.throttled = throttled
+        self.url = None
+        self.calls = 0
+
+    def goto(self, url: str):
+        self.url = url
+        self.calls += 1
+        status = 429 if self.calls <= self.throttled else 200
+        return SimpleNamespace(status=status)
+
+
+def make_scraper(page: StubPage, cooldown: float = 0.2) -> StravaScraper:
+    limiter = AdaptiveLimiter(
+        min_interval=0, max_interval=0.01, jitter=0, threshold=5, cooldown=cooldown
+    )
+    scraper = StravaScraper(None, None, limiter=limiter, url='https://stub.test')
+    scraper.page = page
+    return scraper
+
+
+class GotoBreakerTest(unittest.TestCase):
+    def test_waits_for_breaker_and_succeeds(self):
+        page = StubPage(throttled=5)
+        scraper = make_scraper(page)
+
+        start = time.monotonic()
+        response = scraper.goto('https://stub.test/athletes/1')
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(page.calls, 6)
+        self.assertEqual(scraper.limiter.summary()['breaker'], 1)
+        self.assertGreaterEqual(elapsed, 0.2)
+
+    def test_gives_up_after_breaker_trips(self):
+        page = StubPage(throttled=100)
+        scraper = make_scraper(page, cooldown=0.01)
+
+        with self.assertRaises(ThrottledError):
+            scraper.goto('https://stub.test/athletes/1', breaker_trips=2)
+        self.assertEqual(scraper.limiter.summary()['breaker'], 2)
+        self.assertEqual(page.calls, 6)
+
+
+class BackoffTest(unittest.TestCase):
+    def test_backoff_starts_from_min_backoff(self):
+        url = 'https://stub.test/athletes/1'
+        for min_backoff, expected in ((1.0, 2.0), (0.1, 0.2), (5, 10)):
+            limiter = AdaptiveLimiter(
+                min_interval=0.05, jitter=0, threshold=5, min_backoff=min_backoff
+            )
+            limiter.throttled(url, 'status_429')
+            self.assertEqual(limiter.interval('stub.test'), expected)
+
+            limiter.throttled(url, 'status_429')
+            self.assertEqual(limiter.interval('stub.test'), expected * 2)
+
+
+class NewLimiterTest(unittest.TestCase):
+    def test_interval_is_divided_across_workers(self):
+        self.assertEqual(new_limiter(1.0, 4).min_interval, 0.25)
+        self.assertEqual(new_limiter(2.0, 0).min_interval, 2.0)
+
+    def test_pool_default_limiter_is_divided_across_workers(self):
+        pool = ScraperPool(None, size=4, min_interval=1.0)
+        self.assertEqual(pool.limiter.min_interval, 0.25)
+
+        limiter = AdaptiveLimiter(0.5)
+        self.assertIs(ScraperPool(None, size=4, limiter=limiter).limiter, limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
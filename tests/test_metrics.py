@@ -0,0 +1,35 @@
+import tempfile
+import unittest
+
+from src.get_metrics import METRICS, Metrics
+from src.get_shards import ShardRunner
+
+
+def record_shard(shard: dict) -> dict:
+    """Shard falso: registra métricas no processo filho e devolve o snapshot."""
+    METRICS.enabled = True
+    for _ in shard['members']:
+        METRICS.record('navigation', 0.01)
+    METRICS.count('discovery.weeks_skipped', len(shard['members']))
+    METRICS.timeout('wait.interval')
+    return {'metrics': METRICS.snapshot()}
+
+
+class MetricsMergeTest(unittest.TestCase):
+    def test_merges_shard_snapshots(self):
+        runner = ShardRunner(2, tempfile.mkdtemp(), tempfile.mkdtemp())
+        shards = runner.plan([1, 2, 3, 4, 5], {})
+
+        metrics = Metrics(enabled=True)
+        metrics.record('navigation', 0.02)
+        for result in runner.run(record_shard, shards):
+            metrics.merge(result['metrics'])
+
+        summary = metrics.summary().set_index('stage')
+        self.assertEqual(summary.loc['navigation', 'count'], 6)
+        self.assertEqual(summary.loc['wait.interval', 'timeouts'], 2)
+        self.assertEqual(metrics.counts['discovery.weeks_skipped'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
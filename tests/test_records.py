@@ -0,0 +1,99 @@
+import re
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.get_records import ACTIVITY_DTYPES, COLUMN_PARSERS, parse_activity_columns
+
+
+def parse_time(time_str: str) -> str:
+    """Conversão por atividade de 'MM:SS' ou 'HH:MM:SS', como antes da etapa em lote."""
+    time_parts = time_str.split(':')
+    if len(time_parts) == 2:
+        hours, minutes, seconds = 0, int(time_parts[0]), int(time_parts[1])
+    elif len(time_parts) == 3:
+        hours, minutes, seconds = map(int, time_parts)
+    else:
+        raise ValueError('Formato de tempo inválido')
+    return f'{hours:02}:{minutes:02}:{seconds:02}'
+
+
+def parse_datetime(activity_time: str) -> datetime:
+    """Conversão por atividade do horário, como antes da etapa em lote."""
+    for fmt in ('%I:%M %p on %A, %B %d, %Y', '%A, %B %d, %Y'):
+        try:
+            return datetime.strptime(activity_time.strip(), fmt)
+        except ValueError:
+            pass
+    raise ValueError(f'Formato desconhecido: {activity_time}')
+
+
+# Regras por atividade de `parse_activity_fields` antes da etapa em lote.
+ROW_PARSERS = {
+    'date_time': lambda c: parse_datetime(c) if c else np.nan,
+    'moving_time': lambda c: parse_time(c) if c else np.nan,
+    'elapsed_time': lambda c: parse_time(c) if c else np.nan,
+    'duration': lambda c: parse_time(c) if c else np.nan,
+    'distance': lambda c: re.sub(r' km', '', c) if c else np.nan,
+    'elevation': lambda c: re.sub(r'[^\d]', '', c) or np.nan,
+    'calories': lambda c: c.replace(',', '.') or np.nan,
+    'pace': lambda c: re.match(r'(\d{1,2}:\d{2})', c).group(1) if c else np.nan,
+}
+
+DURATIONS = ['45:12', '1:02:03', '0:59', '', None, '12:00:00', 'abc']
+
+SAMPLES = {
+    'date_time': [
+        '7:18 PM on Tuesday, January 21, 2025',
+        'Friday, January 10, 2025',
+        ' 6:05 AM on Monday, March 3, 2025 ',
+        '',
+        None,
+        '12:00 AM on Sunday, December 28, 2025',
+        '7:18 PM on Tuesday, January 21, 2025',
+    ],
+    'moving_time': DURATIONS,
+    'elapsed_time': DURATIONS[::-1],
+    'duration': DURATIONS,
+    'distance': ['10.52 km', '5 km', '0.8 km', '', None, '42.2 km', '10.52 km'],
+    'elevation': ['120 m', '1,204 m', '0 m', '', None, '—', '15m'],
+    'calories': ['512', '1,5', '2034', '', None, '0', '512'],
+    'pace': ['5:12 /km', '10:03 /km', '4:59/km', '', None, '6:00 /km', '5:12 /km'],
+}
+
+
+def parse_by_row(column: str, values: list) -> pd.Series:
+    """Aplica a regra antiga a cada valor; erros deixam o campo ausente."""
+    parsed = []
+    for value in values:
+        if value is None:
+            parsed.append(np.nan)
+            continue
+        try:
+            parsed.append(ROW_PARSERS[column](value))
+        except Exception:
+            parsed.append(np.nan)
+    return pd.Series(parsed, dtype='object').astype(ACTIVITY_DTYPES[column])
+
+
+class ParseActivityColumnsTest(unittest.TestCase):
+    def test_matches_the_row_by_row_parsers(self):
+        self.assertEqual(set(SAMPLES), set(COLUMN_PARSERS))
+        df = pd.DataFrame(SAMPLES, dtype='object')
+        failures = parse_activity_columns(df)
+
+        for column, values in SAMPLES.items():
+            with self.subTest(column=column):
+                pd.testing.assert_series_equal(
+                    df[column].astype(ACTIVITY_DTYPES[column]),
+                    parse_by_row(column, values),
+                    check_names=False,
+                )
+
+        self.assertEqual(failures, {'moving_time': 1, 'elapsed_time': 1, 'duration': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
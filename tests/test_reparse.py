@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.strava_stub import StravaStub, activity_page
+from src import get_commands
+from src.get_cache import PageCache
+from src.get_http import parse_activity_html
+from src.get_records import build_activity_frame
+from src.get_scraping import StravaScraper
+from src.get_utils import load_activity_data, save_activity_data
+
+
+class ReparseCacheTest(unittest.TestCase):
+    def test_reparse_replaces_rows_from_the_original_fetch(self):
+        folder = tempfile.mkdtemp() + '/'
+        activity = StravaStub(athletes=1, activities_per_athlete=1).feed[0]
+        activity['variant'] = 'run'
+        content = activity_page(activity)
+
+        # Como na coleta pelo navegador: a página é guardada e, logo depois, a
+        # extração falha e grava 'Not Found' com um `updated_at` mais recente.
+        fetched_at = datetime.now() - timedelta(seconds=1)
+        cache = PageCache(folder + 'cache/')
+        cache.put(activity['athlete_id'], activity['activity_id'], content, fetched_at)
+        cache.save()
+
+        stale = parse_activity_html(
+            content, activity['athlete_id'], activity['activity_id'], StravaScraper.URL
+        )
+        stale['activity_name'] = 'Not Found'
+        stale['updated_at'] = datetime.now()
+        save_activity_data(build_activity_frame([stale]), folder)
+
+        with mock.patch.object(get_commands, 'PATH_TO_DATA', folder):
+            get_commands.reparse_cache()
+
+        saved = load_activity_data(folder)
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(saved['activity_name'].iloc[0], activity['activity_name'])
+        self.assertTrue(os.path.exists(folder + 'index_activities.parquet'))
+        self.assertGreater(
+            saved['updated_at'].iloc[0], pd.Timestamp(stale['updated_at'])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
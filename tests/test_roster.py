@@ -0,0 +1,84 @@
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from scrapper import parse_arguments
+from src.get_roster import Roster
+
+
+def members(athlete_ids: list) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            'athlete_id': athlete_ids,
+            'athlete_name': [f'Atleta {i}' for i in athlete_ids],
+            'link': [f'https://www.strava.com/athletes/{i}' for i in athlete_ids],
+            'updated_at': datetime.now(),
+        }
+    )
+
+
+class RosterTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def saved_roster(self, club_id: int, athlete_ids: list) -> Roster:
+        roster = Roster(self.folder).load()
+        roster.diff(club_id, members(athlete_ids))
+        roster.save()
+        return Roster(self.folder).load()
+
+    def test_first_listing_marks_nobody_as_joined(self):
+        roster = Roster(self.folder).load()
+        changes = roster.diff(1, members([1, 2]))
+
+        self.assertEqual(changes, {'joined': ['1', '2'], 'left': [], 'unchanged': []})
+        self.assertEqual(roster.weeks_for(1, 1), 1)
+
+    def test_diff_splits_joined_left_and_unchanged(self):
+        roster = self.saved_roster(1, [1, 2])
+        joined_at = roster.members.set_index('athlete_id')['joined_at']
+
+        changes = roster.diff(1, members([2, 3]))
+        self.assertEqual(changes, {'joined': ['3'], 'left': ['1'], 'unchanged': ['2']})
+        self.assertEqual(sorted(roster.members['athlete_id']), ['2', '3'])
+        self.assertEqual(
+            roster.members.set_index('athlete_id').loc['2', 'joined_at'],
+            joined_at['2'],
+        )
+
+    def test_backfill_window_only_for_new_athletes(self):
+        roster = self.saved_roster(1, [1, 2])
+        roster.diff(1, members([1, 2, 3]))
+
+        self.assertEqual(roster.weeks_for(3, 1), 4)
+        self.assertEqual(roster.weeks_for('3', 6), 6)
+        self.assertEqual(roster.weeks_for(1, 1), 1)
+
+        roster.backfill_weeks = 0
+        self.assertEqual(roster.weeks_for(3, 1), 1)
+
+    def test_member_of_another_club_is_not_backfilled(self):
+        self.saved_roster(1, [1, 2])
+        roster = self.saved_roster(2, [5])
+        changes = roster.diff(2, members([5, 1]))
+
+        self.assertEqual(changes['joined'], ['1'])
+        self.assertEqual(roster.weeks_for(1, 1), 1)
+        self.assertEqual(sorted(roster.members['club_id']), [1, 1, 2, 2])
+
+    def test_default_week_works_with_the_backfill(self):
+        with mock.patch.object(sys, 'argv', ['scrapper.py', '--club-id', '1']):
+            args = parse_arguments()
+        self.assertEqual(args.week, 1)
+
+        roster = self.saved_roster(1, [1])
+        roster.diff(1, members([1, 2]))
+        self.assertEqual(roster.weeks_for(2, args.week), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.get_score import IncrementalScorer, Scorer
+from src.get_utils import iso_week, load_activity_data, save_activity_data
+
+
+def activities(rows: list) -> pd.DataFrame:
+    """Monta atividades a partir de tuplas (athlete_id, activity_id, data, minutos)."""
+    date_time = pd.Series([row[2] for row in rows], dtype='datetime64[ns]')
+    minutes = pd.to_timedelta([row[3] for row in rows], unit='min')
+    return pd.DataFrame(
+        {
+            'athlete_id': pd.Series([row[0] for row in rows], dtype='int64'),
+            'activity_id': pd.Series([row[1] for row in rows], dtype='int64'),
+            'date': date_time.dt.normalize(),
+            'date_time': date_time,
+            'moving_time': minutes,
+            'elapsed_time': minutes,
+            'duration': minutes,
+            'link': pd.Series(
+                [f'https://www.strava.com/activities/{row[1]}' for row in rows],
+                dtype='string',
+            ),
+            'updated_at': datetime.now(),
+            'week': iso_week(date_time).astype('string'),
+        }
+    )
+
+
+def sorted_score(df: pd.DataFrame) -> pd.DataFrame:
+    columns = ['athlete_id', 'date_time', 'raised_points', 'points']
+    return df[columns].sort_values(columns).reset_index(drop=True)
+
+
+class IncrementalScorerTest(unittest.TestCase):
+    def test_updates_match_a_full_rebuild(self):
+        folder = tempfile.mkdtemp()
+        # O último dia de janeiro é data de evento no ano corrente.
+        start = datetime(datetime.now().year, 1, 26, 7)
+        day = lambda n: start + timedelta(days=n)
+
+        first = activities(
+            [
+                (1, 10, day(0), 30),
+                (1, 11, day(1), 45),
+                (1, 12, day(5), 20),
+                (1, 13, day(7), 60),
+                (2, 20, day(0), 50),
+                (2, 21, day(8), 35),
+                (2, 22, day(14), 40),
+            ]
+        )
+        save_activity_data(first, folder)
+        scorer = IncrementalScorer(folder)
+        self.assertFalse(scorer.has_state())
+        scorer.rebuild()
+        self.assertTrue(scorer.has_state())
+        self.assertEqual(os.listdir(folder).count('score_state.parquet'), 0)
+
+        batches = [
+            # Atividade nova em uma semana já pontuada e outra em semana nova.
+            activities([(1, 14, day(2), 25), (2, 23, day(21), 15)]),
+            # Atividade editada: a duração mudou.
+            activities([(1, 11, day(1), 90)]),
+            # Atividades que mudaram de semana, inclusive a única da semana.
+            activities([(1, 12, day(9), 20), (2, 22, day(1), 40)]),
+        ]
+        for batch in batches:
+            save_activity_data(batch, folder)
+            scorer.update(batch)
+
+            full = Scorer(load_activity_data(folder)).score()
+            pd.testing.assert_frame_equal(
+                sorted_score(pd.read_parquet(scorer.score_path)),
+                sorted_score(full),
+                check_dtype=False,
+            )
+
+    def test_touched_includes_the_previous_week_of_moved_activities(self):
+        folder = tempfile.mkdtemp()
+        start = datetime(2025, 3, 3, 7)
+        save_activity_data(activities([(1, 10, start, 30)]), folder)
+        scorer = IncrementalScorer(folder)
+        scorer.rebuild()
+
+        moved = activities([(1, 10, start + timedelta(days=7), 30)])
+        touched = scorer.touched(moved)
+        self.assertEqual(
+            sorted(touched.itertuples(index=False, name=None)),
+            [(1, '202510'), (1, '202511')],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
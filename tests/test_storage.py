@@ -0,0 +1,77 @@
+import glob
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.get_utils import load_activity_data, save_activity_data
+
+
+def activities(rows: list) -> pd.DataFrame:
+    """Monta atividades a partir de tuplas (activity_id, week, nome, minutos após o início)."""
+    start = datetime(2025, 3, 1)
+    return pd.DataFrame(
+        {
+            'athlete_id': pd.Series([1] * len(rows), dtype='int64'),
+            'activity_id': pd.Series([row[0] for row in rows], dtype='int64'),
+            'week': pd.Series([row[1] for row in rows], dtype='string'),
+            'activity_name': pd.Series([row[2] for row in rows], dtype='string'),
+            'updated_at': [start + timedelta(minutes=row[3]) for row in rows],
+        }
+    )
+
+
+class SaveActivityDataTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def saved(self) -> dict:
+        df = load_activity_data(self.folder)
+        self.assertTrue(df['activity_id'].is_unique)
+        return dict(zip(df['activity_id'], df['activity_name']))
+
+    def test_newest_row_wins_in_the_same_week(self):
+        save_activity_data(activities([(1, '202510', 'nova', 5)]), self.folder)
+        save_activity_data(activities([(1, '202510', 'velha', 1)]), self.folder)
+        self.assertEqual(self.saved(), {1: 'nova'})
+
+        save_activity_data(activities([(1, '202510', 'mais nova', 9)]), self.folder)
+        self.assertEqual(self.saved(), {1: 'mais nova'})
+
+    def test_activity_that_changes_week_leaves_no_duplicate(self):
+        save_activity_data(
+            activities([(1, '202510', 'antes', 1), (2, '202510', 'outra', 1)]),
+            self.folder,
+        )
+        written = save_activity_data(
+            activities([(1, '202511', 'depois', 5)]), self.folder
+        )
+
+        self.assertEqual(self.saved(), {1: 'depois', 2: 'outra'})
+        self.assertEqual(len(written), 2)
+        old = pd.read_parquet(os.path.join(self.folder, 'activity_week_202510.parquet'))
+        self.assertEqual(old['activity_id'].tolist(), [2])
+
+    def test_move_between_weeks_of_the_same_batch(self):
+        save_activity_data(activities([(1, '202510', 'antes', 1)]), self.folder)
+        save_activity_data(
+            activities([(1, '202511', 'depois', 5), (2, '202510', 'nova', 5)]),
+            self.folder,
+        )
+        self.assertEqual(self.saved(), {1: 'depois', 2: 'nova'})
+
+    def test_older_copy_from_another_week_is_discarded(self):
+        save_activity_data(activities([(1, '202511', 'nova', 9)]), self.folder)
+        save_activity_data(activities([(1, '202510', 'velha', 1)]), self.folder)
+
+        self.assertEqual(self.saved(), {1: 'nova'})
+        self.assertEqual(
+            [os.path.basename(path) for path in glob.glob(self.folder + '/*')],
+            ['activity_week_202511.parquet'],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
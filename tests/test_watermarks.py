@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.get_utils import get_week
+from src.get_watermarks import CrawlWatermarks
+
+
+class CrawlWatermarksTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.window = get_week(6)
+        self.current = self.window[0]
+
+    def crawled(self, watermarks: CrawlWatermarks, window: list = None):
+        window = window or self.window
+        pending = watermarks.pending_weeks(1, window)
+        watermarks.record(1, window, pending, [100, 101])
+        return pending
+
+    def test_only_open_weeks_are_pending_after_a_crawl(self):
+        watermarks = CrawlWatermarks(self.folder, open_days=0)
+        self.assertEqual(self.crawled(watermarks), self.window)
+        self.assertEqual(watermarks.pending_weeks(1, self.window), [self.current])
+
+        # Com `open_days` maior que uma semana, a semana anterior segue aberta.
+        watermarks.open_days = 8
+        self.assertEqual(watermarks.pending_weeks(1, self.window), self.window[:2])
+
+    def test_weeks_outside_the_crawled_range_are_pending(self):
+        watermarks = CrawlWatermarks(self.folder, open_days=0)
+        self.crawled(watermarks)
+
+        longer = get_week(8)
+        self.assertEqual(
+            watermarks.pending_weeks(1, longer), [self.current] + longer[6:]
+        )
+
+        self.crawled(watermarks, longer)
+        self.assertEqual(watermarks.pending_weeks(1, longer), [self.current])
+        self.assertEqual(watermarks.entries['1']['first_week'], longer[-1])
+
+    def test_deep_window_reopens_every_week(self):
+        watermarks = CrawlWatermarks(self.folder, open_days=0, deep_days=30)
+        self.crawled(watermarks)
+
+        watermarks.entries['1']['deep_at'] = datetime.now() - timedelta(days=29)
+        self.assertEqual(watermarks.pending_weeks(1, self.window), [self.current])
+
+        watermarks.entries['1']['deep_at'] = datetime.now() - timedelta(days=31)
+        self.assertEqual(watermarks.pending_weeks(1, self.window), self.window)
+
+        # A passagem completa renova a marca.
+        self.crawled(watermarks)
+        self.assertEqual(watermarks.pending_weeks(1, self.window), [self.current])
+
+        watermarks.deep_days = 0
+        self.assertEqual(watermarks.pending_weeks(1, self.window), self.window)
+
+    def test_week_that_did_not_load_stays_pending(self):
+        watermarks = CrawlWatermarks(self.folder, open_days=0)
+        loaded = [week for week in self.window if week != self.window[3]]
+        watermarks.record(1, self.window, loaded, [100])
+        self.assertEqual(watermarks.pending_weeks(1, self.window), self.window)
+
+    def test_save_and_load(self):
+        watermarks = CrawlWatermarks(self.folder, open_days=0)
+        self.crawled(watermarks)
+        watermarks.save()
+
+        loaded = CrawlWatermarks(self.folder, open_days=0).load()
+        self.assertEqual(loaded.pending_weeks(1, self.window), [self.current])
+        self.assertEqual(loaded.entries['1']['newest_activity'], 101)
+
+
+if __name__ == '__main__':
+    unittest.main()